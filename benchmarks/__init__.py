@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Benchmarks of gdpy3, need gdpy3 installed.
+
+1. :mod:`synthetic`, write synthetic GTC output of configurable size.
+2. :mod:`stages`, time and memory-profile dig, save, load, cook, plot.
+3. ``python -m benchmarks``, run all stages, save results as JSON.
+4. ``python -m benchmarks.compare old.json new.json``, compare results.
+5. ``bench_mplplotter.py``, pyplot vs headless plotter throughput.
+'''
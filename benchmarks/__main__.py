@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Run benchmarks of all stages on a synthetic GTC case.
+Results are saved as JSON, compare them with ``benchmarks.compare``.
+'''
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+import numpy
+import gdpy3
+
+from . import synthetic, stages
+
+
+def git_commit():
+    '''Return the commit of the source tree, or None.'''
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(gdpy3.__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark dig, save, load, cook and plot stages.')
+    for k, v in synthetic.default_sizes.items():
+        parser.add_argument('--%s' % k, type=int, default=v,
+                            help='default %d' % v)
+    parser.add_argument('--case', metavar='DIR',
+                        help='use existing GTC case directory, '
+                        'not synthesize one')
+    parser.add_argument('--stages', default='dig,save,load,cook,plot',
+                        help='comma separated stages to run, '
+                        'default dig,save,load,cook,plot')
+    parser.add_argument('--memory', action='store_true',
+                        help='trace memory peak, slower')
+    parser.add_argument('-o', '--output', default='benchmark-results.json',
+                        help='JSON result file')
+    args = parser.parse_args()
+    todo = args.stages.split(',')
+    sizes = {k: getattr(args, k) for k in synthetic.default_sizes}
+    recorder = stages.Recorder(memory=args.memory)
+    with tempfile.TemporaryDirectory(prefix='gdpy3-bench-') as tmp:
+        if args.case:
+            casedir = args.case
+        else:
+            casedir = os.path.join(tmp, 'case')
+            with recorder.measure('synth', 'write_case'):
+                synthetic.write_case(casedir, **sizes)
+        digged = stages.bench_dig(recorder, casedir)
+        if {'save', 'load', 'cook', 'plot'}.intersection(todo):
+            paths = stages.bench_save(recorder, digged, tmp)
+            del digged
+            pckloader = stages.bench_load(recorder, paths)
+            if {'cook', 'plot'}.intersection(todo):
+                figinfos = stages.bench_cook(recorder, pckloader)
+                if 'plot' in todo:
+                    stages.bench_plot(recorder, figinfos, tmp)
+    results = [r for r in recorder.results
+               if r['stage'] in todo
+               or (r['stage'] in ('create', 'savefig') and 'plot' in todo)
+               or r['stage'] == 'synth']
+    meta = dict(
+        commit=git_commit(), date=time.strftime('%Y-%m-%d %H:%M:%S'),
+        gdpy3=gdpy3.__version__, python=platform.python_version(),
+        numpy=numpy.__version__, platform=platform.platform(),
+        sizes=None if args.case else sizes, case=args.case,
+        memory=args.memory,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(dict(meta=meta, results=results), f, indent=1)
+    print("Results saved in %s." % args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
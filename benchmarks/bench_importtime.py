@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Measure import time of gdpy3 modules by ``python -X importtime``,
+and check that heavy optional dependencies are not imported.
+Exit with status 1 if a module exceeds the budget.
+
+Usage: python bench_importtime.py [-n REPEAT] [-b BUDGET_MS] [module ...]
+'''
+
+import sys
+import json
+import argparse
+import subprocess
+
+default_modules = [
+    'gdpy3',
+    'gdpy3.loaders',
+    'gdpy3.savers',
+    'gdpy3.plotters',
+    'gdpy3.processors.basecore',
+    'gdpy3.aggregate',
+]
+heavy_modules = ['numpy', 'matplotlib', 'h5py', 'paramiko', 'scipy']
+# heavy modules allowed by module prefix
+allowed_heavy = {
+    'gdpy3.processors.GTC': ['numpy'],
+    'gdpy3.plotters.base': ['numpy'],
+    'gdpy3.plotters.mplplotter': ['numpy', 'matplotlib'],
+}
+
+
+def import_time(module):
+    '''
+    Import *module* in a new interpreter.
+    Return cumulative microseconds and loaded heavy modules,
+    or (None, error message) if import failed.
+    '''
+    code = ('import sys, json, %s; print(json.dumps([m for m in %r '
+            'if m in sys.modules]))' % (module, heavy_modules))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1]
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative = int(fields[1])
+    return cumulative, json.loads(proc.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of gdpy3 import time.')
+    parser.add_argument('modules', nargs='*', default=default_modules,
+                        help='modules to import, default: %s'
+                        % ', '.join(default_modules))
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help='take the best of N runs, default 5')
+    parser.add_argument('-b', '--budget', type=float, default=150.0,
+                        help='import time budget in ms, default 150')
+    args = parser.parse_args()
+    failed = False
+    print("%-32s %12s  %s" % ('module', 'time(ms)', 'heavy modules'))
+    for module in args.modules:
+        results = [import_time(module) for i in range(args.repeat)]
+        if results[0][0] is None:
+            print("%-32s %12s  %s" % (module, '-', results[0][1]))
+            failed = True
+            continue
+        usec = min(r[0] for r in results)
+        heavy = results[0][1]
+        allowed = [m for prefix, mods in allowed_heavy.items()
+                   if module.startswith(prefix) for m in mods]
+        unexpected = [m for m in heavy if m not in allowed]
+        status = ''
+        if usec / 1000 > args.budget:
+            status += ' OVER BUDGET'
+        if unexpected:
+            status += ' UNEXPECTED IMPORTS'
+        failed = failed or bool(status)
+        print("%-32s %12.2f  %s%s" % (module, usec / 1000,
+                                      ', '.join(heavy) or '-', status))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
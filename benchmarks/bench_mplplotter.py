@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Compare pyplot and headless Agg :class:`gdpy3.plotters.mplplotter.MatplotlibPlotter`,
+create -> save/render -> close figures, report figures per second.
+
+Usage: python bench_mplplotter.py [-n NUM] [-s SIZE] [-f FORMAT]
+'''
+
+import os
+import time
+import tempfile
+import argparse
+import numpy
+
+import matplotlib
+matplotlib.use('Agg')
+from gdpy3.plotters import get_plotter
+
+
+def make_axstructs(plotter, size):
+    '''Return line and pcolor AxesStructures with *size* points.'''
+    x = numpy.linspace(0, 10, size * size)
+    line, _ = plotter.template_line_axstructs(
+        dict(LINE=[(x, numpy.sin(x), 'sin'), (x, numpy.cos(x), 'cos')],
+             title='line', xlabel='x', ylabel='y'))
+    X, Y = numpy.meshgrid(numpy.linspace(0, 1, size),
+                          numpy.linspace(0, 2, size))
+    Z = numpy.sin(6 * X) * numpy.cos(4 * Y)
+    pcolor, _ = plotter.template_pcolor_axstructs(
+        dict(X=X, Y=Y, Z=Z, title='pcolor', plot_method='pcolormesh'))
+    contourf, _ = plotter.template_pcolor_axstructs(
+        dict(X=X, Y=Y, Z=Z, title='contourf', plot_method='contourf'))
+    return dict(line=line, pcolor=pcolor, contourf=contourf)
+
+
+def bench(headless, num, size, fmt, outdir):
+    plotter = get_plotter('mpl::bench', headless=headless)
+    axstructs = make_axstructs(plotter, size)
+    result = {}
+    for kind, axs in axstructs.items():
+        nbytes = 0
+        start = time.perf_counter()
+        for i in range(num):
+            fignum = '%s-%d' % (kind, i)
+            plotter.create_figure(fignum, *axs)
+            if outdir:
+                fpath = os.path.join(outdir, '%s.%s' % (fignum, fmt))
+                plotter.save_figure(fignum, fpath)
+                nbytes += os.path.getsize(fpath)
+            else:
+                nbytes += len(plotter.figure_to_bytes(fignum, fmt))
+            plotter.close_figure(fignum)
+        elapsed = time.perf_counter() - start
+        result[kind] = (num / elapsed, nbytes / num)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of matplotlib plotter rendering.')
+    parser.add_argument('-n', '--num', type=int, default=20,
+                        help='figures of each kind, default 20')
+    parser.add_argument('-s', '--size', type=int, default=300,
+                        help='Z shape (size, size), default 300')
+    parser.add_argument('-f', '--format', default='png',
+                        help='output format, default png')
+    args = parser.parse_args()
+    print("%-10s %-9s %-10s %12s %14s" % (
+        'mode', 'output', 'kind', 'figures/s', 'bytes/figure'))
+    with tempfile.TemporaryDirectory() as outdir:
+        for mode, headless, out in [('pyplot', False, outdir),
+                                    ('headless', True, outdir),
+                                    ('headless', True, None)]:
+            result = bench(headless, args.num, args.size, args.format, out)
+            for kind, (speed, size) in result.items():
+                print("%-10s %-9s %-10s %12.2f %14d" % (
+                    mode, 'file' if out else 'bytes', kind, speed, size))
+
+
+if __name__ == '__main__':
+    main()
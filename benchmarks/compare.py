@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Compare two JSON results of benchmarks.
+
+Usage: python -m benchmarks.compare old.json new.json [-t 1.1]
+'''
+
+import sys
+import json
+import argparse
+
+
+def load(path):
+    '''Return meta, {(stage, name): result} of JSON file *path*.'''
+    with open(path) as f:
+        data = json.load(f)
+    return data['meta'], {(r['stage'], r['name']): r
+                          for r in data['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.compare',
+        description='Compare two benchmark results.')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('-t', '--threshold', type=float, default=1.1,
+                        help='ratio new/old to report regression, '
+                        'default 1.1')
+    args = parser.parse_args()
+    oldmeta, old = load(args.old)
+    newmeta, new = load(args.new)
+    print("old: %s %s\nnew: %s %s" % (oldmeta.get('commit'), args.old,
+                                      newmeta.get('commit'), args.new))
+    print("%-8s %-40s %10s %10s %7s" % ('stage', 'name', 'old(s)',
+                                        'new(s)', 'ratio'))
+    regressions = 0
+    for key in sorted(set(old) | set(new)):
+        o, n = old.get(key), new.get(key)
+        if o is None or n is None or o['error'] or n['error']:
+            print("%-8s %-40s %10s %10s" % (
+                key[0], key[1],
+                'error' if o and o['error'] else (
+                    '-' if o is None else '%.4f' % o['seconds']),
+                'error' if n and n['error'] else (
+                    '-' if n is None else '%.4f' % n['seconds'])))
+            continue
+        ratio = n['seconds'] / o['seconds'] if o['seconds'] else 1.0
+        flag = ''
+        if ratio > args.threshold:
+            flag = ' <- slower'
+            regressions += 1
+        print("%-8s %-40s %10.4f %10.4f %7.2f%s" % (
+            key[0], key[1], o['seconds'], n['seconds'], ratio, flag))
+    print("%d regressions over threshold %.2f." % (regressions,
+                                                  args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
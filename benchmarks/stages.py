@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Time and memory-profile the stages of gdpy3:
+dig, save, load, cook and plot.
+
+Each measurement is a dict, {'stage', 'name', 'seconds', 'peak_bytes',
+'error'}. 'peak_bytes' is the tracemalloc peak, None if not traced.
+'''
+
+import os
+import time
+import tracemalloc
+import contextlib
+
+from gdpy3.loaders import get_rawloader, get_pckloader
+from gdpy3.savers import get_pcksaver, pcksaver_types
+from gdpy3.processors.coreregistry import CoreRegistry
+from gdpy3.processors.GTC.gtc import GtcCoreV110922
+from gdpy3.processors.GTC.history import HistoryCoreV110922
+from gdpy3.processors.GTC.data1d import Data1dCoreV110922
+from gdpy3.processors.GTC.snapshot import SnapshotCoreV110922
+from gdpy3.processors.GTC.equilibrium import EquilibriumCoreV110922
+from gdpy3.processors.GTC.meshgrid import MeshgridCoreV110922
+from gdpy3.processors.GTC.trackparticle import TrackParticleCoreV110922
+
+__all__ = ['Recorder', 'bench_dig', 'bench_save', 'bench_load',
+           'bench_cook', 'bench_plot', 'coreclasses']
+
+coreclasses = [
+    GtcCoreV110922, HistoryCoreV110922, Data1dCoreV110922,
+    SnapshotCoreV110922, EquilibriumCoreV110922, MeshgridCoreV110922,
+    TrackParticleCoreV110922,
+]
+
+
+class Recorder(object):
+    '''
+    Collect measurements.
+
+    Parameters
+    ----------
+    memory: bool, trace memory peak with tracemalloc or not
+    '''
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.results = []
+
+    @contextlib.contextmanager
+    def measure(self, stage, name):
+        '''Measure the block, errors in it are recorded, not raised.'''
+        item = dict(stage=stage, name=name, seconds=None,
+                    peak_bytes=None, error=None)
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield item
+        except Exception as exc:
+            item['error'] = '%s: %s' % (type(exc).__name__, exc)
+        finally:
+            item['seconds'] = time.perf_counter() - start
+            if self.memory:
+                item['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.results.append(item)
+            print("%-6s %-40s %10.4fs%s" % (
+                stage, name, item['seconds'],
+                ' ERROR %s' % item['error'] if item['error'] else ''))
+
+
+def bench_dig(recorder, casedir):
+    '''Dig all files in *casedir*. Return {group: data}.'''
+    rawloader = get_rawloader(casedir)
+    digged = {}
+    with recorder.measure('dig', 'classify'):
+        tasks = CoreRegistry(coreclasses).dig_tasks(rawloader)
+    for cls, f, group in tasks:
+        core = cls()
+        name = '%s:%s' % (cls.__name__, core.short_file(f))
+        with recorder.measure('dig', name):
+            core.set_dig_args(rawloader, f, group)
+            digged[core.group] = core.dig()
+    return digged
+
+
+def bench_save(recorder, digged, outdir):
+    '''Save *digged* data with every pcksaver. Return saved paths.'''
+    paths = []
+    for ext in pcksaver_types:
+        path = os.path.join(outdir, 'bench%s' % ext)
+        with recorder.measure('save', ext):
+            saver = get_pcksaver(path)
+            with saver:
+                for group, data in digged.items():
+                    saver.write(group, data)
+            paths.append(saver.get_store())
+    return paths
+
+
+def bench_load(recorder, paths):
+    '''Load all keys with every pckloader. Return the first pckloader.'''
+    first = None
+    for path in paths:
+        name = 'cache' if isinstance(path, dict) else os.path.basename(path)
+        with recorder.measure('load', name):
+            pckloader = get_pckloader(path)
+            pckloader.get_many(*pckloader.keys())
+            if first is None:
+                first = pckloader
+    return first
+
+
+def bench_cook(recorder, pckloader):
+    '''Cook all figures. Return a list of figinfo objects.'''
+    figinfos = []
+    for cls in coreclasses:
+        if 'cook' not in cls.instructions:
+            continue
+        for group in cls.match_groups(pckloader):
+            core = cls()
+            core.set_cook_args(pckloader, group)
+            for fignum in core.figurenums:
+                with recorder.measure('cook', '%s/%s' % (group, fignum)):
+                    figinfo = core.cook(fignum)
+                    if figinfo is not None and figinfo.calculation:
+                        figinfos.append(figinfo)
+    return figinfos
+
+
+def bench_plot(recorder, figinfos, outdir, fmt='png'):
+    '''Create and save figures with MatplotlibPlotter.'''
+    from gdpy3.plotters import get_plotter
+    plotter = get_plotter('mpl::benchmark', headless=True)
+    for figinfo in figinfos:
+        num = '%s/%s' % (figinfo.group, figinfo.fignum)
+        with recorder.measure('create', num):
+            axstructs, add_style = figinfo.serve(plotter)
+            plotter.create_figure(num, *axstructs, add_style=add_style)
+        with recorder.measure('savefig', num):
+            fpath = os.path.join(outdir, '%s.%s' % (
+                num.replace('/', '-').replace(':', '-'), fmt))
+            plotter.save_figure(num, fpath)
+        plotter.close_figure(num)
@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Synthetic GTC v110922 output generator for benchmarks and scale tests.
+
+The layouts follow the docstrings of the ``*CoreV110922`` classes in
+:mod:`gdpy3.processors.GTC`, so every core can dig the files. Signals are
+physically plausible: linearly growing then saturated modes with real
+frequencies, zonal flows driven by the turbulence, radially localized
+fluxes, Shafranov-shifted equilibrium, passing and trapped orbits.
+
+Time series are generated and written chunk by chunk, so GB scale
+cases can be written with small memory.
+
+Usage: python -m benchmarks.synthetic OUTDIR [--preset large] [--ndstep N]
+'''
+
+import os
+import sys
+import argparse
+import numpy
+
+__all__ = ['default_sizes', 'presets', 'write_case', 'CaseGenerator']
+
+default_sizes = dict(
+    mpsi=90, mtgrid=128, mtoroidal=32, ndstep=2000,
+    nsnap=2, ntrackp=9, nmodes=8, nvgrid=65, lst=128,
+    nspecies=1, nhybrid=0, ntrackfiles=1,
+)
+
+# about 5MB, 100MB, 1GB, 10GB of text
+presets = {
+    'small': dict(default_sizes, mpsi=40, mtgrid=64, ndstep=500),
+    'medium': dict(default_sizes, ndstep=20000, nsnap=5),
+    'large': dict(default_sizes, mpsi=200, mtgrid=512, mtoroidal=64,
+                  ndstep=100000, nsnap=10, ntrackp=50, ntrackfiles=4,
+                  nspecies=2, nhybrid=1),
+    'huge': dict(default_sizes, mpsi=400, mtgrid=1024, mtoroidal=64,
+                 ndstep=1000000, nsnap=20, ntrackp=100, ntrackfiles=8,
+                 nspecies=3, nhybrid=1),
+}
+
+_FMT = '%16.8E\n'
+# values generated and written each time
+_CHUNK = 1 << 20
+
+
+def _write_values(f, values):
+    '''Write array *values* in fortran order, one number per line.'''
+    values = numpy.ravel(values, order='F')
+    for i in range(0, values.size, _CHUNK):
+        part = values[i:i + _CHUNK].tolist()
+        f.write((_FMT * len(part)) % tuple(part))
+
+
+def _write_ints(f, *ints):
+    f.write(''.join('%12d\n' % i for i in ints))
+
+
+class CaseGenerator(object):
+    '''
+    Generate files of one GTC case.
+
+    Attributes
+    ----------
+    sizes: dict, see :data:`default_sizes`
+    tstep, ndiag: time step and diagnosis interval
+    r0, a_minor, qiflux, rgiflux, rho0: geometry parameters
+    gamma, omega: growth rate and real frequency of each mode
+    '''
+
+    def __init__(self, seed=0, **sizes):
+        self.sizes = dict(default_sizes)
+        self.sizes.update(sizes)
+        sz = self.sizes
+        if sz['nspecies'] not in (1, 2, 3):
+            raise ValueError("'nspecies' should be 1, 2 or 3!")
+        self.rng = numpy.random.default_rng(seed)
+        self.tstep, self.ndiag = 0.02, 5
+        self.r0, self.a_minor = 1.0, 0.36
+        self.qiflux, self.rgiflux, self.rho0 = 1.4, 0.18, 0.0045
+        self.nmodes = numpy.arange(1, sz['nmodes'] + 1) * 4
+        self.mmodes = numpy.rint(self.nmodes * self.qiflux).astype(int)
+        ktr = self.nmodes * self.qiflux / self.rgiflux * self.rho0
+        # saturation near 40% of the run, after about 12 e-foldings,
+        # ITG-like growth rate peaking at k_theta*rho_i ~ 0.3
+        tend = sz['ndstep'] * self.tstep * self.ndiag
+        self._tsat = 0.4 * tend
+        self._a0 = 1e-6
+        shape = 0.4 + 0.6 * ktr / 0.3 * numpy.exp(1 - ktr / 0.3)
+        self.gamma = 12.0 / self._tsat * shape
+        # about 16 periods in the run at k_theta*rho_i ~ 0.3
+        self.omega = 16.0 * 2 * numpy.pi / tend * ktr / 0.3
+        self.r = numpy.linspace(0.1, 0.9, sz['mpsi'] + 1) * self.a_minor
+
+    # signals
+    def amplitude(self, t):
+        '''Mode amplitudes, shape (nmodes, len(t)), logistic growth.'''
+        t = numpy.atleast_1d(t)
+        asat = self._a0 * numpy.exp(self.gamma * self._tsat)
+        grow = self._a0 * numpy.exp(numpy.minimum(
+            numpy.outer(self.gamma, t), 700))
+        return grow / (1.0 + grow / asat[:, numpy.newaxis])
+
+    def zonal(self, t):
+        '''Zonal flow amplitude, driven by turbulence, with damped GAM.'''
+        t = numpy.atleast_1d(t)
+        drive = (self.amplitude(t) ** 2).sum(axis=0)
+        gam = numpy.cos(2.0 * t) * numpy.exp(-0.05 * t)
+        return drive * (1.0 + 0.3 * gam)
+
+    def envelope(self):
+        '''Radial envelope of turbulence, peak at iflux.'''
+        rc = self.rgiflux * self.a_minor / 0.36 * 0.5
+        return numpy.exp(-((self.r - rc) / (0.15 * self.a_minor)) ** 2)
+
+    def times(self, start, stop):
+        return numpy.arange(start + 1, stop + 1) * self.tstep * self.ndiag
+
+    def _noise(self, *shape):
+        return self.rng.standard_normal(shape)
+
+    # files
+    def write_gtcout(self, path):
+        sz = self.sizes
+        params = [
+            ('mstep', sz['ndstep'] * self.ndiag), ('msnap', sz['nsnap']),
+            ('ndiag', self.ndiag), ('nonlinear', 1),
+            ('nhybrid', sz['nhybrid']), ('mpsi', sz['mpsi']),
+            ('mthetamax', sz['mtgrid']), ('mtoroidal', sz['mtoroidal']),
+            ('tstep', self.tstep), ('r0', 100.0), ('b0', 19100.0),
+            ('etemp0', 2223.0), ('eden0', 1.13e14),
+            ('qiflux', self.qiflux), ('rgiflux', self.rgiflux),
+            ('rho0', self.rho0), ('iflux', sz['mpsi'] // 2),
+            ('nspecies', sz['nspecies']),
+        ]
+        with open(path, 'w') as f:
+            f.write('===================================\n')
+            f.write(' &INPUT_PARAMETERS\n')
+            for k, v in params:
+                f.write(' %s= %s\n' % (k.upper(), v))
+            f.write(' /\n')
+            f.write(' npartdom=%6d and nproc=%6d\n'
+                    % (1, sz['ntrackfiles']))
+            f.write(' psi0= 0.1000E-01, psiw=  %.4E\n' % 0.0378)
+            f.write(' rg0= %.4E rg1= %.4E\n' % (0.1, 0.9))
+            f.write(' a_minor= %.4E \n' % self.a_minor)
+            f.write(' nue_eff=  %.4E nui_eff=  %.4E\n' % (0.0, 0.0))
+            f.write(' nmodes=%s\n' % ''.join('%6d' % n for n in self.nmodes))
+            f.write(' mmodes=%s\n' % ''.join('%6d' % m for m in self.mmodes))
+            f.write('===================================\n')
+
+    def history_step(self, t):
+        '''Return history data, shape (ndata, len(t)).'''
+        sz = self.sizes
+        nt, amp = len(t), self.amplitude(t)
+        energy = (amp ** 2).sum(axis=0)
+        partdata = []
+        for s in range(sz['nspecies']):
+            p = numpy.empty((10, nt))
+            p[0] = 1e-3 * self._noise(nt)
+            p[1] = energy * (1.0 + 0.05 * self._noise(nt))
+            p[2] = 1e-2 * numpy.sqrt(energy)
+            p[3] = 0.5 * energy
+            p[4] = 0.01 * energy
+            p[5] = 0.2 * energy
+            p[6:9] = energy * numpy.array([[0.1], [0.02], [0.3]]) / (s + 1)
+            p[9] = 1e6
+            partdata.append(p)
+        phase = numpy.outer(self.omega, t)
+        fieldtime, fieldmode = [], []
+        for scale in (1.0, 0.1, 0.5):
+            ft = numpy.empty((4, nt))
+            ft[0] = scale * (amp * numpy.cos(phase)).sum(axis=0)
+            ft[1] = scale * self.zonal(t)
+            ft[2] = scale * numpy.sqrt(energy)
+            ft[3] = scale * 0.1 * numpy.sqrt(energy)
+            fieldtime.append(ft)
+            fm = numpy.empty((2 * sz['nmodes'], nt))
+            fm[0::2] = scale * amp * numpy.cos(phase)
+            fm[1::2] = -scale * amp * numpy.sin(phase)
+            fieldmode.append(fm)
+        return numpy.concatenate(partdata + fieldtime + fieldmode)
+
+    def write_history(self, path):
+        sz = self.sizes
+        ndata = sz['nspecies'] * 10 + 3 * (2 * sz['nmodes'] + 4)
+        with open(path, 'w') as f:
+            _write_ints(f, sz['ndstep'], sz['nspecies'], 10, 3,
+                        sz['nmodes'], 4)
+            f.write(_FMT % (self.tstep * self.ndiag))
+            step = max(1, _CHUNK // ndata)
+            for i in range(0, sz['ndstep'], step):
+                t = self.times(i, min(i + step, sz['ndstep']))
+                _write_values(f, self.history_step(t))
+
+    def data1d_step(self, t):
+        '''Return data1d data, shape (ndata, len(t)).'''
+        sz = self.sizes
+        nt, env = len(t), self.envelope()[:, numpy.newaxis]
+        energy = (self.amplitude(t) ** 2).sum(axis=0)
+        nr = len(self.r)
+        blocks = []
+        for s in range(sz['nspecies']):
+            for c in (0.1, 0.3, 0.02):
+                blocks.append(c / (s + 1) * env * energy
+                              * (1.0 + 0.1 * self._noise(nr, nt)))
+        kr = 2 * numpy.pi / (0.1 * self.a_minor)
+        zf = numpy.sin(kr * self.r)[:, numpy.newaxis] * env * self.zonal(t)
+        for scale in (1.0, 0.1, 0.5):
+            blocks.append(scale * zf)
+        for scale in (1.0, 0.1, 0.5):
+            blocks.append(scale * env * energy
+                          * (1.0 + 0.05 * self._noise(nr, nt)))
+        return numpy.concatenate(blocks)
+
+    def write_data1d(self, path):
+        sz = self.sizes
+        mpsi1 = sz['mpsi'] + 1
+        ndata = mpsi1 * (sz['nspecies'] * 3 + 3 * 2)
+        with open(path, 'w') as f:
+            _write_ints(f, sz['ndstep'], mpsi1, sz['nspecies'],
+                        sz['nhybrid'], 3, 3, 2)
+            step = max(1, _CHUNK // ndata)
+            for i in range(0, sz['ndstep'], step):
+                t = self.times(i, min(i + step, sz['ndstep']))
+                _write_values(f, self.data1d_step(t))
+
+    def write_snapshot(self, path, istep):
+        sz = self.sizes
+        ns, nvgrid = sz['nspecies'], sz['nvgrid']
+        mpsi1, mtgrid1 = sz['mpsi'] + 1, sz['mtgrid'] + 1
+        mtoroidal = sz['mtoroidal']
+        t = numpy.array([istep * self.tstep])
+        amp = self.amplitude(t)[:, 0]
+        env = self.envelope()
+        r = self.r / self.a_minor
+        # profiles: fullf density, delf density, fullf flow,
+        #           delf flow, fullf energy, delf energy
+        profile = numpy.empty((mpsi1, 6, ns))
+        for s in range(ns):
+            profile[:, 0, s] = 1.0 - 0.5 * r ** 2
+            profile[:, 1, s] = 1e-3 * env * self._noise(mpsi1)
+            profile[:, 2, s] = 0.01 * r
+            profile[:, 3, s] = 1e-3 * env * self._noise(mpsi1)
+            profile[:, 4, s] = 1.5 * (1.0 - 0.6 * r ** 2)
+            profile[:, 5, s] = 1e-3 * env * self._noise(mpsi1)
+        # pdf: energy, pitch angle of fullf and delf
+        pdf = numpy.empty((nvgrid, 4, ns))
+        energy = numpy.linspace(0, 10, nvgrid)
+        pitch = numpy.linspace(-1, 1, nvgrid)
+        for s in range(ns):
+            pdf[:, 0, s] = numpy.sqrt(energy) * numpy.exp(-energy)
+            pdf[:, 1, s] = 1e-3 * pdf[:, 0, s] * (energy - 1.5)
+            pdf[:, 2, s] = 0.5
+            pdf[:, 3, s] = 1e-3 * pitch
+        # poloidal plane and flux surface
+        theta = numpy.linspace(0, 2 * numpy.pi, mtgrid1)
+        zeta = numpy.linspace(0, 2 * numpy.pi, mtoroidal, endpoint=False)
+        tt, rr = numpy.meshgrid(theta, r, indexing='ij')
+        field = numpy.zeros((mtgrid1, mpsi1))
+        flux = numpy.zeros((mtgrid1, mtoroidal))
+        for a, n, m in zip(amp, self.nmodes, self.mmodes):
+            ph = self.rng.random() * 2 * numpy.pi
+            field += a * numpy.cos(m * tt + ph) * env * numpy.exp(-tt ** 2)
+            flux += a * numpy.cos(numpy.add.outer(m * theta, -n * zeta) + ph)
+        poloidata = numpy.empty((mtgrid1, mpsi1, 5))
+        for i, scale in enumerate((1.0, 0.1, 0.5)):
+            poloidata[:, :, i] = scale * field
+        shift = 0.1 * (1.0 - r ** 2) * self.a_minor
+        poloidata[:, :, 3] = (self.r0 + shift
+                              + rr * self.a_minor * numpy.cos(tt))
+        poloidata[:, :, 4] = 1.2 * rr * self.a_minor * numpy.sin(tt)
+        fluxdata = numpy.stack([s * flux for s in (1.0, 0.1, 0.5)], axis=2)
+        with open(path, 'w') as f:
+            _write_ints(f, ns, 3, nvgrid, mpsi1, mtgrid1, mtoroidal)
+            f.write(_FMT % 10.0)
+            for data in (profile, pdf, poloidata, fluxdata):
+                _write_values(f, data)
+
+    def write_equilibrium(self, path):
+        sz = self.sizes
+        nrad, lst = sz['mpsi'] + 1, sz['lst']
+        m2d = sz['mpsi'] // 2 + 1
+        r = numpy.linspace(0, 1, nrad)
+        q = 0.85 + 2.2 * r ** 2
+        te, ne = 1.0 - 0.7 * r ** 2, 1.0 - 0.5 * r ** 2
+        dlnte, dlnne = 1.4 * r / te, 1.0 * r / ne
+        data1d = numpy.array([
+            0.0378 * r ** 2, r, r * self.a_minor, self.r0 + 0.0 * r,
+            te, dlnte, ne, dlnne, te, dlnte, ne, dlnne,
+            0.5 * te, dlnte, 0.01 * ne, dlnne,
+            1.0 + 0.0 * r, 0.01 * r, -0.1 * r * (1 - r), q,
+            4.4 * r / q, 1.0 - 0.01 * r ** 2, te * ne,
+            r * self.a_minor, 0.5 * r ** 2, r * self.a_minor,
+            0.5 * r ** 2, 0.0378 * r ** 2,
+            1e-6 * self._noise(nrad), 1e-6 * self._noise(nrad),
+        ])
+        theta = numpy.linspace(0, 2 * numpy.pi, lst)
+        rr, tt = numpy.meshgrid(numpy.linspace(0, 1, m2d), theta,
+                                indexing='ij')
+        shift = 0.1 * (1.0 - rr ** 2) * self.a_minor
+        x = self.r0 + shift + rr * self.a_minor * numpy.cos(tt)
+        z = 1.2 * rr * self.a_minor * numpy.sin(tt)
+        bfield = self.r0 / x
+        data2d = numpy.array([
+            x, z, bfield, x ** 2 / bfield, 0.01 * rr ** 2,
+            tt + 0.1 * rr * numpy.sin(tt), 1e-3 * numpy.cos(tt) * rr,
+        ])
+        with open(path, 'w') as f:
+            _write_ints(f, 29, nrad)
+            _write_values(f, data1d.T)
+            _write_ints(f, 5, m2d, lst)
+            _write_values(f, data2d.reshape((7, m2d * lst), order='F').T)
+
+    def write_meshgrid(self, path):
+        r = self.r / self.a_minor
+        data = numpy.array([
+            0.0378 * r ** 2, r, 0.85 + 2.2 * r ** 2,
+            6.9 * numpy.exp(-((r - 0.5) / 0.2) ** 2),
+            6.9 * numpy.exp(-((r - 0.5) / 0.2) ** 2),
+            2.2 * numpy.exp(-((r - 0.5) / 0.2) ** 2),
+            2.2 * numpy.exp(-((r - 0.5) / 0.2) ** 2),
+        ])
+        with open(path, 'w') as f:
+            _write_values(f, data)
+
+    def _orbit(self, t, j, trapped):
+        '''Return X, Z, zeta, rho_para of orbit *j*, normalized by r0.'''
+        rc = 0.2 + 0.5 * (j % 7) / 7.0
+        if trapped:
+            # banana orbit, bounce in theta
+            wb = 0.05 + 0.01 * (j % 3)
+            theta = 0.8 * numpy.sin(wb * t)
+            r = rc + 0.02 * numpy.cos(wb * t)
+            rho = numpy.cos(wb * t) * 0.1
+        else:
+            wt = 0.08 + 0.01 * (j % 3)
+            theta = wt * t
+            r = rc + 0.005 * numpy.sin(theta)
+            rho = 0.3 + 0.0 * t
+        x = 1.0 + r * self.a_minor * numpy.cos(theta)
+        z = r * self.a_minor * numpy.sin(theta)
+        zeta = 0.3 * t
+        return x, z, zeta, rho
+
+    def write_trackp(self, path, mype):
+        sz = self.sizes
+        nspec = 2 if sz['nhybrid'] > 0 else 1
+        ntrackp = sz['ntrackp']
+        nsteps = max(2, sz['ndstep'] // 10)
+        t = numpy.arange(1, nsteps + 1) * self.tstep * self.ndiag * 10
+        orbits = []
+        for s in range(nspec):
+            orbits.append([self._orbit(t, j + mype * ntrackp,
+                                       trapped=(j % 2 == 1))
+                           for j in range(ntrackp)])
+        fmt = '%16.8E%16.8E%16.8E%16.8E\n' * 2
+        with open(path, 'w') as f:
+            for k in range(nsteps):
+                _write_ints(f, (k + 1) * self.ndiag * 10)
+                f.write(''.join('%12d' % ntrackp for s in range(nspec))
+                        + '\n')
+                lines = []
+                for s in range(nspec):
+                    for j, (x, z, zeta, rho) in enumerate(orbits[s], 1):
+                        lines.append(fmt % (
+                            x[k], z[k], zeta[k], rho[k],
+                            1e-3, 0.5, float(j), float(mype)))
+                f.write(''.join(lines))
+
+    def write_case(self, path):
+        '''Write all files to directory *path*, return their paths.'''
+        sz = self.sizes
+        os.makedirs(os.path.join(path, 'trackp_dir'), exist_ok=True)
+        files = []
+        for name, writer in [('gtc.out', self.write_gtcout),
+                             ('history.out', self.write_history),
+                             ('data1d.out', self.write_data1d),
+                             ('equilibrium.out', self.write_equilibrium),
+                             ('meshgrid.out', self.write_meshgrid)]:
+            files.append(os.path.join(path, name))
+            writer(files[-1])
+        mstep = sz['ndstep'] * self.ndiag
+        for i in range(1, sz['nsnap'] + 1):
+            istep = mstep * i // sz['nsnap']
+            # snapshot cores match 5 digits only
+            num = istep if mstep < 100000 else i
+            files.append(os.path.join(path, 'snap%05d.out' % num))
+            self.write_snapshot(files[-1], istep)
+        for mype in range(sz['ntrackfiles']):
+            files.append(os.path.join(path, 'trackp_dir',
+                                      'TRACKP.%05d' % mype))
+            self.write_trackp(files[-1], mype)
+        return files
+
+
+def write_case(path, seed=0, **sizes):
+    '''
+    Write a GTC case to directory *path* with *sizes*,
+    see :data:`default_sizes`. Return the list of written files.
+    '''
+    return CaseGenerator(seed=seed, **sizes).write_case(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.synthetic',
+        description='Write a synthetic GTC case.')
+    parser.add_argument('outdir')
+    parser.add_argument('--preset', choices=sorted(presets),
+                        help='size preset, override by other options')
+    parser.add_argument('--seed', type=int, default=0)
+    for k, v in default_sizes.items():
+        parser.add_argument('--%s' % k, type=int, help='default %d' % v)
+    args = parser.parse_args()
+    sizes = dict(presets[args.preset]) if args.preset else {}
+    sizes.update({k: getattr(args, k) for k in default_sizes
+                  if getattr(args, k) is not None})
+    files = write_case(args.outdir, seed=args.seed, **sizes)
+    total = 0
+    for f in files:
+        size = os.path.getsize(f)
+        total += size
+        print("%12d %s" % (size, f))
+    print("%12d total" % total)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,8 +28,6 @@ def script_convert():
     '''
     Entry point for gdpy3.convert.
     '''
-    from . import convert as gdc
-
     parser = argparse.ArgumentParser(
         prog='gdpy3-convert',
         usage='%(prog)s [options]... casedir...',
@@ -104,6 +102,8 @@ def script_convert():
         sys.exit()
     log.debug("GTC results directory(s) TODO: %s" % case_directories)
 
+    # import after parsing, keep '--help' fast
+    from . import convert as gdc
     kwargs = {}
     for option in ['salt', 'extension',
                    'gtcver', 'description', 'additionalpats']:
@@ -137,12 +137,76 @@ def script_convert():
     sys.exit()
 
 
-def script_plot():
+def _plot_one(case, Name, fpath):
     '''
-    Entry point for gdpy3.plot.
+    Plot and save figure *Name* of *case* to *fpath*.
+    Return Name, calculation str or None if failed, used time.
+    '''
+    start = time.time()
+    calculation = None
+    try:
+        if case.plot(Name, show=False):
+            case.savefig(Name, fpath)
+            calculation = '%s' % (case[Name].calculation,)
+    except Exception:
+        log.error("Failed to plot figure '%s'!" % Name, exc_info=1)
+    else:
+        case.disable(Name)
+    return Name, calculation, time.time() - start
+
+
+_plot_worker_case = None
+_plot_worker_style = None
+
+
+def _plot_worker_init(path, kwargs):
+    '''
+    Initialize a plot worker process with its own loader of *path*.
+    *kwargs* for :func:`plot.pick`, its ``figurestyle`` is used for
+    figures enabled by tasks.
     '''
+    import matplotlib
+    matplotlib.use('Agg', force=True)
     from . import plot as gdp
+    global _plot_worker_case, _plot_worker_style
+    _plot_worker_case = gdp.pick(path, **kwargs)
+    _plot_worker_style = kwargs.get('figurestyle', None)
+
+
+def _plot_worker_task(Name, fpath):
+    '''
+    Plot and save figure *Name* in a worker process.
+    '''
+    if _plot_worker_style is not None:
+        # else, enabled with default style by GCase.__getitem__
+        _plot_worker_case.enable(Name, figurestyle=_plot_worker_style)
+    return _plot_one(_plot_worker_case, Name, fpath)
 
+
+def _save_results(results, calfile=None):
+    '''
+    Log *results* of :func:`_plot_one`, write calculations to *calfile*.
+    Return number of done figures.
+    '''
+    nfigs = 0
+    with open(calfile or os.devnull, 'w') as _calf:
+        _calf.write("results = {\n")
+        for Name, calculation, usedtime in results:
+            if calculation is None:
+                log.info("Figure %s failed in %.3fs." % (Name, usedtime))
+                continue
+            nfigs += 1
+            log.info("Figure %s done in %.3fs." % (Name, usedtime))
+            _calf.write("'%s': %s,\n" % (Name, calculation))
+            _calf.flush()
+        _calf.write("}\n")
+    return nfigs
+
+
+def script_plot():
+    '''
+    Entry point for gdpy3.plot.
+    '''
     parser = argparse.ArgumentParser(
         prog='gdpy3-plot',
         usage='%(prog)s [options]... casedir...',
@@ -166,6 +230,9 @@ def script_plot():
                               "(default:  %(default)s))")
     opt_grp.add_argument('--nocalculation', action='store_true',
                          help="Don't save calculation results beside figures")
+    opt_grp.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                         help="Number of processes to render and save "
+                              "figures with Agg backend, (default: 1)")
     opt_grp.add_argument('-V', '--version', action='store_true',
                          help='Print version and exit')
     opt_grp.add_argument('-h', '--help', action='store_true',
@@ -195,6 +262,8 @@ def script_plot():
         sys.exit()
     log.debug("GTC results directory(s) TODO: %s" % case_directories)
 
+    # import matplotlib engines after parsing, keep '--help' fast
+    from . import plot as gdp
     if not args.select:
         _yorn = input("Select all figures to plot! Continue(y/n)? ")
         if _yorn in ('Y', 'y', 'Yes', 'yes'):
@@ -208,6 +277,7 @@ def script_plot():
     log.debug("Common options: %s" % kwargs)
 
     savecalculation = not args.nocalculation
+    jobs = max(1, args.jobs)
 
     for _casedir in case_directories:
         log.info("Case directory: %s" % _casedir)
@@ -219,22 +289,32 @@ def script_plot():
         _figdir = os.path.join(_casedir, time.strftime('figures-%F-%H'))
         if not os.path.isdir(_figdir):
             os.mkdir(_figdir)
-        if savecalculation:
-            _calf = open(os.path.join(_figdir, 'calculation.txt'), 'w')
-            _calf.write("results = {\n")
-        for Name in sorted(case.gfigure_enabled):
-            fname = '%s.%s' % (Name.replace('/', '-'), args.extension)
-            try:
-                case.plot(Name, show=False)
-                case.savefig(Name, os.path.join(_figdir, fname))
-            except Exception:
-                continue
-            if savecalculation:
-                _calf.write("'%s': %s,\n" % (Name, case[Name].calculation))
-                _calf.flush()
-            case.disable(Name)
-        if savecalculation:
-            _calf.write("}\n")
-            _calf.close()
+        tasks = [(Name, os.path.join(_figdir, '%s.%s' % (
+                  Name.replace('/', '-'), args.extension)))
+                 for Name in sorted(case.gfigure_enabled)]
+        start = time.time()
+        calfile = os.path.join(_figdir, 'calculation.txt') \
+            if savecalculation else None
+        if jobs == 1:
+            nfigs = _save_results(
+                (_plot_one(case, Name, fpath) for Name, fpath in tasks),
+                calfile)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            log.info("Plotting %d figures with %d processes ..."
+                     % (len(tasks), jobs))
+            case.disable(*[Name for Name, fpath in tasks])
+            wkwargs = {'default_enable': []}
+            if 'figurestyle' in kwargs:
+                wkwargs['figurestyle'] = kwargs['figurestyle']
+            with ProcessPoolExecutor(
+                    max_workers=jobs, initializer=_plot_worker_init,
+                    initargs=(case.datafile, wkwargs)) as pool:
+                # results in the same order as tasks
+                results = pool.map(_plot_worker_task, *zip(*tasks)) \
+                    if tasks else []
+                nfigs = _save_results(results, calfile)
+        log.info("Plotted %d/%d figures of %s in %.3fs."
+                 % (nfigs, len(tasks), _casedir, time.time() - start))
 
     sys.exit()
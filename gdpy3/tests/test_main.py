@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import unittest
+import unittest.mock
+
+from .. import main
+from .. import plot as gdp
+from . import casedir
+
+
+def _style_of(case, Name, fpath):
+    return Name, list(case[Name].figurestyle), 0.0
+
+
+@unittest.skipUnless(os.path.isfile(os.path.join(casedir, 'gtc.out')),
+                     "Can't find 'gtc.out' in '%s'!" % casedir)
+class TestScriptPlot(unittest.TestCase):
+    '''
+    Test plot functions of gdpy3-plot
+    '''
+
+    def setUp(self):
+        self.style = ['ggplot']
+        case = gdp.pick(casedir)
+        self.Name = sorted(case.gfigure_available)[0]
+
+    def test_plot_jobs_figurestyle(self):
+        with unittest.mock.patch.object(main, '_plot_one', _style_of):
+            # serial
+            case = gdp.pick(casedir, default_enable=[self.Name],
+                            figurestyle=self.style)
+            serial = main._plot_one(case, self.Name, None)
+            # --jobs, task in worker
+            main._plot_worker_init(
+                casedir, {'default_enable': [], 'figurestyle': self.style})
+            worker = main._plot_worker_task(self.Name, None)
+        self.assertEqual(serial, worker)
+        self.assertEqual(worker[1], self.style)
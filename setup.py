@@ -48,12 +48,13 @@ setup(
         'Operating System :: OS Independent',
         'Operating System :: POSIX :: Linux',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
         'Topic :: Scientific/Engineering :: Physics',
         'Topic :: Scientific/Engineering :: Visualization'
     ),
+    python_requires='>=3.7',
     install_requires=[
         'numpy>=1.10.0',
         'matplotlib>=1.5.3',
@@ -72,6 +73,8 @@ setup(
         'console_scripts': [
             'gdpy3-convert = gdpy3.main:script_convert',
             'gdpy3-plot = gdpy3.main:script_plot',
+            'gdpy3-batch = gdpy3.batch:main',
+            'gdpy3-aggregate = gdpy3.aggregate:main',
         ],
         #'gui_scripts': [
         #    'gdpy3-gui = gdpy3.gui:start',
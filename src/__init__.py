@@ -11,3 +11,19 @@ __license__ = "MIT"
 __email__ = "shmilee.zju@gmail.com"
 __uri__ = "https://github.com/shmilee/gdpy3.git"
 __all__ = []
+
+_subpackages = ('glogger', 'gprofiler',
+                'loaders', 'savers', 'plotters', 'processors')
+
+
+def __getattr__(name):
+    '''Import subpackages on first access, like ``gdpy3.loaders``.'''
+    if name in _subpackages:
+        import importlib
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module '%s' has no attribute '%s'"
+                         % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_subpackages))
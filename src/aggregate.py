@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains aggregate store, which collects scalar results of many cases,
+like growth rates of modes or residual zonal flow in a parameter scan,
+into one columnar '.npz' file.
+
+Usage: python -m gdpy3.aggregate [options]... store path...
+'''
+
+import os
+import re
+import sys
+import argparse
+import tempfile
+
+from .glogger import getGLogger
+
+__all__ = ['AggregateStore']
+log = getGLogger('G')
+
+default_results = dict(
+    [('history/mode%d_phi' % i,
+      ['n', 'm', 'kthetarhoi', 'growth', 'omega1', 'omega2', 'omega3'])
+     for i in range(1, 9)]
+    + [('data1d/residual_zonal_flow',
+        ['krrhoi', 'krrho0', 'ZFres1', 'ZFres2',
+         'GAMgamma1', 'GAMgamma2', 'GAMomega1', 'GAMomega2'])])
+
+
+def _is_scalar(val):
+    import numpy
+    return (numpy.ndim(val) == 0 and not isinstance(val, (str, bytes))
+            and numpy.issubdtype(numpy.asarray(val).dtype, numpy.number))
+
+
+class AggregateStore(object):
+    '''
+    Columnar store of scalar results of many cases.
+
+    Each row is a case, indexed by its case path. Columns are:
+    'case', case path; 'mtime', modification time of the pck file;
+    'gtc/<key>', parameters of 'gtc.out' in group 'gtc';
+    '<group>/<fignum>/<key>', scalar results in figinfo calculation.
+    Missing values are NaN. Rows of cases are added or updated by
+    :meth:`add`, cases whose pck files are not modified are skipped.
+
+    Attributes
+    ----------
+    path: str, path of the '.npz' store file
+    params: list of 'gtc/<key>' to collect, or None for all scalars
+    results: dict, {'group/fignum': [keys in calculation]}
+    coreclasses: list of core classes to cook figures
+    columns: dict, {column name: list of values}
+
+    Parameters
+    ----------
+    path: str
+    params: list, optional
+    results: dict, default :data:`default_results`
+    coreclasses: list, default cores of GTC version '110922'
+    '''
+    __slots__ = ['path', 'params', 'results', 'coreclasses', 'columns',
+                 '_index']
+
+    def __init__(self, path, params=None, results=None, coreclasses=None):
+        if os.path.splitext(path)[1] != '.npz':
+            raise ValueError("Store path should end with '.npz', not '%s'!"
+                             % path)
+        self.path = path
+        self.params = params
+        self.results = default_results if results is None else results
+        if coreclasses is None:
+            from .processors.GTC import get_registry
+            coreclasses = get_registry('110922').coreclasses
+        self.coreclasses = coreclasses
+        self.columns = {'case': [], 'mtime': []}
+        if os.path.isfile(path):
+            log.debug("Load aggregate store %s ...", path)
+            import numpy
+            with numpy.load(path) as npz:
+                for name in npz.files:
+                    self.columns[name] = npz[name].tolist()
+        self._index = {c: i for i, c in enumerate(self.columns['case'])}
+
+    def __len__(self):
+        return len(self.columns['case'])
+
+    def __contains__(self, case):
+        return case in self._index
+
+    @property
+    def cases(self):
+        return tuple(self.columns['case'])
+
+    def _collect(self, pckloader):
+        '''Return {column name: value} of *pckloader*.'''
+        from .processors.cookscheduler import CookScheduler
+        row = {}
+        if self.params is None:
+            params = [k for k in pckloader.keys() if k.startswith('gtc/')]
+        else:
+            params = [k for k in self.params if k in pckloader]
+        for key, val in zip(params, pckloader.get_many(*params)):
+            if _is_scalar(val):
+                row[key] = val
+        if self.results:
+            scheduler = CookScheduler(pckloader, self.coreclasses, workers=1)
+            scheduler.add(*[n for n in self.results
+                            if n.rsplit('/', 1)[0] in pckloader.datagroups])
+            # skip figures without data, like residual zonal flow
+            names = [n for n, keys in scheduler.dag().items()
+                     if all(k in pckloader for k in keys)]
+            scheduler = CookScheduler(pckloader, self.coreclasses, workers=1)
+            scheduler.add(*names)
+            for name, figinfo in scheduler.run().items():
+                calculation = figinfo.calculation or {}
+                for key in self.results[name]:
+                    if _is_scalar(calculation.get(key, None)):
+                        row['%s/%s' % (name, key)] = calculation[key]
+        return row
+
+    def add(self, path, case=None, update=True):
+        '''
+        Collect results in pck file *path*, add them as row *case*.
+        *case* defaults to the directory of *path*.
+        If *update* is False, or the pck file is not modified,
+        the existing row is kept. Return True if the row is set.
+        '''
+        from .loaders import get_pckloader
+        if case is None:
+            case = os.path.dirname(os.path.abspath(path))
+        mtime = os.path.getmtime(path)
+        if case in self._index:
+            oldmtime = self.columns['mtime'][self._index[case]]
+            if not update or oldmtime == mtime:
+                log.debug("Case %s is up to date, skip.", case)
+                return False
+        log.info("Collecting results of case %s ...", case)
+        row = self._collect(get_pckloader(path))
+        row.update(case=case, mtime=mtime)
+        if case in self._index:
+            i = self._index[case]
+        else:
+            i = len(self)
+            self._index[case] = i
+            for values in self.columns.values():
+                values.append(float('nan'))
+        nrows = len(self)
+        for name, val in row.items():
+            if name not in self.columns:
+                self.columns[name] = [float('nan')] * nrows
+            self.columns[name][i] = val
+        for name in self.columns:
+            if name not in row:
+                self.columns[name][i] = float('nan')
+        return True
+
+    def add_many(self, *paths, update=True):
+        '''Add pck files *paths*. Return number of rows set.'''
+        n = 0
+        for path in paths:
+            try:
+                n += self.add(path, update=update)
+            except Exception:
+                log.error("Failed to add %s!", path, exc_info=1)
+        return n
+
+    def remove(self, case):
+        '''Remove row of *case*.'''
+        i = self._index.pop(case)
+        for values in self.columns.values():
+            del values[i]
+        self._index = {c: i for i, c in enumerate(self.columns['case'])}
+
+    def column(self, name):
+        '''Return column *name* as a numpy array.'''
+        import numpy
+        if name == 'case':
+            return numpy.array(self.columns[name], dtype=str)
+        return numpy.array(self.columns[name], dtype=float)
+
+    def select(self, **params):
+        '''
+        Return cases whose 'gtc/<key>' parameters are close to *params*,
+        like ``select(qiflux=1.4)``.
+        '''
+        import numpy
+        mask = numpy.ones(len(self), dtype=bool)
+        for key, val in params.items():
+            name = 'gtc/%s' % key
+            if name not in self.columns:
+                return []
+            mask &= numpy.isclose(self.column(name), val)
+        return [c for c, m in zip(self.columns['case'], mask) if m]
+
+    def save(self):
+        '''Write all columns to :attr:`path`, replace the old file.'''
+        import numpy
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmpfile = tempfile.mkstemp(
+            prefix=os.path.basename(self.path), suffix='.tmp', dir=dirname)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                numpy.savez(f, **{n: self.column(n) for n in self.columns})
+            os.replace(tmpfile, self.path)
+        except Exception:
+            os.remove(tmpfile)
+            raise
+        log.info("Saved %d cases, %d columns to %s.",
+                 len(self), len(self.columns), self.path)
+
+    def table(self, *names):
+        '''Return a table str of columns *names*, default 'gtc/*' ones.'''
+        names = names or sorted(n for n in self.columns
+                                if n.startswith('gtc/'))
+        columns = [self.column(n) for n in names]
+        width = max([len('case')] + [len(c) for c in self.columns['case']])
+        # each column as wide as its name
+        widths = [max(14, len(n)) for n in names]
+        lines = ['%-*s' % (width, 'case')
+                 + ''.join(' %*s' % (w, n) for w, n in zip(widths, names))]
+        for i, case in enumerate(self.columns['case']):
+            lines.append('%-*s' % (width, case) + ''.join(
+                ' %*.6g' % (w, c[i]) for w, c in zip(widths, columns)))
+        return '\n'.join(lines)
+
+
+def _find_pckfiles(path):
+    if os.path.isfile(path) or path.endswith('.pckdir'):
+        return [path]
+    files = []
+    pattern = re.compile(r'^gdpy3-pickled-data.*\.(?:npz|hdf5|pckdir)$')
+    for root, dirs, fnames in os.walk(path):
+        for f in fnames + [d for d in dirs if d.endswith('.pckdir')]:
+            if pattern.match(f):
+                files.append(os.path.join(root, f))
+        # chunks of '.pckdir' store
+        dirs[:] = [d for d in dirs if not d.endswith('.pckdir')]
+    return sorted(files)
+
+
+def main():
+    '''
+    Entry point for gdpy3-aggregate.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='gdpy3-aggregate',
+        description="Collect scalar results of many cases in a store.")
+    parser.add_argument('store', type=str, help="path of the '.npz' store")
+    parser.add_argument('path', nargs='*', type=str,
+                        help='pck files, or directories to walk for them')
+    parser.add_argument('--param', type=str, action='append',
+                        help="'gtc/<key>' parameters, (default: all)")
+    parser.add_argument('--noresults', action='store_true',
+                        help="only collect parameters")
+    parser.add_argument('--noupdate', action='store_true',
+                        help="keep rows of cases already in the store")
+    parser.add_argument('--show', type=str, action='append',
+                        metavar='COLUMN', help="columns to print")
+    args = parser.parse_args()
+    store = AggregateStore(args.store, params=args.param,
+                           results={} if args.noresults else None)
+    paths = [f for p in args.path for f in _find_pckfiles(p)]
+    if store.add_many(*paths, update=not args.noupdate):
+        store.save()
+    print(store.table(*(args.show or [])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains batch driver, which converts and plots many GTC cases
+in a shared process pool. Progress is checkpointed to a state file,
+so an interrupted batch resumes where it stopped.
+
+Usage: python -m gdpy3.batch [options]... casedir...
+'''
+
+import os
+import re
+import sys
+import json
+import time
+import heapq
+import argparse
+import concurrent.futures
+
+from .glogger import getGLogger
+
+__all__ = ['BatchDriver', 'find_cases', 'convert_case', 'plot_case']
+log = getGLogger('G')
+
+# top-level key written last by convert_case to a store which is not
+# atomic, like '.pckdir', marks a finished conversion
+donekey = 'converted'
+
+
+def find_cases(*paths):
+    '''Walk *paths*, return sorted GTC results directories.'''
+    cases = []
+    for path in paths:
+        for root, dirs, files in sorted(os.walk(path)):
+            if 'gtc.out' in files:
+                cases.append(root)
+    return cases
+
+
+def case_size(casedir, figdir='figures'):
+    '''
+    Return total size of raw files in *casedir* in bytes.
+    Outputs of stages, pickled data files and *figdir*, are skipped,
+    so the size is the same when the batch is run again.
+    '''
+    size = 0
+    for root, dirs, files in os.walk(casedir):
+        if root == casedir:
+            dirs[:] = [d for d in dirs if d != figdir]
+        # '.pckdir' store is a directory
+        dirs[:] = [d for d in dirs
+                   if not d.startswith('gdpy3-pickled-data')]
+        for f in files:
+            if f.startswith('gdpy3-pickled-data'):
+                continue
+            try:
+                size += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return size
+
+
+def _savefile(casedir, options):
+    return os.path.join(casedir, 'gdpy3-pickled-data%s'
+                        % options.get('extension', '.npz'))
+
+
+def is_converted(saver):
+    '''
+    Return True if conversion to the store of *saver* is finished.
+    An atomic saver renames '<path>.part' to *path* when all groups
+    are saved, so *path* without '.part' is a finished one, even if it was
+    saved by gdpy3-convert. Others need top-level key :data:`donekey`.
+    '''
+    path = saver.path
+    if not os.path.exists(path):
+        return False
+    if saver.atomic:
+        return not os.path.exists(path + '.part')
+    from .loaders import get_pckloader
+    try:
+        return donekey in get_pckloader(path)
+    except Exception:
+        log.warn("Failed to check pickled data %s.", path, exc_info=1)
+        return False
+
+
+def _dig_write(rawloader, task, saver):
+    '''Dig a task of :meth:`CoreRegistry.dig_tasks`, write its group.'''
+    cls, f, group = task
+    core = cls()
+    core.set_dig_args(rawloader, f, group, checked=True)
+    data = core.dig()
+    if data:
+        if not saver.write(core.group, data):
+            raise IOError("Failed to save group '%s'!" % core.group)
+        return 1
+    return 0
+
+
+def convert_case(casedir, options):
+    '''
+    Dig all raw files in *casedir* by cores of the GTC version,
+    then save them to a pickled data file, with precision policy
+    ``options['precision']``. With ``options['resume']``, default True,
+    a conversion stopped by crash goes on from the last saved group.
+    A finished conversion is skipped, unless ``options['overwrite']``,
+    see :func:`is_converted`.
+    If the saver supports concurrent groups, like '.pckdir', files are
+    dug and saved by ``options['digworkers']`` threads.
+    Return info dict.
+    '''
+    from .loaders import get_rawloader
+    from .savers import get_pcksaver
+    from .processors.GTC import get_registry
+    savefile = _savefile(casedir, options)
+    resume = options.get('resume', True)
+    saver = get_pcksaver(savefile, precision=options.get('precision', None),
+                         resume=resume)
+    converted = is_converted(saver)
+    if converted and not options.get('overwrite', False):
+        log.info("Pickled data file %s exists, skip.", savefile)
+        return {'savefile': savefile, 'ngroups': None}
+    rawloader = get_rawloader(casedir)
+    registry = get_registry(options.get('gtcver', '110922'))
+    tasks = registry.dig_tasks(rawloader)
+    workers = options.get('digworkers', 1)
+    # atomic saver replaces old file after all groups are saved, and
+    # resumes from '.part'; others resume in place, unless converted
+    saver.truncate = saver.atomic or converted or not resume
+    with saver:
+        ngroups = len(saver.donegroups - {''})
+        if '' not in saver.donegroups:
+            saver.write('', {'description': options.get('description', '')
+                             or 'GTC case %s' % os.path.basename(casedir)})
+        tasks = [t for t in tasks if t[2] not in saver.donegroups]
+        if workers > 1 and saver.concurrent_groups:
+            with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                ngroups += sum(pool.map(
+                    lambda task: _dig_write(rawloader, task, saver), tasks))
+        else:
+            ngroups += sum(_dig_write(rawloader, task, saver)
+                           for task in tasks)
+        if not saver.atomic and not saver.write('', {donekey: True}):
+            raise IOError("Failed to mark %s converted!" % savefile)
+    return {'savefile': savefile, 'ngroups': ngroups}
+
+
+def plot_case(casedir, options):
+    '''
+    Cook figures selected by patterns ``options['select']``, save them
+    and their calculation results in a figures directory of *casedir*.
+    Return info dict.
+    '''
+    from .loaders import get_pckloader
+    from .plotters import get_plotter
+    from .processors.GTC import get_registry
+    from .processors.cookscheduler import CookScheduler
+    pckloader = get_pckloader(_savefile(casedir, options), upcast=True)
+    registry = get_registry(options.get('gtcver', '110922'))
+    select = options.get('select', None) or ['.*']
+    scheduler = CookScheduler(pckloader, registry.coreclasses, workers=1)
+    names = []
+    for cls, groups in registry.match_groups(pckloader).items():
+        if 'cook' not in cls.instructions:
+            continue
+        for group in groups:
+            names.extend('%s/%s' % (group, n) for n in cls.get_figurenums()
+                         if any(re.match(p, '%s/%s' % (group, n))
+                                for p in select))
+    scheduler.add(*names)
+    figinfos = scheduler.run()
+    figdir = os.path.join(casedir, options.get('figdir', 'figures'))
+    if not os.path.isdir(figdir):
+        os.mkdir(figdir)
+    plotter = get_plotter('mpl::%s' % casedir, headless=True)
+    ext = options.get('figext', 'png')
+    nfigs = 0
+    with open(os.path.join(figdir, 'calculation.txt'), 'w') as calf:
+        calf.write("results = {\n")
+        for name in sorted(figinfos):
+            figinfo = figinfos[name]
+            if not figinfo.calculation:
+                continue
+            try:
+                axstructs, add_style = figinfo.serve(plotter)
+                plotter.create_figure(name, *axstructs, add_style=add_style)
+                plotter.save_figure(name, os.path.join(
+                    figdir, '%s.%s' % (name.replace('/', '-'), ext)))
+            except Exception:
+                log.error("Failed to plot figure '%s'!", name, exc_info=1)
+                continue
+            finally:
+                plotter.close_figure(name)
+            nfigs += 1
+            calf.write("'%s': %s,\n" % (name, figinfo.calculation))
+        calf.write("}\n")
+    return {'figdir': figdir, 'nfigs': nfigs}
+
+
+def _run_stage(function, casedir, options):
+    '''Call stage *function*, return (info, error, seconds).'''
+    start = time.time()
+    try:
+        return function(casedir, options), None, time.time() - start
+    except Exception as exc:
+        log.error("Failed to run %s of %s!", function.__name__, casedir,
+                  exc_info=1)
+        return None, '%s: %s' % (type(exc).__name__, exc), \
+            time.time() - start
+
+
+class BatchDriver(object):
+    '''
+    Run stages of many cases with a shared process pool.
+
+    Stages of a case run one by one, in the order of :attr:`stages`.
+    Stages of different cases run in parallel. Small cases, by total
+    size of their files, are scheduled first. At most *queuesize* tasks
+    are submitted to the pool at a time. After each task, the state
+    is saved in *statefile*, so done stages are skipped when the batch
+    is run again.
+
+    Attributes
+    ----------
+    cases: list of case directories
+    stages: list of stage names
+    stagefunctions: dict, stage name -> function(casedir, options)
+    state: dict, {casedir: {stage: {'status', 'seconds', 'info'}}}
+
+    Parameters
+    ----------
+    cases: list of case directories
+    statefile: str, path of the JSON state file, optional
+    stages: list of stage names, default all, ['convert', 'plot']
+    jobs: int, number of worker processes, default 1, no pool
+    queuesize: int, max submitted tasks, default 2 * jobs
+    options: dict, options passed to stage functions
+    '''
+    __slots__ = ['cases', 'stages', 'statefile', 'jobs', 'queuesize',
+                 'options', 'state', '_sizes']
+    stagefunctions = {'convert': convert_case, 'plot': plot_case}
+    allstages = ['convert', 'plot']
+
+    def __init__(self, cases, statefile=None, stages=None, jobs=1,
+                 queuesize=None, options=None):
+        stages = stages or self.allstages
+        for stage in stages:
+            if stage not in self.stagefunctions:
+                raise ValueError("Unknown stage: '%s'!" % stage)
+        self.cases = list(cases)
+        self.stages = [s for s in self.allstages if s in stages]
+        self.statefile = statefile
+        self.jobs = max(1, jobs)
+        self.queuesize = max(self.jobs, queuesize or 2 * self.jobs)
+        self.options = options or {}
+        self.state = {}
+        self._sizes = {}
+        if statefile and os.path.isfile(statefile):
+            with open(statefile, 'r') as f:
+                self.state = json.load(f)
+            log.info("Resume batch state from %s.", statefile)
+
+    def save_state(self):
+        '''Save :attr:`state` to *statefile*, replace the old one.'''
+        if not self.statefile:
+            return
+        tmp = '%s.%d.tmp' % (self.statefile, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.statefile)
+
+    def is_done(self, casedir, stage):
+        return self.state.get(casedir, {}).get(
+            stage, {}).get('status') == 'done'
+
+    def next_stage(self, casedir):
+        '''Return the first stage of *casedir* not done, or None.'''
+        for stage in self.stages:
+            if not self.is_done(casedir, stage):
+                return stage
+        return None
+
+    def _record(self, casedir, stage, info, error, seconds):
+        record = {'status': 'failed' if error else 'done',
+                  'seconds': round(seconds, 6), 'info': info}
+        if error:
+            record['error'] = error
+        self.state.setdefault(casedir, {})[stage] = record
+        self.save_state()
+        log.info("Case %s: %s %s in %.3fs.", casedir, stage,
+                 record['status'], seconds)
+        return not error
+
+    def run(self):
+        '''
+        Run all stages not done of all cases.
+        Return the number of failed tasks.
+        '''
+        ready = []
+        for casedir in self.cases:
+            stage = self.next_stage(casedir)
+            if stage is None:
+                continue
+            if casedir not in self._sizes:
+                self._sizes[casedir] = case_size(
+                    casedir, self.options.get('figdir', 'figures'))
+            heapq.heappush(ready, (self._sizes[casedir], casedir, stage))
+        log.info("Batch: %d cases to do, %d done.",
+                 len(ready), len(self.cases) - len(ready))
+        nfailed = 0
+        if self.jobs == 1:
+            while ready:
+                size, casedir, stage = heapq.heappop(ready)
+                result = _run_stage(self.stagefunctions[stage],
+                                    casedir, self.options)
+                if self._record(casedir, stage, *result):
+                    stage = self.next_stage(casedir)
+                    if stage:
+                        heapq.heappush(ready, (size, casedir, stage))
+                else:
+                    nfailed += 1
+            return nfailed
+        running = {}
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.jobs) as pool:
+            while ready or running:
+                while ready and len(running) < self.queuesize:
+                    size, casedir, stage = heapq.heappop(ready)
+                    future = pool.submit(
+                        _run_stage, self.stagefunctions[stage],
+                        casedir, self.options)
+                    running[future] = (size, casedir, stage)
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    size, casedir, stage = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        # worker died, like BrokenProcessPool
+                        result = (None, '%s: %s' % (type(exc).__name__, exc),
+                                  0.0)
+                    if self._record(casedir, stage, *result):
+                        stage = self.next_stage(casedir)
+                        if stage:
+                            heapq.heappush(ready, (size, casedir, stage))
+                    else:
+                        nfailed += 1
+        return nfailed
+
+    def summary(self):
+        '''Return a table str of per-case stage timings and status.'''
+        width = max([len('case')] + [len(c) for c in self.cases])
+        head = '%-*s %10s' % (width, 'case', 'size(MB)') + ''.join(
+            ' %10s' % s for s in self.stages) + '  status'
+        lines = [head, '-' * len(head)]
+        total = dict.fromkeys(self.stages, 0.0)
+        for casedir in self.cases:
+            if casedir not in self._sizes:
+                self._sizes[casedir] = case_size(
+                    casedir, self.options.get('figdir', 'figures'))
+            line = '%-*s %10.2f' % (width, casedir,
+                                    self._sizes[casedir] / 1024**2)
+            status = 'done'
+            for stage in self.stages:
+                record = self.state.get(casedir, {}).get(stage)
+                if record is None:
+                    line += ' %10s' % '-'
+                    status = 'todo' if status == 'done' else status
+                    continue
+                line += ' %10.3f' % record['seconds']
+                total[stage] += record['seconds']
+                if record['status'] != 'done':
+                    status = 'failed(%s)' % stage
+            lines.append(line + '  ' + status)
+        lines.append('-' * len(head))
+        lines.append('%-*s %10s' % (width, 'total', '') + ''.join(
+            ' %10.3f' % total[s] for s in self.stages))
+        return '\n'.join(lines)
+
+
+def main():
+    '''
+    Entry point for gdpy3-batch.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='gdpy3-batch',
+        description="Convert and plot many GTC cases in a process pool.")
+    parser.add_argument('casedir', nargs='+', type=str,
+                        help='directories to walk for GTC results')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        metavar='N', help="number of worker processes, "
+                        "(default: %(default)s)")
+    parser.add_argument('--queuesize', type=int, metavar='N',
+                        help="max tasks submitted to the pool, "
+                        "(default: 2*jobs)")
+    parser.add_argument('--state', type=str, metavar='FILE',
+                        default='gdpy3-batch-state.json',
+                        help="state file to checkpoint progress, "
+                        "(default: %(default)s)")
+    parser.add_argument('--stage', type=str, action='append',
+                        choices=BatchDriver.allstages,
+                        help="stages to run, (default: all)")
+    parser.add_argument('--extension', type=str, default='.npz',
+                        choices=['.npz', '.hdf5', '.pckdir'],
+                        help="extension of pickled data file, "
+                        "(default: %(default)s)")
+    parser.add_argument('--gtcver', type=str, default='110922',
+                        choices=['110922'],
+                        help="GTC code version, (default: %(default)s)")
+    parser.add_argument('--digworkers', type=int, default=1, metavar='N',
+                        help="threads to dig and save groups of a case, "
+                        "only for '.pckdir', (default: %(default)s)")
+    parser.add_argument('--float32', action='store_true',
+                        help='store large field and flux arrays as float32')
+    parser.add_argument('--noresume', action='store_true',
+                        help='convert again, not resume unfinished saving')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='overwrite existing pickled data file')
+    parser.add_argument('--select', type=str, action='append',
+                        help="patterns for selecting figures to plot, "
+                        "(default: all)")
+    parser.add_argument('--figext', type=str, default='png',
+                        choices=['png', 'pdf', 'ps', 'eps', 'svg', 'jpg'],
+                        help="extension of saved figures, "
+                        "(default: %(default)s)")
+    args = parser.parse_args()
+    cases = find_cases(*args.casedir)
+    if not cases:
+        log.error("Find NO GTC results directory in %s!", args.casedir)
+        return 1
+    options = {'extension': args.extension, 'gtcver': args.gtcver,
+               'overwrite': args.overwrite, 'select': args.select,
+               'figext': args.figext, 'digworkers': args.digworkers,
+               'resume': not args.noresume}
+    if args.float32:
+        from .savers.base import archive_precision
+        options['precision'] = archive_precision
+    driver = BatchDriver(cases, statefile=args.state, stages=args.stage,
+                         jobs=args.jobs, queuesize=args.queuesize,
+                         options=options)
+    nfailed = driver.run()
+    print(driver.summary())
+    return 1 if nfailed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
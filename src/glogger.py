@@ -11,12 +11,23 @@ Gdpy3's logger module.
 * [C]ore: processors
 * [E]xport: exporters
 * [P]lot: plotters
+
+Messages are formatted lazily, use ``log.ddebug(fmt, *args)``.
+
+Environment variables
+---------------------
+GDPY3_LOG_LEVEL: default level of loggers, 'DDEBUG', 'DEBUG', 'INFO', etc.
+GDPY3_LOG_QUEUE: '0' to write the log file in caller's thread,
+    otherwise records go through a queue to a listener thread.
 '''
 
 import os
+import queue
+import atexit
 import tempfile
 import logging
 import logging.config
+import logging.handlers
 
 # levels
 PARAMETER = 25
@@ -32,6 +43,26 @@ _levelToName = {
 for _k, _v in _levelToName.items():
     logging.addLevelName(_k, _v)
 
+
+def _check_level(level):
+    '''Return int *level*, or name of *level* if it is valid, else None.'''
+    if isinstance(level, str):
+        level = level.strip().upper()
+        if level.isdigit():
+            level = int(level)
+    if isinstance(level, int):
+        return level
+    if isinstance(logging.getLevelName(level), int):
+        return level
+    return None
+
+
+_env_level = os.environ.get('GDPY3_LOG_LEVEL', '') or 'DDEBUG'
+_default_level = _check_level(_env_level)
+if _default_level is None:
+    _default_level = 'DDEBUG'
+_queue_file = os.environ.get('GDPY3_LOG_QUEUE', '1') not in ('0', 'no')
+
 gloggerConfig = {
     'version': 1,
     'formatters': {
@@ -60,36 +91,37 @@ gloggerConfig = {
             'filename': os.path.join(tempfile.gettempdir(), 'gdpy3.log'),
             'maxBytes': 3 * 1024 * 1024,
             'backupCount': 9,
+            'delay': True,
         },
     },
     'loggers': {
         # gdpy3
         'G': {
-            'level': 'DDEBUG',
+            'level': _default_level,
             'handlers': ['console', 'file'],
             'propagate': False,
         },
         # gdpy3.loaders
         'L': {
-            'level': 'DDEBUG',
+            'level': _default_level,
             'handlers': ['console', 'file'],
             'propagate': False,
         },
         # gdpy3.savers
         'S': {
-            'level': 'DDEBUG',
+            'level': _default_level,
             'handlers': ['console', 'file'],
             'propagate': False,
         },
         # gdpy3.processors
         'C': {
-            'level': 'DDEBUG',
+            'level': _default_level,
             'handlers': ['console', 'file'],
             'propagate': False,
         },
         # gdpy3.plotters
         'P': {
-            'level': 'DDEBUG',
+            'level': _default_level,
             'handlers': ['console', 'file'],
             'propagate': False,
         },
@@ -139,5 +171,76 @@ def getGLogger(name):
     return logging.getLogger(name)
 
 
+def setGLoggerLevel(level, names=None):
+    '''
+    Set *level* of loggers *names*, default all loggers.
+    *level*: int or name, like 'DDEBUG', 'INFO'
+    Raises ValueError if *level* is unknown.
+    '''
+    checked = _check_level(level)
+    if checked is None:
+        raise ValueError("Unknown level: '%s'!" % level)
+    level = checked
+    for name in names or gloggerConfig['loggers']:
+        getGLogger(name).setLevel(level)
+
+
+_listener = None
+_listener_started = False
+
+
+def _start_queue_listener():
+    '''
+    Replace the file handler of loggers with a QueueHandler,
+    then the file handler is called by a QueueListener thread.
+    '''
+    global _listener, _listener_started
+    filehandler = None
+    for name in gloggerConfig['loggers']:
+        for h in logging.getLogger(name).handlers:
+            if h.get_name() == 'file':
+                filehandler = h
+    if filehandler is None:
+        return
+    qhandler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    qhandler.setLevel(filehandler.level)
+    for name in gloggerConfig['loggers']:
+        logger = logging.getLogger(name)
+        if filehandler in logger.handlers:
+            logger.removeHandler(filehandler)
+            logger.addHandler(qhandler)
+    _listener = logging.handlers.QueueListener(
+        qhandler.queue, filehandler, respect_handler_level=True)
+    _listener.start()
+    _listener_started = True
+    if hasattr(os, 'register_at_fork'):
+        # fork only after the listener thread has written all records,
+        # or the file stream may be copied locked
+        os.register_at_fork(before=_stop_queue_listener,
+                            after_in_parent=_restart_queue_listener,
+                            after_in_child=_restart_queue_listener)
+
+
+def _stop_queue_listener():
+    '''Flush queued records to the file, stop the listener thread.'''
+    global _listener_started
+    if _listener is not None and _listener_started:
+        _listener.stop()
+        _listener_started = False
+
+
+def _restart_queue_listener():
+    global _listener_started
+    if _listener is not None and not _listener_started:
+        _listener.start()
+        _listener_started = True
+
+
 logging.setLoggerClass(GLogger)
 logging.config.dictConfig(gloggerConfig)
+if _check_level(_env_level) is None:
+    logging.getLogger('G').warning(
+        "Unknown GDPY3_LOG_LEVEL '%s', use 'DDEBUG'.", _env_level)
+if _queue_file:
+    _start_queue_listener()
+    atexit.register(_stop_queue_listener)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Gdpy3's profiler module.
+
+Record wall time, bytes read or written and peak allocation of stages
+into a per-session :data:`report`.
+
+Stages
+------
+* rawload: :meth:`loaders.base.BaseRawLoader.getbuffer`, time of reading
+  the whole file; ``get``, time of opening the file, and bytes read in
+  the with block, whose time is counted by its caller, like dig
+* pckload: :meth:`loaders.base.BasePckLoader.get`, ``get_many``
+* dig, cook: :meth:`processors.basecore.BaseCore.dig`, ``cook``
+* save: :meth:`savers.base.BasePckSaver.write`
+* create, savefig: :meth:`plotters.base.BasePlotter.create_figure`,
+  ``save_figure``
+
+Switch
+------
+Set environment variable ``GDPY3_PROFILE`` before importing gdpy3,
+or call :func:`enable`, :func:`disable` at runtime.
+
+* unset, '' or '0': off, hooks only check a flag
+* '1' or 'time': record time and bytes
+* 'memory': also record peak allocation by tracemalloc, Python 3.9+
+
+Peak allocation is traced for the whole process, so a record of a stage
+also counts memory allocated by other threads at the same time.
+
+If ``GDPY3_PROFILE_OUTPUT`` is set, the report is saved to this JSON file
+at exit. Otherwise, the summary is logged at exit.
+'''
+
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+import contextlib
+import tracemalloc
+
+from .glogger import getGLogger
+
+__all__ = ['enable', 'disable', 'is_enabled', 'nbytes_of',
+           'measure', 'profile', 'Report', 'report']
+log = getGLogger('G')
+
+_state = {'enabled': False, 'memory': False, 'tracing': False}
+_local = threading.local()
+# peak of a block needs tracemalloc.reset_peak, Python 3.9+
+_can_reset_peak = hasattr(tracemalloc, 'reset_peak')
+
+
+def enable(memory=False):
+    '''
+    Start recording. Trace memory peak if *memory* is True,
+    ignored before Python 3.9.
+    '''
+    if memory and not _can_reset_peak:
+        log.warn("Memory peak needs Python 3.9+, record time only.")
+        memory = False
+    _state['memory'] = bool(memory)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state['tracing'] = True
+    _state['enabled'] = True
+
+
+def disable():
+    '''Stop recording, stop tracemalloc if started by :func:`enable`.'''
+    _state['enabled'] = False
+    if _state['tracing'] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _state['memory'], _state['tracing'] = False, False
+
+
+def is_enabled():
+    return _state['enabled']
+
+
+def nbytes_of(obj):
+    '''Return size of arrays, bytes, str in *obj*, dict, list or tuple.'''
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(nbytes_of(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes_of(v) for v in obj)
+    return 0
+
+
+class Report(object):
+    '''
+    Per-session records of stages.
+
+    Each record is a dict, {'stage', 'name', 'seconds', 'nbytes',
+    'peak_bytes'}. 'peak_bytes' is None if memory is not traced.
+    '''
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+
+    def query(self, stage=None, name=None):
+        '''Return records of *stage*, and *name* contains substring.'''
+        return [r for r in self.records
+                if (stage is None or r['stage'] == stage)
+                and (name is None or name in r['name'])]
+
+    def summary(self):
+        '''
+        Return {stage: {'count', 'seconds', 'nbytes', 'max_seconds',
+        'peak_bytes'}}, total seconds and bytes, max peak of each stage.
+        '''
+        result = {}
+        for r in self.records:
+            s = result.setdefault(r['stage'], dict(
+                count=0, seconds=0.0, nbytes=0, max_seconds=0.0,
+                peak_bytes=None))
+            s['count'] += 1
+            s['seconds'] += r['seconds']
+            s['nbytes'] += r['nbytes'] or 0
+            s['max_seconds'] = max(s['max_seconds'], r['seconds'])
+            if r['peak_bytes'] is not None:
+                s['peak_bytes'] = max(s['peak_bytes'] or 0, r['peak_bytes'])
+        return result
+
+    def format(self):
+        '''Return summary as a text table.'''
+        lines = ['%-8s %7s %12s %12s %14s %14s' % (
+            'stage', 'count', 'seconds', 'max seconds',
+            'bytes', 'peak bytes')]
+        for stage, s in sorted(self.summary().items()):
+            lines.append('%-8s %7d %12.4f %12.4f %14d %14s' % (
+                stage, s['count'], s['seconds'], s['max_seconds'],
+                s['nbytes'], '-' if s['peak_bytes'] is None
+                else s['peak_bytes']))
+        return '\n'.join(lines)
+
+    def dump(self, fpath):
+        '''Save records and summary to JSON file *fpath*.'''
+        with open(fpath, 'w') as f:
+            json.dump({'records': self.records, 'summary': self.summary()},
+                      f, indent=1)
+
+
+report = Report()
+
+
+@contextlib.contextmanager
+def measure(stage, name):
+    '''
+    Record the block as *stage* *name*. Yield a record dict,
+    set its 'nbytes' in the block. Yield None if profiling is off.
+    'peak_bytes' is the process-wide peak during the block, minus
+    the traced memory at its start.
+    '''
+    if not _state['enabled']:
+        yield None
+        return
+    record = dict(stage=stage, name=name, seconds=None,
+                  nbytes=None, peak_bytes=None)
+    memory = _state['memory'] and tracemalloc.is_tracing()
+    if memory:
+        # nested blocks reset the peak, so pass it up by a stack
+        stack = _local.__dict__.setdefault('stack', [])
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        frame = [current, 0]
+        stack.append(frame)
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = time.perf_counter() - start
+        if memory:
+            peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+            stack.pop()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            record['peak_bytes'] = peak - frame[0]
+        report.add(record)
+
+
+def _result_nbytes(result, *args, **kwargs):
+    return nbytes_of(result)
+
+
+def profile(stage, name=None, nbytes=_result_nbytes):
+    '''
+    Decorator of methods, record calls as *stage*.
+
+    Parameters
+    ----------
+    name: function(self, *args, **kwargs) returns record name
+        default, function name
+    nbytes: function(result, self, *args, **kwargs) returns bytes
+        default, :func:`nbytes_of` result, None to skip
+    '''
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return func(*args, **kwargs)
+            rname = name(*args, **kwargs) if name else func.__name__
+            with measure(stage, rname) as record:
+                result = func(*args, **kwargs)
+                if nbytes:
+                    record['nbytes'] = nbytes(result, *args, **kwargs)
+            return result
+        return wrapper
+    return decorator
+
+
+def _at_exit():
+    if not report.records:
+        return
+    output = os.environ.get('GDPY3_PROFILE_OUTPUT')
+    if output:
+        report.dump(output)
+    else:
+        log.info("Profile report:\n%s", report.format())
+
+
+_env = os.environ.get('GDPY3_PROFILE', '').lower()
+if _env not in ('', '0', 'off', 'false', 'no'):
+    enable(memory=(_env == 'memory'))
+atexit.register(_at_exit)
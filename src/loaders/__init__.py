@@ -29,9 +29,15 @@ It contains two kinds of loaders.
    :meth:`base.BasePckLoader.get_many`,
    :meth:`base.BaseLoader.find`,
    :meth:`base.BaseLoader.all_in_loader`.
+
+3. ``AsyncLoader``, :class:`aioloader.AsyncLoader` wraps a loader,
+   and has coroutines
+   :meth:`aioloader.AsyncLoader.aget`,
+   :meth:`aioloader.AsyncLoader.aget_many`.
 '''
 
 import os
+import importlib
 
 from ..glogger import getGLogger
 from . import base
@@ -41,8 +47,26 @@ log = getGLogger('L')
 rawloader_names = ['DirRawLoader', 'TarRawLoader', 'ZipRawLoader',
                    'SftpRawLoader']
 rawloader_types = ['directory', 'tarfile', 'zipfile', 'sftp.directory']
-pckloader_names = ['CachePckLoader', 'NpzPckLoader', 'Hdf5PckLoader']
-pckloader_types = ['.cache', '.npz', '.hdf5']
+pckloader_names = ['CachePckLoader', 'NpzPckLoader', 'Hdf5PckLoader',
+                   'DirPckLoader', 'CompositePckLoader']
+pckloader_types = ['.cache', '.npz', '.hdf5', '.pckdir']
+_lazy_modules = dict(zip(
+    rawloader_names + pckloader_names,
+    ['dirraw', 'tarraw', 'zipraw', 'sftpraw',
+     'cachepck', 'npzpck', 'hdf5pck', 'dirpck', 'compositepck']))
+_lazy_modules['AsyncLoader'] = 'aioloader'
+
+
+def __getattr__(name):
+    '''
+    Import loader classes on first access,
+    so h5py, paramiko etc. are only imported when needed.
+    '''
+    if name in _lazy_modules:
+        module = importlib.import_module('.' + _lazy_modules[name], __name__)
+        return getattr(module, name)
+    raise AttributeError("module '%s' has no attribute '%s'"
+                         % (__name__, name))
 
 
 def get_rawloader(path, filenames_filter=None):
@@ -91,9 +115,10 @@ def is_rawloader(obj):
     return isinstance(obj, base.BaseRawLoader)
 
 
-def get_pckloader(path, datagroups_filter=None):
+def get_pckloader(path, datagroups_filter=None, upcast=False):
     '''
     Given a file path or dict cache, return a pickled loader instance.
+    If *upcast* is True, float32 arrays are got as float64.
     Raises IOError if path not found, ValueError if path type not supported.
 
     Notes
@@ -101,24 +126,38 @@ def get_pckloader(path, datagroups_filter=None):
     *path* types:
     1. '.npz' file
     2. '.hdf5' file
-    3. dict object
+    3. '.pckdir' chunked directory
+    4. dict object
+    5. list or tuple of above paths or pckloaders, overlaid as one
     '''
 
-    if isinstance(path, dict):
+    if isinstance(path, (list, tuple)):
+        from .compositepck import CompositePckLoader
+        loader = CompositePckLoader(path, datagroups_filter=datagroups_filter,
+                                    upcast=upcast)
+    elif isinstance(path, dict):
         from .cachepck import CachePckLoader
-        loader = CachePckLoader(path, datagroups_filter=datagroups_filter)
+        loader = CachePckLoader(path, datagroups_filter=datagroups_filter,
+                                upcast=upcast)
     elif isinstance(path, str) and os.path.isfile(path):
         ext = os.path.splitext(path)[1]
         if ext == '.npz':
             from .npzpck import NpzPckLoader
-            loader = NpzPckLoader(path, datagroups_filter=datagroups_filter)
+            loader = NpzPckLoader(path, datagroups_filter=datagroups_filter,
+                                  upcast=upcast)
         elif ext == '.hdf5':
             from .hdf5pck import Hdf5PckLoader
-            loader = Hdf5PckLoader(path, datagroups_filter=datagroups_filter)
+            loader = Hdf5PckLoader(path, datagroups_filter=datagroups_filter,
+                                   upcast=upcast)
         else:
             raise ValueError('Unsupported Filetype: "%s"! '
                              'Did you mean one of: "%s"?'
                              % (ext, ', '.join(pckloader_types[1:])))
+    elif (isinstance(path, str) and os.path.isdir(path)
+            and os.path.splitext(path)[1] == '.pckdir'):
+        from .dirpck import DirPckLoader
+        loader = DirPckLoader(path, datagroups_filter=datagroups_filter,
+                              upcast=upcast)
     else:
         raise IOError("Can't find path '%s'!" % path)
     return loader
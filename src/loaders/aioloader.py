@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains asyncio facade of raw and pickled loaders.
+'''
+
+import asyncio
+import concurrent.futures
+try:
+    import asyncssh
+    HAVE_ASYNCSSH = True
+except ImportError:
+    HAVE_ASYNCSSH = False
+
+from ..glogger import getGLogger
+from .base import BaseRawLoader, BasePckLoader
+
+__all__ = ['AsyncLoader']
+log = getGLogger('L')
+
+
+class AsyncLoader(object):
+    '''
+    Asyncio facade of a rawloader or pckloader.
+
+    Blocking reads of the loader, like h5py, zip or paramiko, are run in
+    a thread pool of *concurrency* workers, and at most *concurrency*
+    reads are in flight, so many waiting coroutines need no more threads.
+    Coroutines asking for the same key share one read.
+
+    For :class:`sftpraw.SftpRawLoader`, if asyncssh is installed, files
+    are read by a native asyncio SFTP client, without threads.
+
+    Attributes
+    ----------
+    loader: rawloader or pckloader
+    concurrency: int, max reads in flight
+    executor: :class:`concurrent.futures.Executor`
+    native: bool, use native asyncio SFTP client or not
+
+    Parameters
+    ----------
+    loader: rawloader or pckloader
+    concurrency: int, default 8
+    executor: Executor, default a thread pool of *concurrency* workers,
+        shut down by :meth:`aclose`
+    native: bool, default True, use native SFTP client if possible
+
+    Notes
+    -----
+    1. :meth:`aget` of pckloader returns value, like :meth:`get`.
+    2. :meth:`aget` of rawloader returns bytes of the whole file.
+    3. Use ``async with`` statement, or remember to :meth:`aclose`.
+    '''
+    __slots__ = ['loader', 'concurrency', 'executor', 'native',
+                 '_own_executor', '_semaphore', '_inflight', '_sftp']
+
+    def __init__(self, loader, concurrency=8, executor=None, native=True):
+        if not isinstance(loader, (BaseRawLoader, BasePckLoader)):
+            raise ValueError("Not a rawloader or pckloader object!")
+        self.loader = loader
+        self.concurrency = concurrency
+        self._own_executor = executor is None
+        self.executor = executor or concurrent.futures.ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='gdpy3-aioloader')
+        self.native = (native and HAVE_ASYNCSSH
+                       and hasattr(loader, '_connect_kwargs'))
+        self._semaphore = None
+        self._inflight = {}
+        self._sftp = None
+
+    def _get_semaphore(self):
+        # created in the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def _read_raw(self, key):
+        with self.loader.getbuffer(key) as buf:
+            return bytes(buf)
+
+    async def _connect(self):
+        kwargs = self.loader._connect_kwargs()
+        log.debug("Connect asyncssh SFTP client to %s.", kwargs['host'])
+        conn = await asyncssh.connect(known_hosts=None, **kwargs)
+        try:
+            sftp = await conn.start_sftp_client()
+        except BaseException:
+            conn.close()
+            raise
+        return conn, sftp
+
+    async def _get_sftp(self):
+        if self._sftp is None:
+            # concurrent first reads share one connection
+            self._sftp = asyncio.ensure_future(self._connect())
+        task = self._sftp
+        try:
+            conn, sftp = await asyncio.shield(task)
+        except Exception:
+            # connect again next time
+            if self._sftp is task:
+                self._sftp = None
+            raise
+        return sftp
+
+    async def _read_sftp(self, key):
+        if key not in self.loader:
+            raise KeyError("%s is not in '%s'" % (key, self.loader.path))
+        sftp = await self._get_sftp()
+        path = self.loader._sep.join([self.loader.rmt_path, key])
+        async with sftp.open(path, 'rb') as f:
+            return await f.read()
+
+    async def _run(self, function, *args):
+        async with self._get_semaphore():
+            if self.native:
+                return await self._read_sftp(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, function, *args)
+
+    async def aget(self, key):
+        '''Get value of pckloader, or bytes of rawloader, by *key*.'''
+        if isinstance(self.loader, BasePckLoader):
+            if key in self.loader.cache:
+                return self.loader.cache[key]
+            function = self.loader.get
+        else:
+            function = self._read_raw
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(function, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None))
+        # one cancelled waiter does not cancel the shared read
+        return await asyncio.shield(task)
+
+    async def aget_many(self, *keys):
+        '''
+        Get values by *keys*. Return a tuple of values.
+        Keys of pckloader not cached are read by one :meth:`get_many`.
+        '''
+        if isinstance(self.loader, BasePckLoader):
+            todo = [k for k in keys if k not in self.loader.cache
+                    and k not in self._inflight]
+            if len(todo) > 1:
+                await self._run(self.loader.get_many, *todo)
+        return tuple(await asyncio.gather(*[self.aget(k) for k in keys]))
+
+    async def aclose(self):
+        '''Close SFTP client and the thread pool owned by facade.'''
+        if self._sftp is not None:
+            task, self._sftp = self._sftp, None
+            try:
+                conn, sftp = await task
+            except Exception:
+                pass
+            else:
+                sftp.exit()
+                conn.close()
+                await conn.wait_closed()
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def __repr__(self):
+        return '<{0}.{1} object at {2} for {3!r}>'.format(
+            self.__module__, type(self).__name__, hex(id(self)), self.loader)
@@ -9,14 +9,25 @@ Contains loader base class.
 import os
 import re
 import types
+import threading
 import contextlib
+import concurrent.futures
 
 from ..glogger import getGLogger
+from ..gprofiler import measure, profile
 
 __all__ = ['BaseLoader', 'BaseRawLoader', 'BasePckLoader']
 log = getGLogger('L')
 
 
+def _tell(fileobj):
+    '''Return position of *fileobj*, None if not supported.'''
+    try:
+        return fileobj.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
 class BaseLoader(object):
     '''
     Base class of BaseRawLoader, BasePckLoader.
@@ -112,7 +123,7 @@ class BaseLoader(object):
         result = True
         for i in items:
             if i not in loaderkeys:
-                log.warn("Key '%s' not in %s!" % (i, self.path))
+                log.warn("Key '%s' not in %s!", i, self.path)
                 result = False
         return result
 
@@ -146,30 +157,40 @@ class BaseRawLoader(BaseLoader):
     1. Method *get()* must be used as with statement context managers.
     2. File-like object which returned by *get()* must has close method,
        and read, readline, or readlines.
+    3. Method *getbuffer()* is like *get()*, but gets a bytes-like object
+       of the whole file, which supports slicing, find and rfind,
+       like bytes or read-only :class:`mmap.mmap`.
     '''
-    __slots__ = ['path', 'filenames']
+    __slots__ = ['path', 'filenames', '_filenameset']
 
     def __init__(self, path, filenames_filter=None):
         super(BaseRawLoader, self).__init__(path)
         try:
-            log.debug("Open path %s." % self.path)
+            log.debug("Open path %s.", self.path)
             tmpobj = self._special_open()
-            log.debug("Getting filenames from %s ..." % self.path)
+            log.debug("Getting filenames from %s ...", self.path)
             filenames = tuple(self._special_getkeys(tmpobj))
             if isinstance(filenames_filter, types.FunctionType):
                 filenames = [k for k in filenames if filenames_filter(k)]
             self.filenames = tuple(sorted(filenames))
+            self._filenameset = frozenset(self.filenames)
         except (IOError, ValueError):
-            log.critical("Failed to read path %s." % self.path, exc_info=1)
+            log.critical("Failed to read path %s.", self.path, exc_info=1)
             raise
         finally:
             if 'tmpobj' in dir():
-                log.debug("Close path %s." % self.path)
+                log.debug("Close path %s.", self.path)
                 self._special_close(tmpobj)
 
     def keys(self):
         return self.filenames
 
+    def __contains__(self, item):
+        '''
+        Return true if item is in loader, false otherwise.
+        '''
+        return item in self._filenameset
+
     @contextlib.contextmanager
     def get(self, key):
         '''
@@ -179,21 +200,70 @@ class BaseRawLoader(BaseLoader):
         if key not in self.filenames:
             raise KeyError("%s is not in '%s'" % (key, self.path))
         try:
-            log.debug("Open path %s." % self.path)
+            log.debug("Open path %s.", self.path)
             tmpobj = self._special_open()
-            log.debug("Getting file '%s' from %s ..." % (key, self.path))
-            fileobj = self._special_get(tmpobj, key)
+            log.debug("Getting file '%s' from %s ...", key, self.path)
+            with measure('rawload', key) as record:
+                fileobj = self._special_get(tmpobj, key)
             yield fileobj
+            if record is not None:
+                # bytes read in the with block, not its time
+                record['nbytes'] = _tell(fileobj)
         except (IOError, ValueError):
-            log.critical("Failed to get '%s' from %s!" %
-                         (key, self.path), exc_info=1)
+            log.critical("Failed to get '%s' from %s!",
+                         key, self.path, exc_info=1)
             raise
         finally:
             if 'fileobj' in dir():
-                log.debug("Close file %s in path %s." % (key, self.path))
+                log.debug("Close file %s in path %s.", key, self.path)
                 fileobj.close()
             if 'tmpobj' in dir():
-                log.debug("Close path %s." % self.path)
+                log.debug("Close path %s.", self.path)
+                self._special_close(tmpobj)
+
+    def _special_getbuffer(self, tmpobj, key):
+        '''
+        Return bytes-like object of file *key*.
+        Default, read all bytes of file-like object from :meth:`get`.
+        '''
+        fileobj = self._special_get(tmpobj, key)
+        try:
+            return getattr(fileobj, 'buffer', fileobj).read()
+        finally:
+            fileobj.close()
+
+    @contextlib.contextmanager
+    def getbuffer(self, key):
+        '''
+        Get bytes-like object of the whole file *key*.
+        A function for with statement context managers.
+        '''
+        if key not in self._filenameset:
+            raise KeyError("%s is not in '%s'" % (key, self.path))
+        try:
+            log.debug("Open path %s.", self.path)
+            tmpobj = self._special_open()
+            log.debug("Getting buffer of file '%s' from %s ...",
+                      key, self.path)
+            with measure('rawload', key) as record:
+                buf = self._special_getbuffer(tmpobj, key)
+                if record is not None:
+                    record['nbytes'] = len(buf)
+            yield buf
+        except (IOError, ValueError):
+            log.critical("Failed to get '%s' from %s!",
+                         key, self.path, exc_info=1)
+            raise
+        finally:
+            if 'buf' in dir() and hasattr(buf, 'close'):
+                log.debug("Close buffer of file %s.", key)
+                try:
+                    buf.close()
+                except BufferError:
+                    # views of buffer still exist, leave it to gc
+                    log.debug("Buffer of file %s is still in use.", key)
+            if 'tmpobj' in dir():
+                log.debug("Close path %s.", self.path)
                 self._special_close(tmpobj)
 
 
@@ -215,6 +285,10 @@ class BasePckLoader(BaseLoader):
     desc: alias description
     cache: dict
         cached datakeys from file
+        Loader is thread-safe, concurrent :meth:`get` of the same key
+        reads it once, other threads wait for the result.
+    upcast: bool
+        upcast float32 arrays to float64 or not
 
     Parameters
     ----------
@@ -223,9 +297,13 @@ class BasePckLoader(BaseLoader):
     datagroups_filter: function
         a function to filter datagroups
         example, lambda group: False if group in ['ex1', 'ex2'] else True
+    upcast: bool
+        get float32 arrays, saved with a precision policy of
+        :class:`gdpy3.savers.base.BasePckSaver`, as float64, default False
     '''
     __slots__ = ['path', 'datakeys', 'datagroups',
-                 'desc', 'description', 'cache']
+                 'desc', 'description', 'cache', 'upcast',
+                 '_lock', '_inflight']
 
     def _special_getgroups(self, tmpobj):
         '''
@@ -233,96 +311,136 @@ class BasePckLoader(BaseLoader):
         '''
         return set(os.path.dirname(k) for k in self.datakeys)
 
-    def __init__(self, path, datagroups_filter=None):
+    def __init__(self, path, datagroups_filter=None, upcast=False):
         super(BasePckLoader, self).__init__(path)
+        self.upcast = upcast
         try:
-            log.debug("Open path %s." % self.path)
+            log.debug("Open path %s.", self.path)
             tmpobj = self._special_open()
-            log.debug("Getting datakeys from %s ..." % self.path)
+            log.debug("Getting datakeys from %s ...", self.path)
             self.datakeys = tuple(self._special_getkeys(tmpobj))
-            log.debug("Getting datagroups from %s ..." % self.path)
+            log.debug("Getting datagroups from %s ...", self.path)
             datagroups = list(self._special_getgroups(tmpobj))
             if isinstance(datagroups_filter, types.FunctionType):
                 datagroups = list(filter(datagroups_filter, datagroups))
             if '' in datagroups:
                 datagroups.remove('')
             self.datagroups = tuple(sorted(datagroups))
-            log.debug("Getting description of %s ..." % self.path)
+            log.debug("Getting description of %s ...", self.path)
             if 'description' in self.datakeys:
                 self.desc = str(self._special_get(tmpobj, 'description'))
             else:
                 self.desc = None
             self.description = self.desc
         except (IOError, ValueError):
-            log.critical("Failed to read path %s." % self.path, exc_info=1)
+            log.critical("Failed to read path %s.", self.path, exc_info=1)
             raise
         finally:
             if 'tmpobj' in dir():
-                log.debug("Close path %s." % self.path)
+                log.debug("Close path %s.", self.path)
                 self._special_close(tmpobj)
         self.cache = {}
+        self._lock = threading.Lock()
+        self._inflight = {}
 
     def keys(self):
         return self.datakeys
 
+    def _upcast(self, value):
+        '''Return float64 *value* if it is float32 and :attr:`upcast`.'''
+        if self.upcast and getattr(value, 'dtype', None) == 'float32':
+            if value.ndim == 0:
+                return float(value)
+            return value.astype('float64')
+        return value
+
     def groups(self):
         return self.datagroups
 
-    def get(self, key):
+    def _load_many(self, keys):
         '''
-        Get value by ``key`.
+        Read values of *keys* from path object. Return a list of values.
         '''
-        if key not in self.datakeys:
-            raise KeyError("%s is not in '%s'" % (key, self.path))
-        if key in self.cache:
-            return self.cache[key]
+        values = []
         try:
-            log.debug("Open path %s." % self.path)
+            log.debug("Open path %s.", self.path)
             tmpobj = self._special_open()
-            log.debug("Getting key '%s' from %s ..." % (key, self.path))
-            value = self._special_get(tmpobj, key)
-            self.cache[key] = value
+            for key in keys:
+                log.debug("Getting key '%s' from %s ...", key, self.path)
+                values.append(self._upcast(self._special_get(tmpobj, key)))
         except (IOError, ValueError):
-            log.critical("Failed to get '%s' from %s!" %
-                         (key, self.path), exc_info=1)
+            if 'key' in dir():
+                log.critical("Failed to get '%s' from %s!",
+                             key, self.path, exc_info=1)
+            else:
+                log.critical("Failed to open '%s'!", self.path, exc_info=1)
             raise
         finally:
             if 'tmpobj' in dir():
-                log.debug("Close path %s." % self.path)
+                log.debug("Close path %s.", self.path)
                 self._special_close(tmpobj)
-        return value
+        return values
+
+    def _get_many(self, keys):
+        '''
+        Get values of *keys* from cache, or read them by :meth:`_load_many`.
+        Keys being read by other threads are waited for, not read again.
+        '''
+        result, mine, others = {}, [], {}
+        with self._lock:
+            for key in keys:
+                if key in result or key in others or key in mine:
+                    continue
+                if key in self.cache:
+                    result[key] = self.cache[key]
+                elif key in self._inflight:
+                    others[key] = self._inflight[key]
+                else:
+                    self._inflight[key] = concurrent.futures.Future()
+                    mine.append(key)
+        if mine:
+            try:
+                values = self._load_many(mine)
+            except BaseException as exc:
+                with self._lock:
+                    futures = [self._inflight.pop(k) for k in mine]
+                for future in futures:
+                    future.set_exception(exc)
+                raise
+            with self._lock:
+                self.cache.update(zip(mine, values))
+                futures = [self._inflight.pop(k) for k in mine]
+            for future, value in zip(futures, values):
+                future.set_result(value)
+            result.update(zip(mine, values))
+        for key, future in others.items():
+            log.debug("Waiting for key '%s' read by other thread.", key)
+            result[key] = future.result()
+        return tuple(result[k] for k in keys)
+
+    @profile('pckload', name=lambda self, key: key)
+    def get(self, key):
+        '''
+        Get value by ``key`.
+        '''
+        if key not in self.datakeys:
+            raise KeyError("%s is not in '%s'" % (key, self.path))
+        return self._get_many((key,))[0]
 
     __getitem__ = get
 
+    @profile('pckload', name=lambda self, *keys: '%d keys' % len(keys))
     def get_many(self, *keys):
         '''
         Get values by ``keys``. Return a tuple of values.
         '''
-        result = [self.cache[k] if k in self.cache else None for k in keys]
-        idxtodo = [i for i, k in enumerate(result) if k is None]
-        if len(idxtodo) == 0:
-            return tuple(result)
-        try:
-            log.debug("Open path %s." % self.path)
-            tmpobj = self._special_open()
-            for i in idxtodo:
-                key = keys[i]
-                log.debug("Getting key '%s' from %s ..." % (key, self.path))
-                value = self._special_get(tmpobj, key)
-                result[i] = value
-                self.cache[key] = value
-        except (IOError, ValueError):
-            if 'key' in dir():
-                log.critical("Failed to get '%s' from %s!" %
-                             (key, self.path), exc_info=1)
+        return self._get_many(keys)
+
+    def clear_cache(self, *keys):
+        '''Remove cached *keys*, default all keys.'''
+        with self._lock:
+            if keys:
+                for key in keys:
+                    self.cache.pop(key, None)
             else:
-                log.critical("Failed to open '%s'!" % self.path, exc_info=1)
-            raise
-        finally:
-            if 'tmpobj' in dir():
-                log.debug("Close path %s." % self.path)
-                self._special_close(tmpobj)
-        return tuple(result)
-
-    def clear_cache(self):
-        self.cache = {}
+                self.cache = {}
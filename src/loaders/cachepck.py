@@ -34,7 +34,7 @@ class CachePckLoader(BasePckLoader):
             self.path = 'dict.cache'
             return True
         else:
-            log.error("'%s' is not a dict!" % self.path)
+            log.error("'%s' is not a dict!", self.path)
             return False
 
     def _special_open(self):
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains composite pickled data loader class.
+'''
+
+from ..glogger import getGLogger
+from .base import BasePckLoader
+
+__all__ = ['CompositePckLoader']
+log = getGLogger('L')
+
+
+class CompositePckLoader(BasePckLoader):
+    '''
+    Overlay several pckloaders as one virtual case.
+    Return a dictionary-like object.
+
+    A case may be split into files, like snapshots in one file,
+    history and data1d in another. Keys of all loaders are indexed
+    once, then each :meth:`get` is routed to the loader which has the
+    key, and :meth:`get_many` reads keys of each loader in one batch.
+    If a key is in more than one loader, the first loader wins.
+
+    Attributes
+    ----------
+    loaders: tuple of pckloaders, in order
+
+    Parameters
+    ----------
+    path: list or tuple of pckloaders, or paths for :func:`get_pckloader`
+    datagroups_filter: function
+    upcast: bool, also passed to loaders got from paths
+
+    Notes
+    -----
+    *path* is set to 'composite.pck', like :class:`CachePckLoader`.
+    '''
+    __slots__ = ['loaders', '_route']
+
+    def __init__(self, path, datagroups_filter=None, upcast=False):
+        self.upcast = upcast
+        super(CompositePckLoader, self).__init__(
+            path, datagroups_filter=datagroups_filter, upcast=upcast)
+
+    def _check_path_access(self, path):
+        from . import get_pckloader, is_pckloader
+        if not isinstance(path, (list, tuple)):
+            return False
+        self.loaders = tuple(
+            p if is_pckloader(p) else get_pckloader(p, upcast=self.upcast)
+            for p in path)
+        return True
+
+    def _special_check_path(self):
+        if self.loaders:
+            log.debug("Composite of %s.",
+                      ', '.join(str(l.path) for l in self.loaders))
+            self.path = 'composite.pck'
+            return True
+        else:
+            log.error("No pckloader to compose!")
+            return False
+
+    def _special_open(self):
+        return self.loaders
+
+    def _special_close(self, tmpobj):
+        pass
+
+    def _special_getkeys(self, tmpobj):
+        self._route = {}
+        for i, loader in enumerate(tmpobj):
+            for key in loader.keys():
+                if key in self._route:
+                    log.debug("Key '%s' in %s is covered.", key, loader.path)
+                else:
+                    self._route[key] = i
+        return list(self._route)
+
+    def _special_getgroups(self, tmpobj):
+        groups = set()
+        for loader in tmpobj:
+            groups.update(loader.datagroups)
+        return groups
+
+    def _special_get(self, tmpobj, key):
+        return tmpobj[self._route[key]].get(key)
+
+    def route(self, key):
+        '''Return the pckloader which has *key*.'''
+        return self.loaders[self._route[key]]
+
+    def _load_many(self, keys):
+        '''
+        Read values of *keys* by :meth:`get_many` of their loaders,
+        one batch for each loader.
+        '''
+        bybackend = {}
+        for key in keys:
+            if key not in self._route:
+                raise KeyError("%s is not in '%s'" % (key, self.path))
+            bybackend.setdefault(self._route[key], []).append(key)
+        values = {}
+        for i, todo in sorted(bybackend.items()):
+            loader = self.loaders[i]
+            log.debug("Getting %d keys from %s ...", len(todo), loader.path)
+            for key, value in zip(todo, loader.get_many(*todo)):
+                values[key] = self._upcast(value)
+        return [values[k] for k in keys]
+
+    def clear_cache(self, *keys):
+        super(CompositePckLoader, self).clear_cache(*keys)
+        for loader in self.loaders:
+            loader.clear_cache(*keys)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains chunked directory pickled data loader class.
+'''
+
+import os
+import json
+import zlib
+import pickle
+
+from ..glogger import getGLogger
+from .base import BasePckLoader
+
+__all__ = ['DirPckLoader']
+log = getGLogger('L')
+
+_marker = '.pckdir.json'
+_groupmeta = '.group.json'
+
+
+class DirPckLoader(BasePckLoader):
+    '''
+    Load arrays from ``.pckdir`` chunked directory store, written by
+    :class:`gdpy3.savers.dirpck.DirPckSaver`.
+    Return a dictionary-like object.
+
+    Arrays are split along the first axis into chunk files,
+    :meth:`get_rows` reads only the chunks of the rows needed.
+
+    Notes
+    -----
+    Q: How to read data from .pckdir directory?
+    A: '<group>/.group.json' has metadata of keys in group,
+       '<group>/<key>/<i>' is zlib compressed bytes of chunk i.
+    '''
+    __slots__ = ['_meta']
+
+    def _special_check_path(self):
+        if os.path.isfile(os.path.join(self.path, _marker)):
+            return True
+        else:
+            log.error("'%s' is not a pckdir store!", self.path)
+            return False
+
+    def _special_open(self):
+        return self.path
+
+    def _special_close(self, tmpobj):
+        pass
+
+    def _special_getkeys(self, tmpobj):
+        self._meta = {}
+        for root, dirs, files in os.walk(tmpobj):
+            # skip temporary and key directories
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            if _groupmeta not in files:
+                continue
+            with open(os.path.join(root, _groupmeta)) as f:
+                meta = json.load(f)
+            dirs[:] = [d for d in dirs if d not in meta]
+            group = os.path.relpath(root, tmpobj).replace(os.sep, '/')
+            for key, info in meta.items():
+                fullkey = key if group == '.' else group + '/' + key
+                self._meta[fullkey] = info
+        return sorted(self._meta)
+
+    def _read_chunk(self, key, index):
+        with open(os.path.join(self.path, key, str(index)), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def _special_get(self, tmpobj, key):
+        info = self._meta[key]
+        if info['kind'] == 'json':
+            return info['value']
+        if info['kind'] == 'pickle':
+            value = pickle.loads(self._read_chunk(key, 0))
+        else:
+            value = self._read_rows(key, info, 0, info['nchunks'])
+        if value.size == 1:
+            value = value.item()
+        return value
+
+    def _read_rows(self, key, info, first, last):
+        '''Read chunks [first, last) of array *key* in one array.'''
+        import numpy
+        dtype = numpy.lib.format.descr_to_dtype(info['dtype'])
+        shape = info['shape']
+        if not shape:
+            return numpy.frombuffer(self._read_chunk(key, 0),
+                                    dtype=dtype).reshape(())
+        rows = info['chunkrows']
+        start, stop = first * rows, min(last * rows, shape[0])
+        out = numpy.empty([max(stop - start, 0)] + shape[1:], dtype=dtype)
+        flat = out.reshape(-1).view(numpy.uint8)
+        pos = 0
+        for i in range(first, last):
+            buf = self._read_chunk(key, i)
+            flat[pos:pos + len(buf)] = numpy.frombuffer(buf, numpy.uint8)
+            pos += len(buf)
+        return out
+
+    def chunkinfo(self, key):
+        '''
+        Return metadata dict of *key*, 'kind', and for arrays 'shape',
+        'dtype', 'chunkrows', rows in one chunk, 'nchunks'.
+        '''
+        if key not in self.datakeys:
+            raise KeyError("%s is not in '%s'" % (key, self.path))
+        return dict(self._meta[key])
+
+    def get_rows(self, key, start=None, stop=None):
+        '''
+        Get rows [*start*, *stop*) of array *key*, along the first axis.
+        Only chunks of these rows are read, and they are not cached.
+        '''
+        info = self.chunkinfo(key)
+        if key in self.cache or info['kind'] != 'array' or not info['shape']:
+            return self.get(key)[start:stop]
+        start, stop, _ = slice(start, stop).indices(info['shape'][0])
+        if stop <= start:
+            return self._read_rows(key, info, 0, 0)
+        rows = info['chunkrows']
+        first, last = start // rows, -(-stop // rows)
+        value = self._read_rows(key, info, first, last)
+        return value[start - first * rows:stop - first * rows]
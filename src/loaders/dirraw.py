@@ -7,6 +7,7 @@ Contains directory raw loader class.
 '''
 
 import os
+import mmap
 
 from ..glogger import getGLogger
 from .base import BaseRawLoader
@@ -19,17 +20,28 @@ class DirRawLoader(BaseRawLoader):
     '''
     Load raw data from a directory. Return a dictionary-like object.
 
+    Attributes
+    ----------
+    use_mmap: bool
+        :meth:`getbuffer` returns read-only :class:`mmap.mmap` of files,
+        so bytes are paged in by OS, not copied. Default True.
+
     Notes
     -----
     Directory tree maxdepth is 2.
     '''
-    __slots__ = []
+    __slots__ = ['use_mmap']
+
+    def __init__(self, path, filenames_filter=None, use_mmap=True):
+        self.use_mmap = use_mmap
+        super(DirRawLoader, self).__init__(
+            path, filenames_filter=filenames_filter)
 
     def _special_check_path(self):
         if os.path.isdir(self.path):
             return True
         else:
-            log.error("'%s' is not a directory!" % self.path)
+            log.error("'%s' is not a directory!", self.path)
             return False
 
     def _special_open(self):
@@ -53,3 +65,12 @@ class DirRawLoader(BaseRawLoader):
 
     def _special_get(self, tmpobj, key):
         return open(os.path.join(self.path, key))
+
+    def _special_getbuffer(self, tmpobj, key):
+        with open(os.path.join(self.path, key), 'rb') as f:
+            if not self.use_mmap:
+                return f.read()
+            if os.fstat(f.fileno()).st_size == 0:
+                # empty file can't be mapped
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
@@ -39,7 +39,7 @@ class Hdf5PckLoader(BasePckLoader):
         if h5py.is_hdf5(self.path):
             return True
         else:
-            log.error("'%s' is not a valid HDF5 file!" % self.path)
+            log.error("'%s' is not a valid HDF5 file!", self.path)
             return False
 
     def _special_open(self):
@@ -34,7 +34,7 @@ class NpzPckLoader(BasePckLoader):
         if zipfile.is_zipfile(self.path):
             return True
         else:
-            log.error("'%s' is not a ZIP file!" % self.path)
+            log.error("'%s' is not a ZIP file!", self.path)
             return False
 
     def _special_open(self):
@@ -53,7 +53,7 @@ class SftpRawLoader(BaseRawLoader):
         if (len(tpath) != 2 or not isinstance(tpath[0], str)
                 or not tpath[0].startswith('sftp://')
                 or not isinstance(tpath[1], str)):
-            log.error("Wrong format of sftp path: %s" % path)
+            log.error("Wrong format of sftp path: %s", path)
             return False
         u = urllib.parse.urlparse(tpath[0])
         self.user = u.username
@@ -69,23 +69,28 @@ class SftpRawLoader(BaseRawLoader):
             sftp.close()
             return True
         except Exception as e:
-            log.error("Sftp transport error: %s" % e)
+            log.error("Sftp transport error: %s", e)
             try:
                 self.transport.close()
             except:
                 pass
             return False
 
+    def _connect_kwargs(self):
+        '''Return keyword arguments to connect the SSH server again.'''
+        return dict(host=self.host, port=self.port,
+                    username=self.user, password=self.__passwd)
+
     def _special_check_path(self):
         if self.transport.is_alive():
             return True
         else:
-            log.error("Sftp transport of '%s' is not alive!" % self.path)
+            log.error("Sftp transport of '%s' is not alive!", self.path)
             return False
 
     def _special_open(self):
         if not self.transport.is_alive():
-            log.warn("Sftp transport not alive, reconnect '%s'!" % self.path)
+            log.warn("Sftp transport not alive, reconnect '%s'!", self.path)
             try:
                 self.transport.close()
                 self.transport = paramiko.Transport((self.host, self.port))
@@ -28,7 +28,7 @@ class TarRawLoader(BaseRawLoader):
         if os.path.isfile(self.path) and tarfile.is_tarfile(self.path):
             return True
         else:
-            log.error("'%s' is not a tar archive file!" % self.path)
+            log.error("'%s' is not a tar archive file!", self.path)
             return False
 
     def _special_open(self):
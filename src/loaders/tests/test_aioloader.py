@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import time
+import shutil
+import asyncio
+import unittest
+import tempfile
+import threading
+import unittest.mock
+import numpy
+
+from . import DATA_C
+from .. import aioloader
+from ..cachepck import CachePckLoader
+from ..dirraw import DirRawLoader
+
+
+class SlowPckLoader(CachePckLoader):
+    '''Count reads and concurrent reads.'''
+    __slots__ = ['reads', 'running', 'maxrunning', 'reading']
+
+    def _special_get(self, tmpobj, key):
+        if key == 'description':
+            return super(SlowPckLoader, self)._special_get(tmpobj, key)
+        with self.reading:
+            self.reads.append(key)
+            self.running += 1
+            self.maxrunning = max(self.maxrunning, self.running)
+        time.sleep(0.01)
+        with self.reading:
+            self.running -= 1
+        return super(SlowPckLoader, self)._special_get(tmpobj, key)
+
+
+class ImpSftpRawLoader(DirRawLoader):
+    '''Local directory, read by the stub asyncssh as remote one.'''
+    __slots__ = ['rmt_path', '_sep']
+
+    def __init__(self, path):
+        super(ImpSftpRawLoader, self).__init__(path)
+        self.rmt_path, self._sep = path, '/'
+
+    def _connect_kwargs(self):
+        return dict(host='localhost', port=22, username='user',
+                    password=None)
+
+
+class StubAsyncssh(object):
+    '''Stub of module asyncssh, count connections.'''
+
+    def __init__(self):
+        self.opened, self.closed, self.reads = 0, 0, []
+
+    async def connect(self, known_hosts=None, **kwargs):
+        await asyncio.sleep(0.01)
+        self.opened += 1
+        return StubConnection(self)
+
+
+class StubConnection(object):
+
+    def __init__(self, stub):
+        self.stub = stub
+
+    async def start_sftp_client(self):
+        await asyncio.sleep(0.01)
+        return self
+
+    def open(self, path, mode):
+        return StubFile(self.stub, path)
+
+    def exit(self):
+        pass
+
+    def close(self):
+        self.stub.closed += 1
+
+    async def wait_closed(self):
+        pass
+
+
+class StubFile(object):
+
+    def __init__(self, stub, path):
+        self.stub, self.path = stub, path
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def read(self):
+        self.stub.reads.append(os.path.basename(self.path))
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+class TestAsyncLoader(unittest.TestCase):
+    '''
+    Test class AsyncLoader
+    '''
+
+    def setUp(self):
+        from ..aioloader import AsyncLoader
+        self.AsyncLoader = AsyncLoader
+        self.data = {'g%d' % i: {'k%d' % j: numpy.random.rand(j + 1)
+                                 for j in range(10)} for i in range(10)}
+        self.data['description'] = 'test data'
+        self.loader = SlowPckLoader(self.data)
+        self.loader.reads, self.loader.running = [], 0
+        self.loader.maxrunning = 0
+        self.loader.reading = threading.Lock()
+        self.keys = [k for k in self.loader.keys() if k != 'description']
+
+    def test_aioloader_aget(self):
+        async def main():
+            async with self.AsyncLoader(self.loader, concurrency=4) as aio:
+                values = await asyncio.gather(
+                    *[aio.aget(k) for k in self.keys * 3])
+                self.assertIs(await aio.aget('g1/k1'), values[11])
+            return values
+        values = asyncio.run(main())
+        for key, val in zip(self.keys * 3, values):
+            group, k = key.split('/')
+            self.assertIs(val, self.data[group][k])
+        # 300 requests, each key read once, 4 at a time
+        self.assertEqual(sorted(self.loader.reads), sorted(self.keys))
+        self.assertLessEqual(self.loader.maxrunning, 4)
+        self.assertGreater(self.loader.maxrunning, 1)
+
+    def test_aioloader_aget_many(self):
+        async def main():
+            async with self.AsyncLoader(self.loader, concurrency=2) as aio:
+                many = await aio.aget_many(*self.keys[:20])
+                again = await aio.aget_many(*self.keys[10:30])
+                with self.assertRaises(KeyError):
+                    await aio.aget('g0/none')
+            return many + again
+        values = asyncio.run(main())
+        self.assertEqual(len(values), 40)
+        self.assertIs(values[15], values[25])
+        self.assertEqual(sorted(self.loader.reads), sorted(self.keys[:30]))
+        # one get_many in one thread for keys not cached
+        self.assertEqual(self.loader.maxrunning, 1)
+
+    def test_aioloader_raw(self):
+        tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        try:
+            for i in range(20):
+                with open(os.path.join(tmpdir, 'f%d.out' % i), 'wb') as f:
+                    f.write(b'%d\n' % i * 1000)
+            loader = DirRawLoader(tmpdir)
+
+            async def main():
+                async with self.AsyncLoader(loader, concurrency=3) as aio:
+                    self.assertFalse(aio.native)
+                    return await asyncio.gather(
+                        *[aio.aget('f%d.out' % (i % 20))
+                          for i in range(100)])
+            values = asyncio.run(main())
+            for i, val in enumerate(values):
+                self.assertEqual(val, b'%d\n' % (i % 20) * 1000)
+        finally:
+            shutil.rmtree(tmpdir)
+        with self.assertRaises(ValueError):
+            self.AsyncLoader(DATA_C)
+
+    def test_aioloader_native_sftp(self):
+        stub = StubAsyncssh()
+        tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        try:
+            for i in range(4):
+                with open(os.path.join(tmpdir, 'f%d.out' % i), 'wb') as f:
+                    f.write(b'%d\n' % i * 100)
+            loader = ImpSftpRawLoader(tmpdir)
+
+            async def main():
+                aio = self.AsyncLoader(loader, concurrency=4)
+                self.assertTrue(aio.native)
+                values = await asyncio.gather(
+                    *[aio.aget('f%d.out' % (i % 4)) for i in range(8)])
+                with self.assertRaises(KeyError):
+                    await aio.aget('none.out')
+                await aio.aclose()
+                return values
+            with unittest.mock.patch.object(
+                    aioloader, 'asyncssh', stub, create=True), \
+                    unittest.mock.patch.object(
+                        aioloader, 'HAVE_ASYNCSSH', True):
+                values = asyncio.run(main())
+            for i, val in enumerate(values):
+                self.assertEqual(val, b'%d\n' % (i % 4) * 100)
+            # one shared connection, closed, each file read once
+            self.assertEqual((stub.opened, stub.closed), (1, 1))
+            self.assertEqual(sorted(stub.reads),
+                             ['f%d.out' % i for i in range(4)])
+        finally:
+            shutil.rmtree(tmpdir)
@@ -4,10 +4,16 @@
 
 import os
 import unittest
+import time
+import random
 import tempfile
+import threading
 import contextlib
+import collections
+import concurrent.futures
 
 from ..base import BaseRawLoader, BasePckLoader
+from ... import gprofiler
 
 
 class ImpBaseRawLoader(BaseRawLoader):
@@ -80,6 +86,30 @@ class TestBaseRawLoader(unittest.TestCase):
             with loader.get('lost-key'):
                 pass
 
+    def test_rawloader_profile(self):
+        loader = ImpBaseRawLoader(self.tmpfile)
+        gprofiler.report.clear()
+        try:
+            gprofiler.enable(memory=True)
+            with loader.get('d2/f2') as f:
+                self.assertEqual(f.read(), 'two')
+                time.sleep(0.05)
+        finally:
+            gprofiler.disable()
+        with loader.get('f1') as f:
+            pass
+        records = gprofiler.report.query(stage='rawload')
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['name'], 'd2/f2')
+        self.assertIsNone(records[0]['nbytes'])
+        # time of with block is not counted
+        self.assertLess(records[0]['seconds'], 0.05)
+        if gprofiler._can_reset_peak:
+            self.assertIsNotNone(records[0]['peak_bytes'])
+        else:
+            self.assertIsNone(records[0]['peak_bytes'])
+        gprofiler.report.clear()
+
     def test_rawloader_find(self):
         loader = ImpBaseRawLoader(self.tmpfile)
         self.assertEqual(loader.find('d', 2), ('d2/f2',))
@@ -113,6 +143,20 @@ class ImpBasePckLoader(BasePckLoader):
         return self._D[key]
 
 
+class SlowPckLoader(ImpBasePckLoader):
+    '''Count reads of each key, slow enough to overlap threads.'''
+    __slots__ = ['reads', 'failing']
+
+    def _special_get(self, tmpobj, key):
+        if key == 'description':
+            return 'desc'
+        self.reads[key] += 1
+        time.sleep(0.002)
+        if key in self.failing:
+            raise IOError("Can't read %s" % key)
+        return int(key.split('/')[-1])
+
+
 class TestBasePckLoader(unittest.TestCase):
     '''
     Test class BasePckLoader
@@ -158,6 +202,26 @@ class TestBasePckLoader(unittest.TestCase):
         self.assertEqual(loader.get_many('k1', 'g2/k2'), (1, 2))
         self.assertTrue('k1' in loader.cache)
 
+    def test_pckloader_profile(self):
+        loader = ImpBasePckLoader(self.tmpfile)
+        gprofiler.report.clear()
+        try:
+            gprofiler.enable()
+            loader.get('description')
+            loader.get_many('k1', 'g2/k2')
+        finally:
+            gprofiler.disable()
+        loader.get('g3/k3')
+        records = gprofiler.report.query(stage='pckload')
+        self.assertEqual([r['name'] for r in records],
+                         ['description', '2 keys'])
+        self.assertEqual(records[0]['nbytes'], 4)
+        summary = gprofiler.report.summary()
+        self.assertEqual(summary['pckload']['count'], 2)
+        self.assertIsNone(summary['pckload']['peak_bytes'])
+        self.assertIn('pckload', gprofiler.report.format())
+        gprofiler.report.clear()
+
     def test_pckloader_find(self):
         loader = ImpBasePckLoader(self.tmpfile)
         self.assertEqual(loader.find('g', 4), ('g3/k4',))
@@ -167,3 +231,64 @@ class TestBasePckLoader(unittest.TestCase):
         loader = ImpBasePckLoader(self.tmpfile)
         self.assertTrue(loader.all_in_loader('k1', 'g2/k2', 'g3/k3'))
         self.assertFalse(loader.all_in_loader('k1', 'g2/k2', 'lost-key'))
+
+    def test_pckloader_concurrent_get(self):
+        SlowPckLoader._D = {'g%d/%d' % (i % 8, i): i for i in range(200)}
+        SlowPckLoader._D['description'] = 'desc'
+        loader = SlowPckLoader(self.tmpfile)
+        loader.reads, loader.failing = collections.Counter(), set()
+        keys = [k for k in loader.datakeys if k != 'description']
+        barrier = threading.Barrier(32)
+
+        def worker(seed):
+            rand = random.Random(seed)
+            barrier.wait()
+            for _ in range(50):
+                if rand.random() < 0.5:
+                    key = rand.choice(keys)
+                    assert loader.get(key) == SlowPckLoader._D[key]
+                else:
+                    many = rand.sample(keys, 5)
+                    assert loader.get_many(*many) == tuple(
+                        SlowPckLoader._D[k] for k in many)
+                if rand.random() < 0.02:
+                    loader.clear_cache()
+            return True
+        with concurrent.futures.ThreadPoolExecutor(32) as pool:
+            self.assertTrue(all(pool.map(worker, range(32))))
+        self.assertEqual(len(loader._inflight), 0)
+        # without clear_cache, each key is read once
+        loader = SlowPckLoader(self.tmpfile)
+        loader.reads, loader.failing = collections.Counter(), set()
+        barrier = threading.Barrier(16)
+
+        def reader(seed):
+            barrier.wait()
+            order = keys[:]
+            random.Random(seed).shuffle(order)
+            return loader.get_many(*order[:100]) + tuple(
+                loader.get(k) for k in order[100:])
+        with concurrent.futures.ThreadPoolExecutor(16) as pool:
+            list(pool.map(reader, range(16)))
+        self.assertEqual(set(loader.reads.values()), {1})
+        self.assertEqual(len(loader.reads), len(keys))
+
+    def test_pckloader_concurrent_error(self):
+        SlowPckLoader._D = {'g0/%d' % i: i for i in range(4)}
+        SlowPckLoader._D['description'] = 'desc'
+        loader = SlowPckLoader(self.tmpfile)
+        loader.reads, loader.failing = collections.Counter(), {'g0/1'}
+        barrier = threading.Barrier(8)
+
+        def reader(i):
+            barrier.wait()
+            try:
+                return loader.get('g0/1')
+            except IOError:
+                return 'error'
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            self.assertEqual(set(pool.map(reader, range(8))), {'error'})
+        self.assertNotIn('g0/1', loader.cache)
+        self.assertEqual(len(loader._inflight), 0)
+        loader.failing = set()
+        self.assertEqual(loader.get('g0/1'), 1)
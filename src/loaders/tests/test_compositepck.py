@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import unittest
+import tempfile
+import numpy
+
+from . import DATA
+
+
+class TestCompositePckLoader(unittest.TestCase):
+    '''
+    Test class CompositePckLoader
+    '''
+
+    def setUp(self):
+        from ..cachepck import CachePckLoader
+        from ..compositepck import CompositePckLoader
+
+        class CountPckLoader(CachePckLoader):
+            __slots__ = ['calls']
+
+            def get_many(self, *keys):
+                self.calls.append(keys)
+                return super(CountPckLoader, self).get_many(*keys)
+
+        self.CompositePckLoader = CompositePckLoader
+        self.tmpfile = tempfile.mktemp(suffix='-test.npz')
+        numpy.savez_compressed(self.tmpfile, **DATA)
+        self.gtc = CountPckLoader({'gtc': {'tstep': 0.1, 'mpsi': 10},
+                                   'description': 'gtc data'})
+        self.snap = CountPckLoader({'snap00100': {
+            'phi': numpy.random.rand(3, 4), 'x': numpy.random.rand(3, 4)},
+            'gtc': {'tstep': 0.2}})
+        self.gtc.calls, self.snap.calls = [], []
+
+    def tearDown(self):
+        if os.path.isfile(self.tmpfile):
+            os.remove(self.tmpfile)
+
+    def test_compositeloader_init(self):
+        from .. import get_pckloader
+        loader = get_pckloader([self.gtc, self.snap, self.tmpfile])
+        self.assertIsInstance(loader, self.CompositePckLoader)
+        self.assertSetEqual(set(loader.datakeys), {
+            'gtc/tstep', 'gtc/mpsi', 'description', 'snap00100/phi',
+            'snap00100/x', 'test/array', 'test/vector', 'test/float'})
+        self.assertSetEqual(set(loader.datagroups),
+                            {'gtc', 'snap00100', 'test'})
+        # first loader wins
+        self.assertMultiLineEqual(loader.description, 'gtc data')
+        self.assertIs(loader.route('gtc/tstep'), self.gtc)
+        self.assertEqual(loader.route('test/array').path, self.tmpfile)
+        with self.assertRaises(ValueError):
+            self.CompositePckLoader([])
+
+    def test_compositeloader_get(self):
+        loader = self.CompositePckLoader([self.gtc, self.snap, self.tmpfile])
+        self.assertEqual(loader.get('gtc/tstep'), 0.1)
+        self.assertTrue(
+            numpy.array_equal(loader['test/array'], DATA['test/array']))
+        with self.assertRaises(KeyError):
+            loader.get('gtc/none')
+
+    def test_compositeloader_get_many(self):
+        loader = self.CompositePckLoader([self.gtc, self.snap])
+        keys = ('snap00100/phi', 'gtc/tstep', 'snap00100/x', 'gtc/mpsi')
+        phi, tstep, x, mpsi = loader.get_many(*keys)
+        self.assertIs(phi, self.snap.get('snap00100/phi'))
+        self.assertEqual((tstep, mpsi), (0.1, 10))
+        # one batch for each loader
+        self.assertListEqual(self.gtc.calls, [('gtc/tstep', 'gtc/mpsi')])
+        self.assertListEqual(self.snap.calls,
+                             [('snap00100/phi', 'snap00100/x')])
+        loader.get_many(*keys)
+        self.assertEqual(len(self.gtc.calls) + len(self.snap.calls), 2)
+        with self.assertRaises(KeyError):
+            loader.get_many('gtc/tstep', 'gtc/none')
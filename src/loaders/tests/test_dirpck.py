@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import shutil
+import unittest
+import tempfile
+import numpy
+
+from . import DATA
+
+
+class TestDirPckLoader(unittest.TestCase):
+    '''
+    Test class DirPckLoader
+    '''
+
+    def setUp(self):
+        from ..dirpck import DirPckLoader
+        from ...savers.dirpck import DirPckSaver
+        self.DirPckLoader = DirPckLoader
+        self.tmpfile = tempfile.mktemp(suffix='-test.pckdir')
+        self.big = numpy.random.rand(1000, 3)
+        with DirPckSaver(self.tmpfile) as saver:
+            saver.write('', {'description': DATA['description']})
+            saver.write('test', {k.split('/')[1]: v for k, v in DATA.items()
+                                 if k.startswith('test/')})
+            saver.write('big', {'array': self.big,
+                                'empty': numpy.empty((0, 3)),
+                                'scalar': numpy.array(2.0),
+                                'ints': numpy.int32(7)})
+
+    def tearDown(self):
+        if os.path.isdir(self.tmpfile):
+            shutil.rmtree(self.tmpfile)
+
+    def test_dirloader_init(self):
+        loader = self.DirPckLoader(self.tmpfile)
+        self.assertSetEqual(set(loader.datakeys), set(DATA.keys()) | {
+            'big/array', 'big/empty', 'big/scalar', 'big/ints'})
+        self.assertSetEqual(set(loader.datagroups), {'test', 'big'})
+        self.assertMultiLineEqual(loader.description, 'test data')
+
+    def test_dirloader_get(self):
+        loader = self.DirPckLoader(self.tmpfile)
+        self.assertTrue(
+            numpy.array_equal(loader.get('test/array'), DATA['test/array']))
+        self.assertEqual(loader.get('test/float'), 3.1415)
+        self.assertTrue(numpy.array_equal(loader.get('big/array'), self.big))
+        self.assertEqual(loader.get('big/empty').shape, (0, 3))
+        self.assertEqual(loader.get('big/scalar'), 2.0)
+        self.assertEqual(loader.get('big/ints'), 7)
+
+    def test_dirloader_get_rows(self):
+        from ...savers import dirpck
+        chunkbytes = dirpck.chunkbytes
+        dirpck.chunkbytes = 24 * 64
+        try:
+            with dirpck.DirPckSaver(self.tmpfile) as saver:
+                saver.write('big', {'array': self.big})
+        finally:
+            dirpck.chunkbytes = chunkbytes
+        loader = self.DirPckLoader(self.tmpfile)
+        info = loader.chunkinfo('big/array')
+        self.assertEqual(info['chunkrows'], 64)
+        self.assertEqual(info['nchunks'], 16)
+        for start, stop in [(0, 10), (60, 70), (100, 1000), (-5, None),
+                            (None, None), (500, 400)]:
+            numpy.testing.assert_array_equal(
+                loader.get_rows('big/array', start, stop),
+                self.big[start:stop])
+        self.assertNotIn('big/array', loader.cache)
+        numpy.testing.assert_array_equal(loader['big/array'], self.big)
@@ -54,3 +54,20 @@ class TestDirRawLoader(unittest.TestCase):
             self.assertEqual(f2.read(), 'test2')
         with self.assertRaises(ValueError):
             f2.read()
+
+    def test_dirloader_getbuffer(self):
+        import mmap
+        loader = self.DirRawLoader(self.tmpdir)
+        with loader.getbuffer('d1/f2.out') as buf:
+            self.assertIsInstance(buf, mmap.mmap)
+            self.assertEqual(buf[:], b'test2')
+            self.assertEqual(buf.rfind(b't'), 3)
+        self.assertTrue(buf.closed)
+        with loader.getbuffer('f1.ignore') as buf:
+            self.assertEqual(buf, b'')
+        loader = self.DirRawLoader(self.tmpdir, use_mmap=False)
+        with loader.getbuffer('f1.out') as buf:
+            self.assertEqual(buf, b'test1')
+        with self.assertRaises(KeyError):
+            with loader.getbuffer('f2.out') as buf:
+                pass
@@ -44,3 +44,8 @@ class TestTarRawLoader(unittest.TestCase):
             self.assertEqual(f2.read(), 'test2')
         with self.assertRaises(ValueError):
             f2.read()
+
+    def test_tarloader_getbuffer(self):
+        loader = self.TarRawLoader(self.tmptar)
+        with loader.getbuffer('d1/f2.out') as buf:
+            self.assertEqual(buf, b'test2')
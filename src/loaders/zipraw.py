@@ -28,7 +28,7 @@ class ZipRawLoader(BaseRawLoader):
         if os.path.isfile(self.path) and zipfile.is_zipfile(self.path):
             return True
         else:
-            log.error("'%s' is not a ZIP archive file!" % self.path)
+            log.error("'%s' is not a ZIP archive file!", self.path)
             return False
 
     def _special_open(self):
@@ -20,32 +20,53 @@ and methods
 :meth:`base.BasePlotter.show_figure`,
 :meth:`base.BasePlotter.close_figure`,
 :meth:`base.BasePlotter.save_figure`,
+:meth:`base.BasePlotter.figure_to_bytes`,
+
+AxesStructures returned by templates can be serialized to bytes by
+:func:`axstructs.dumps` and restored by :func:`axstructs.loads`.
 '''
 
 import os
+import importlib
 
 from ..glogger import getGLogger
-from . import base
 
 __all__ = ['get_plotter']
 log = getGLogger('P')
 
 plotter_names = ['MatplotlibPlotter']
 plotter_types = ['mpl::']
+_lazy_modules = {'MatplotlibPlotter': 'mplplotter'}
+
+
+def __getattr__(name):
+    '''
+    Import :mod:`base` and plotter classes on first access,
+    so numpy and matplotlib are not imported with this subpackage.
+    '''
+    if name in ('base', 'axstructs'):
+        return importlib.import_module('.' + name, __name__)
+    if name in _lazy_modules:
+        module = importlib.import_module('.' + _lazy_modules[name], __name__)
+        return getattr(module, name)
+    raise AttributeError("module '%s' has no attribute '%s'"
+                         % (__name__, name))
 
 
-def get_plotter(name):
+def get_plotter(name, **kwargs):
     '''
     Given a str *name*, return a plotter instance.
 
     The name must start with one type of ``plotter_types``,
     for example 'mpl::any-string-here'.
     Raises ValueError if name invalid or type not supported.
+    Other *kwargs* are passed on to the plotter class.
 
     Notes
     -----
     plotter types:
-    1. 'mpl::' for :class:`mplplotter.MatplotlibPlotter`.
+    1. 'mpl::' for :class:`mplplotter.MatplotlibPlotter`,
+       accept kwarg *headless*.
     '''
     sep = '::'
     name = str(name)
@@ -53,7 +74,7 @@ def get_plotter(name):
         ptype = name.split(sep=sep)[0] + sep
         if ptype == 'mpl::':
             from .mplplotter import MatplotlibPlotter
-            plotter = MatplotlibPlotter(name)
+            plotter = MatplotlibPlotter(name, **kwargs)
         else:
             raise ValueError('Unsupported plotter type: "%s"! '
                              'Did you mean one of: "%s"?'
@@ -69,4 +90,5 @@ def is_plotter(obj):
     '''
     Return True if obj is a plotter instance, else return False.
     '''
-    return isinstance(obj, base.BasePlotter)
+    from .base import BasePlotter
+    return isinstance(obj, BasePlotter)
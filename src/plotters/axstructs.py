@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains functions to serialize AxesStructures and add_style,
+returned by plot templates, to compact binary bytes.
+
+Arrays are stored as raw buffers after a JSON header, so cooking and
+rendering can run in different processes or machines, and serialized
+structures can be cached on disk.
+
+Layout of the bytes::
+
+    magic (8 bytes) | header length (8 bytes, little-endian)
+    | JSON header | padding | buffer 0 | padding | buffer 1 ...
+
+Only str, int, float, bool, None, complex, list, tuple, range, dict and
+numpy.ndarray (not object dtype) are supported. Use named 'revise'
+operations, like ``[9, 'revise', 'colorbar', {'artist': 1}]``,
+instead of callables.
+'''
+
+import json
+import struct
+import numpy
+
+from ..glogger import getGLogger
+
+__all__ = ['dumps', 'loads', 'dump', 'load']
+log = getGLogger('P')
+
+_MAGIC = b'GDAXS\x00\x01\x00'
+_ALIGN = 16
+
+
+def _encode(obj, buffers):
+    '''Return JSON-able object of *obj*, arrays appended to *buffers*.'''
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    if isinstance(obj, numpy.ndarray):
+        if obj.dtype.hasobject:
+            raise TypeError("Can't serialize array with object dtype!")
+        if isinstance(obj, numpy.ma.MaskedArray):
+            return {'__masked__': [_encode(obj.data, buffers),
+                                   _encode(numpy.ma.getmaskarray(obj),
+                                           buffers)]}
+        buffers.append(numpy.ascontiguousarray(obj))
+        return {'__ndarray__': len(buffers) - 1,
+                'dtype': obj.dtype.str, 'shape': list(obj.shape)}
+    if isinstance(obj, numpy.generic):
+        return _encode(obj.item(), buffers)
+    if isinstance(obj, complex):
+        return {'__complex__': [obj.real, obj.imag]}
+    if isinstance(obj, tuple):
+        return {'__tuple__': [_encode(v, buffers) for v in obj]}
+    if isinstance(obj, (list, range)):
+        return [_encode(v, buffers) for v in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            if any(k.startswith('__') and k.endswith('__') for k in obj):
+                return {'__dict__': [[k, _encode(v, buffers)]
+                                     for k, v in obj.items()]}
+            return {k: _encode(v, buffers) for k, v in obj.items()}
+        return {'__dict__': [[_encode(k, buffers), _encode(v, buffers)]
+                             for k, v in obj.items()]}
+    if callable(obj):
+        raise TypeError("Can't serialize callable %r! "
+                        "Use named 'revise' operations instead." % obj)
+    raise TypeError("Can't serialize %s!" % type(obj))
+
+
+def _decode(obj, buffers):
+    '''Rebuild object from JSON-able *obj* and array *buffers*.'''
+    if isinstance(obj, list):
+        return [_decode(v, buffers) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if '__ndarray__' in obj:
+        return buffers[obj['__ndarray__']]
+    if '__masked__' in obj:
+        data, mask = obj['__masked__']
+        return numpy.ma.MaskedArray(_decode(data, buffers),
+                                    mask=_decode(mask, buffers))
+    if '__complex__' in obj:
+        return complex(*obj['__complex__'])
+    if '__tuple__' in obj:
+        return tuple(_decode(v, buffers) for v in obj['__tuple__'])
+    if '__dict__' in obj:
+        return {_decode(k, buffers): _decode(v, buffers)
+                for k, v in obj['__dict__']}
+    return {k: _decode(v, buffers) for k, v in obj.items()}
+
+
+def dumps(axesstructures, add_style=None):
+    '''
+    Serialize list *axesstructures* and *add_style* to bytes.
+    Raise TypeError if they contain unsupported objects.
+    '''
+    buffers = []
+    body = _encode({'axesstructures': list(axesstructures),
+                    'add_style': add_style or []}, buffers)
+    offset, spans = 0, []
+    for arr in buffers:
+        offset += -offset % _ALIGN
+        spans.append([offset, arr.nbytes])
+        offset += arr.nbytes
+    header = json.dumps({'body': body, 'buffers': spans},
+                        separators=(',', ':')).encode('utf8')
+    start = len(_MAGIC) + 8 + len(header)
+    pad = -start % _ALIGN
+    out = bytearray(start + pad + offset)
+    out[:len(_MAGIC)] = _MAGIC
+    out[len(_MAGIC):len(_MAGIC) + 8] = struct.pack('<Q', len(header) + pad)
+    out[len(_MAGIC) + 8:start] = header
+    out[start:start + pad] = b' ' * pad
+    start += pad
+    view = numpy.frombuffer(out, dtype='u1')
+    for arr, (off, nbytes) in zip(buffers, spans):
+        view[start + off:start + off + nbytes] = arr.reshape(-1).view('u1')
+    del view
+    log.ddebug("Serialized %d AxesStructures, %d arrays, %d bytes.",
+               len(axesstructures), len(buffers), len(out))
+    return bytes(out)
+
+
+def loads(data):
+    '''
+    Deserialize *data* to (axesstructures, add_style).
+    Arrays are views of *data* without copy, so they are read-only
+    if *data* is bytes. Raise ValueError if *data* is invalid.
+    '''
+    mv = memoryview(data)
+    if bytes(mv[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError("Invalid AxesStructures bytes!")
+    hlen, = struct.unpack('<Q', mv[len(_MAGIC):len(_MAGIC) + 8])
+    start = len(_MAGIC) + 8
+    header = json.loads(bytes(mv[start:start + hlen]).decode('utf8'))
+    start += hlen
+    # collect array specs, then make views by index
+    specs = {}
+
+    def _collect(obj):
+        if isinstance(obj, list):
+            for v in obj:
+                _collect(v)
+        elif isinstance(obj, dict):
+            if '__ndarray__' in obj:
+                specs[obj['__ndarray__']] = obj
+            else:
+                for v in obj.values():
+                    _collect(v)
+    _collect(header['body'])
+    buffers = []
+    for i, (off, nbytes) in enumerate(header['buffers']):
+        dtype = numpy.dtype(specs[i]['dtype'])
+        if nbytes == 0:
+            arr = numpy.empty(0, dtype=dtype)
+        else:
+            arr = numpy.frombuffer(mv, dtype=dtype,
+                                   count=nbytes // dtype.itemsize,
+                                   offset=start + off)
+        buffers.append(arr.reshape(specs[i]['shape']))
+    body = _decode(header['body'], buffers)
+    return body['axesstructures'], body['add_style']
+
+
+def dump(axesstructures, add_style, fpath):
+    '''Serialize *axesstructures* and *add_style* to file *fpath*.'''
+    with open(fpath, 'wb') as f:
+        f.write(dumps(axesstructures, add_style))
+
+
+def load(fpath):
+    '''Deserialize (axesstructures, add_style) from file *fpath*.'''
+    with open(fpath, 'rb') as f:
+        return loads(f.read())
@@ -10,11 +10,89 @@ import os
 import numpy
 
 from ..glogger import getGLogger
+from ..gprofiler import profile
 
 __all__ = ['BasePlotter', 'BasePloTemplate']
 log = getGLogger('P')
 
 
+def _nanargminmax(a, axis=None):
+    '''
+    Return indices of min and max of *a*, ignoring NaNs.
+    If all values are NaN, return the first index.
+    '''
+    if a.dtype.kind == 'f':
+        nan = numpy.isnan(a)
+        if nan.any():
+            return (numpy.argmin(numpy.where(nan, numpy.inf, a), axis=axis),
+                    numpy.argmax(numpy.where(nan, -numpy.inf, a), axis=axis))
+    return numpy.argmin(a, axis=axis), numpy.argmax(a, axis=axis)
+
+
+def _minmax_indices(y, npoints):
+    '''
+    Split *y* into npoints/2 buckets, return sorted indices of
+    the first, last point and min, max points in each bucket.
+    A bucket of all NaNs keeps its first point.
+    '''
+    n = len(y)
+    size = -(-n // max(npoints // 2, 1))
+    m = n // size
+    blocks = y[:m * size].reshape(m, size)
+    offset = numpy.arange(m) * size
+    imin, imax = _nanargminmax(blocks, axis=1)
+    index = [[0, n - 1], offset + imin, offset + imax]
+    if m * size < n:
+        imin, imax = _nanargminmax(y[m * size:])
+        index.append([m * size + imin, m * size + imax])
+    return numpy.unique(numpy.concatenate(index))
+
+
+def _block_reduce(A, fy, fx, method):
+    '''
+    Reduce 2D array *A* by (*fy*, *fx*) blocks, edge blocks can be smaller.
+    *method* 'mean' for block mean,
+    'max' for the value with max absolute value in block.
+    '''
+    rows = numpy.arange(0, A.shape[0], fy)
+    cols = numpy.arange(0, A.shape[1], fx)
+    if method == 'max':
+        big = numpy.maximum.reduceat(
+            numpy.maximum.reduceat(A, rows, axis=0), cols, axis=1)
+        small = numpy.minimum.reduceat(
+            numpy.minimum.reduceat(A, rows, axis=0), cols, axis=1)
+        return numpy.where(numpy.abs(big) >= numpy.abs(small), big, small)
+    total = numpy.add.reduceat(
+        numpy.add.reduceat(A, rows, axis=0), cols, axis=1)
+    counts = numpy.outer(numpy.diff(numpy.append(rows, A.shape[0])),
+                         numpy.diff(numpy.append(cols, A.shape[1])))
+    return total / counts
+
+
+def _lttb_indices(x, y, npoints):
+    '''
+    Largest-Triangle-Three-Buckets, return sorted indices of
+    *npoints* points which keep the visual shape of line (*x*, *y*).
+    '''
+    n = len(y)
+    edges = numpy.linspace(1, n - 1, npoints - 1).astype(int)
+    index = numpy.empty(npoints, dtype=int)
+    index[0], index[-1] = 0, n - 1
+    a = 0
+    for i in range(npoints - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avgx = x[hi:edges[i + 2]].mean()
+            avgy = y[hi:edges[i + 2]].mean()
+        else:
+            avgx, avgy = x[n - 1], y[n - 1]
+        area = numpy.abs((x[a] - avgx) * (y[lo:hi] - y[a])
+                         - (x[a] - x[lo:hi]) * (avgy - y[a]))
+        a = lo + int(_nanargminmax(area)[1]) if hi > lo else lo
+        index[i + 1] = a
+    return numpy.unique(index)
+
+
 class BasePlotter(object):
     '''
     Plot data, create figures.
@@ -62,7 +140,7 @@ class BasePlotter(object):
             if self._check_style(sty):
                 self._style.append(sty)
             else:
-                log.warn("Ignore style '%s': %s" % (sty, 'not available'))
+                log.warn("Ignore style '%s': %s", sty, 'not available')
 
     style = property(_get_style, _set_style)
 
@@ -124,18 +202,18 @@ class BasePlotter(object):
         '''
         # simple check
         if not isinstance(axstructure, dict):
-            log.error("AxesStructure must be dict. Not %s. Ignore this axes."
-                      % type(axstructure))
+            log.error("AxesStructure must be dict. Not %s. Ignore this axes.",
+                      type(axstructure))
             return
         check_pass = True
         for k in ('data', 'layout'):
             if k not in axstructure:
                 check_pass = False
-                log.error("AxesStructure must contain key: '%s'!" % k)
+                log.error("AxesStructure must contain key: '%s'!", k)
             if not isinstance(axstructure[k], list):
                 check_pass = False
-                log.error("AxesStructure[%s] must be list. Not %s."
-                          % (k, type(axstructure[k])))
+                log.error("AxesStructure[%s] must be list. Not %s.",
+                          k, type(axstructure[k]))
         layout = axstructure['layout']
         if not(isinstance(layout, list) and len(layout) == 2):
             check_pass = False
@@ -152,13 +230,15 @@ class BasePlotter(object):
                 log.error("AxesStructure['axstyle'] must be list. Not %s. "
                           % type(axstructure['axstyle'])
                           + "Ignore 'axstyle' setting!")
-        log.ddebug("Axes Style: %s" % str(axstyle))
+        log.ddebug("Axes Style: %s", axstyle)
         return self._add_axes(fig, axstructure['data'], layout, axstyle)
 
     def _create_figure(self, num, axesstructures, figstyle):
         '''Create a figure object.'''
         raise NotImplementedError()
 
+    @profile('create', name=lambda self, num, *args, **kwargs: str(num),
+             nbytes=None)
     def create_figure(self, num, *axesstructures, add_style=None, replace=True):
         '''
         Use *axesstructures* to create a figure object.
@@ -189,14 +269,14 @@ class BasePlotter(object):
         '''
         if num in self._figureslib:
             if replace:
-                log.warn("Figure %s was created. Closing it!" % num)
+                log.warn("Figure %s was created. Closing it!", num)
                 self.close_figure(num)
             else:
                 return self.get_figure(num)
         figstyle = self.style.copy()
         if add_style and isinstance(add_style, list):
             figstyle.extend(self.check_style(add_style))
-        log.ddebug("Figure Style: %s" % str(figstyle))
+        log.ddebug("Figure Style: %s", figstyle)
         figure = self._create_figure(num, axesstructures, figstyle)
         if figure:
             self._figureslib[num] = figure
@@ -228,7 +308,7 @@ class BasePlotter(object):
         if num in self._figureslib:
             return self._show_figure(self._figureslib[num])
         else:
-            log.error("Figure %s is not created!" % num)
+            log.error("Figure %s is not created!", num)
 
     def _close_figure(self, fig):
         '''Close figure object *fig*.'''
@@ -255,15 +335,34 @@ class BasePlotter(object):
         '''Save figure object *fig*.'''
         raise NotImplementedError()
 
+    @profile('savefig', name=lambda self, num, *args, **kwargs: str(num),
+             nbytes=lambda result, self, num, fpath, **kwargs:
+             os.path.getsize(fpath) if os.path.isfile(fpath) else None)
     def save_figure(self, num, fpath, **kwargs):
         '''
         Save figure *num* to *fpath* if already created.
         '''
         if num in self._figureslib:
-            log.info("Save figure to %s ..." % fpath)
+            log.info("Save figure to %s ...", fpath)
             self._save_figure(self._figureslib[num], fpath, **kwargs)
         else:
-            log.error("Figure %s is not created!" % num)
+            log.error("Figure %s is not created!", num)
+
+    def _figure_to_bytes(self, fig, fmt, **kwargs):
+        '''Render figure object *fig* to bytes.'''
+        raise NotImplementedError()
+
+    def figure_to_bytes(self, num, fmt='png', **kwargs):
+        '''
+        Render figure *num* to bytes in format *fmt* if already created.
+        Return None if figure *num* is not created.
+        '''
+        if num in self._figureslib:
+            log.debug("Render figure %s to %s bytes ...", num, fmt)
+            return self._figure_to_bytes(self._figureslib[num], fmt, **kwargs)
+        else:
+            log.error("Figure %s is not created!", num)
+            return None
 
 
 class BasePloTemplate(object):
@@ -275,6 +374,10 @@ class BasePloTemplate(object):
     ----------
     template_available: tuple
         all available templates
+    decimate_methods: tuple
+        available methods to decimate long lines, 'minmax' or 'lttb'
+    downsample_methods: tuple
+        available methods to downsample 2D fields, 'mean' or 'max'
     '''
     __slots__ = []
     template_available = [
@@ -283,6 +386,56 @@ class BasePloTemplate(object):
         'template_sharex_twinx_axstructs',
         'template_z111p_axstructs',
     ]
+    decimate_methods = ('minmax', 'lttb')
+    downsample_methods = ('mean', 'max')
+
+    def _pixel_size(self):
+        '''Return the (width, height) of figure in pixels.'''
+        return 1000, 800
+
+    def _decimate_npoints(self, results):
+        '''
+        Get target number of points from *results*['decimate'].
+        True means two times of the pixel width. Return 0 if disabled.
+        '''
+        decimate = results.get('decimate', None)
+        if decimate is True:
+            return 2 * self._pixel_size()[0]
+        if isinstance(decimate, int) and not isinstance(decimate, bool):
+            if decimate >= 4:
+                return decimate
+            log.warn("Ignore invalid decimate points: %d < 4!", decimate)
+        return 0
+
+    def decimate_indices(self, x, ys, npoints, method='minmax'):
+        '''
+        Return sorted indices of points kept for lines (*x*, y), y in *ys*,
+        which share the same *x*. Return None if no need to decimate.
+        *npoints* is the target number of points of each line.
+        *method* is 'minmax' or 'lttb'.
+        '''
+        n = len(x)
+        if npoints <= 0 or n <= npoints:
+            return None
+        if method not in self.decimate_methods:
+            log.warn("Invalid decimate method '%s', use 'minmax'!", method)
+            method = 'minmax'
+        index = []
+        for y in ys:
+            y = numpy.asarray(y)
+            if y.ndim != 1 or y.dtype.kind not in 'biuf':
+                return None
+            if method == 'lttb':
+                index.append(_lttb_indices(
+                    numpy.asarray(x, dtype=float), y, npoints))
+            else:
+                index.append(_minmax_indices(y, npoints))
+        if not index:
+            return None
+        index = index[0] if len(index) == 1 else numpy.unique(
+            numpy.concatenate(index))
+        log.ddebug("Decimate line: %d -> %d points.", n, len(index))
+        return index
 
     def template_line_axstructs(self, results):
         '''
@@ -309,6 +462,11 @@ class BasePloTemplate(object):
         results['ylabel_rotation']: str or int, optional
         results['legend_kwargs']: dict, optional
             legend kwargs
+        results['decimate']: bool or int, optional
+            decimate long lines to about *decimate* points,
+            True for two times of figure pixel width, default no decimation
+        results['decimate_method']: str, optional
+            'minmax' or 'lttb', default 'minmax'
         '''
         if not 'LINE' in results:
             log.error("`LINE` are required!")
@@ -320,15 +478,26 @@ class BasePloTemplate(object):
             if len(line) in (2, 3):
                 for _x, _X in [(0, 'X'), (1, 'Y')]:
                     if not isinstance(line[_x], (list, range, numpy.ndarray)):
-                        log.error("%s of line %d must be array!" % (_X, i))
+                        log.error("%s of line %d must be array!", _X, i)
                         return [], []
                 if len(line[0]) != len(line[1]):
-                    log.error("Invalid length of x, y for line %d!" % i)
+                    log.error("Invalid length of x, y for line %d!", i)
                     return [], []
             else:
-                log.error("Length of info for line %d must be 2 or 3!" % i)
+                log.error("Length of info for line %d must be 2 or 3!", i)
                 return [], []
         LINE = results['LINE']
+        npoints = self._decimate_npoints(results)
+        if npoints:
+            method = results.get('decimate_method', 'minmax')
+            LINE = list(LINE)
+            for i, line in enumerate(LINE):
+                index = self.decimate_indices(
+                    line[0], [line[1]], npoints, method=method)
+                if index is not None:
+                    LINE[i] = ((numpy.asarray(line[0])[index],
+                                numpy.asarray(line[1])[index])
+                               + tuple(line[2:]))
         title = str(results['title']) if 'title' in results else None
         xlabel = str(results['xlabel']) if 'xlabel' in results else None
         ylabel = str(results['ylabel']) if 'ylabel' in results else None
@@ -360,6 +529,46 @@ class BasePloTemplate(object):
         '''For :meth:`template_line_axstructs`.'''
         raise NotImplementedError()
 
+    def downsample_mesh(self, X, Y, Z, shape, method='mean'):
+        '''
+        Downsample 2 dimension *X*, *Y*, *Z* to about *shape* (rows, cols)
+        by block pooling. *X*, *Y* use block mean, and *Z* uses *method*,
+        'mean' or 'max'. Return None if no need to downsample.
+        '''
+        fy = -(-Z.shape[0] // max(shape[0], 1))
+        fx = -(-Z.shape[1] // max(shape[1], 1))
+        if fy <= 1 and fx <= 1:
+            return None
+        if (isinstance(Z, numpy.ma.MaskedArray)
+                or Z.dtype.kind not in 'biuf'):
+            log.debug("Can't downsample masked or non-real Z!")
+            return None
+        if method not in self.downsample_methods:
+            log.warn("Invalid downsample method '%s', use 'mean'!", method)
+            method = 'mean'
+        X = _block_reduce(X, fy, fx, 'mean')
+        Y = _block_reduce(Y, fy, fx, 'mean')
+        newZ = _block_reduce(Z, fy, fx, method)
+        log.ddebug("Downsample Z: %s -> %s.", Z.shape, newZ.shape)
+        return X, Y, newZ
+
+    @staticmethod
+    def _mesh_kind(X, Y):
+        '''
+        Return 'uniform' if 2 dimension *X*, *Y* make a rectilinear grid
+        with uniform spacing, 'rectilinear' if only rectilinear,
+        else 'curvilinear'.
+        '''
+        x, y = X[0, :], Y[:, 0]
+        if not ((X == x).all() and (Y == y[:, numpy.newaxis]).all()):
+            return 'curvilinear'
+        for v in (x, y):
+            if v.size > 2:
+                dv = numpy.diff(v)
+                if not numpy.allclose(dv, dv[0], rtol=1e-3, atol=0):
+                    return 'rectilinear'
+        return 'uniform'
+
     def template_pcolor_axstructs(self, results):
         '''
         Template
@@ -379,8 +588,9 @@ class BasePloTemplate(object):
         results['Z']: 2 dimension numpy.ndarray, required
             (len(Y), len(X)) == Z.shape or (X.shape == Y.shape == Z.shape)
         results['plot_method']: str, optional
-            'pcolor', 'pcolormesh', 'contourf' or 'plot_surface'
-            default 'pcolor'
+            'pcolor', 'pcolormesh', 'imshow', 'contourf' or 'plot_surface'
+            default 'pcolor', which is replaced by the faster 'pcolormesh'
+            for rectilinear grids, 'imshow' for uniform rectilinear grids
         results['plot_method_args']: list, optional
             args for *plot_method*, like levels for 'contourf'
         results['plot_method_kwargs']: dict, optional
@@ -395,6 +605,13 @@ class BasePloTemplate(object):
             transparency of grid, use this when 'grid.alpha' has no effect
         results['plot_surface_shadow']: list, optional
             add contourf in a surface plot, ['x', 'y', 'z'], default []
+        results['downsample']: bool, int or (rows, cols), optional
+            downsample Z larger than (rows, cols) by block pooling,
+            True for two times of figure pixel size, default True,
+            int less than 2 for no downsampling
+        results['downsample_method']: str, optional
+            'mean', or 'max' for the value with max absolute value,
+            default 'mean'
         '''
         if not ('X' in results
                 and 'Y' in results and 'Z' in results):
@@ -402,7 +619,7 @@ class BasePloTemplate(object):
             return [], []
         for _x in ['X', 'Y', 'Z']:
             if not isinstance(results[_x], numpy.ndarray):
-                log.error("`%s` array must be numpy.ndarray!" % _x)
+                log.error("`%s` array must be numpy.ndarray!", _x)
                 return [], []
         X = results['X']
         Y = results['Y']
@@ -423,10 +640,33 @@ class BasePloTemplate(object):
             return [], []
         if ('plot_method' in results
                 and results['plot_method'] in (
-                    'pcolor', 'pcolormesh', 'contourf', 'plot_surface')):
+                    'pcolor', 'pcolormesh', 'imshow',
+                    'contourf', 'plot_surface')):
             plot_method = results['plot_method']
         else:
             plot_method = 'pcolor'
+        downsample = results.get('downsample', True)
+        if downsample is True:
+            shape = [2 * l for l in reversed(self._pixel_size())]
+        elif isinstance(downsample, int) and downsample is not False:
+            # less than 2, no downsampling
+            shape = [downsample, downsample] if downsample >= 2 else None
+        elif isinstance(downsample, (tuple, list)) and len(downsample) == 2:
+            shape = downsample
+        else:
+            shape = None
+        if shape:
+            reduced = self.downsample_mesh(
+                X, Y, Z, shape,
+                method=results.get('downsample_method', 'mean'))
+            if reduced is not None:
+                X, Y, Z = reduced
+        if plot_method in ('pcolor', 'imshow'):
+            mesh_kind = self._mesh_kind(X, Y)
+            if mesh_kind == 'uniform':
+                plot_method = 'imshow'
+            elif mesh_kind == 'rectilinear' or plot_method == 'imshow':
+                plot_method = 'pcolormesh'
         if ('plot_method_args' in results
                 and isinstance(results['plot_method_args'], list)):
             plot_method_args = results['plot_method_args']
@@ -454,7 +694,7 @@ class BasePloTemplate(object):
             plot_surface_shadow = list(_sl)
         else:
             plot_surface_shadow = []
-        log.ddebug("Some template pcolor parameters: %s" % [
+        log.ddebug("Some template pcolor parameters: %s", [
             plot_method, plot_method_args, plot_method_kwargs,
             colorbar, grid_alpha, plot_surface_shadow])
         return self._template_pcolor_axstructs(
@@ -498,6 +738,11 @@ class BasePloTemplate(object):
             default [min(X), max(X)]
         results['ylabel_rotation']: str or int, optional
             default 'vertical'
+        results['decimate']: bool or int, optional
+            decimate long lines to about *decimate* points,
+            True for two times of figure pixel width, default no decimation
+        results['decimate_method']: str, optional
+            'minmax' or 'lttb', default 'minmax'
 
         Notes
         -----
@@ -538,19 +783,19 @@ class BasePloTemplate(object):
         for i, ax in enumerate(results['YINFO'], 1):
             if not (isinstance(ax, dict) and 'left' in ax and 'right' in ax):
                 log.error("Info of axes %d must be dict!"
-                          "Key 'left', 'right' must in it!" % i)
+                          "Key 'left', 'right' must in it!", i)
                 return [], []
             for lr in ['left', 'right']:
                 for j, line in enumerate(ax[lr], 1):
                     if not isinstance(line[0], (list, range, numpy.ndarray)):
                         log.error(
-                            "Info of line %d in axes %d %s must be array!"
-                            % (j, i, lr))
+                            "Info of line %d in axes %d %s must be array!",
+                            j, i, lr)
                         return [], []
                     if len(line[0]) != len(X):
                         log.error(
-                            "Invalid array length of line %d in axes %d %s!"
-                            % (j, i, lr))
+                            "Invalid array length of line %d in axes %d %s!",
+                            j, i, lr)
                         return [], []
         YINFO = results['YINFO']
         hspace = float(results['hspace']) if 'hspace' in results else 0.02
@@ -560,6 +805,19 @@ class BasePloTemplate(object):
             xlim = results['xlim']
         else:
             xlim = [numpy.min(X), numpy.max(X)]
+        npoints = self._decimate_npoints(results)
+        if npoints:
+            # all lines share X, so keep the union of their indices
+            index = self.decimate_indices(
+                X, [line[0] for ax in YINFO for lr in ['left', 'right']
+                    for line in ax[lr]],
+                npoints, method=results.get('decimate_method', 'minmax'))
+            if index is not None:
+                X = numpy.asarray(X)[index]
+                YINFO = [dict(ax, **{lr: [
+                    (numpy.asarray(line[0])[index],) + tuple(line[1:])
+                    for line in ax[lr]] for lr in ['left', 'right']})
+                    for ax in YINFO]
         if ('ylabel_rotation' in results
                 and isinstance(results['ylabel_rotation'], (int, str))):
             ylabel_rotation = results['ylabel_rotation']
@@ -605,20 +863,20 @@ class BasePloTemplate(object):
         zip_results = []
         for i, _results in enumerate(results['zip_results'], 0):
             if len(_results) != 3:
-                log.error("`zip_results[%d]`: invalid length!" % i)
+                log.error("`zip_results[%d]`: invalid length!", i)
                 continue
             temp, pos, _res = _results
             try:
                 template_method = getattr(self, temp)
             except AttributeError:
-                log.error("`zip_results[%d]`: template %s not found!"
-                          % (i, temp))
+                log.error("`zip_results[%d]`: template %s not found!",
+                          i, temp)
                 continue
             try:
                 _axs, _sty = template_method(_res)
                 zip_results.append((_axs[0], pos))
             except Exception:
-                log.error("`zip_results[%d]`: failed to get AxStruct!" % i,
+                log.error("`zip_results[%d]`: failed to get AxStruct!", i,
                           exc_info=1)
                 continue
         suptitle = str(results['suptitle']) if 'suptitle' in results else None
@@ -6,11 +6,13 @@
 Contains matplotlib plotter class. A simple wrapper for matplotlib.
 '''
 
+import io
 import os
 import matplotlib
 import matplotlib.style
-import matplotlib.pyplot
-import mpl_toolkits.mplot3d
+import matplotlib.figure
+import matplotlib.gridspec
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 from ..glogger import getGLogger
 from .base import BasePlotter, BasePloTemplate
@@ -27,6 +29,10 @@ _Mpl_Axes_Structure = '''
         [8, 'twinx or twiny', (), dict(nextcolor='int')],
         # def revise_func(fig, axesdict, artistdict, **kw)
         [9, 'revise', revise_func, {'kw'}],
+        # or named revise operation, serializable
+        [10, 'revise', 'colorbar', {'artist': 1}],
+        [11, 'revise', 'suptitle', {'t': 'figure title'}],
+        [12, 'revise', 'rasterize', {'artist': 1}],
     ],
     'layout': ['int, gridspec, list', {'add_subplot, add_axes kwargs'}],
     'axstyle': [{'axes.grid': True}],
@@ -34,11 +40,49 @@ _Mpl_Axes_Structure = '''
 '''
 
 
+def _revise_colorbar(fig, axesdict, artistdict, artist=1, **kwargs):
+    '''Add colorbar of artist *artist*.'''
+    return fig.colorbar(artistdict[artist], **kwargs)
+
+
+def _revise_suptitle(fig, axesdict, artistdict, t='', **kwargs):
+    '''Add centered title *t* to the figure.'''
+    return fig.suptitle(t, **kwargs)
+
+
+def _revise_rasterize(fig, axesdict, artistdict, artist=1):
+    '''Rasterize artist *artist*, including contour collections.'''
+    art = artistdict[artist]
+    for a in getattr(art, 'collections', [art]):
+        a.set_rasterized(True)
+
+
+_Mpl_Revise_Operations = {
+    'colorbar': _revise_colorbar,
+    'suptitle': _revise_suptitle,
+    'rasterize': _revise_rasterize,
+}
+
+
 class MatplotlibPlotter(BasePlotter, BasePloTemplate):
     '''
     Use matplotlib to create figures.
+
+    Attributes
+    ----------
+    headless: bool
+        If True, create :class:`matplotlib.figure.Figure` objects directly
+        with an Agg canvas, and they are not registered in pyplot.
+        This is for batch export, :meth:`show_figure` does nothing.
+
+    Parameters
+    ----------
+    name: str
+    headless: bool, default False
     '''
-    __slots__ = []
+    __slots__ = ['headless']
+    # rasterize pcolor, contourf artists when Z.size is larger
+    rasterize_size = 10000
 
     def __get_mplstyle_library(path):
         available = matplotlib.style.available.copy()
@@ -50,9 +94,10 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
         os.path.dirname(os.path.abspath(__file__)), 'mpl-stylelib')
     style_available = __get_mplstyle_library(__STYLE_LIBPATH)
 
-    def __init__(self, name):
+    def __init__(self, name, headless=False):
         super(MatplotlibPlotter, self).__init__(
             name, style=['gdpy3-notebook'], example_axes=_Mpl_Axes_Structure)
+        self.headless = bool(headless)
 
     def _check_style(self, sty):
         '''Check single style *sty*.'''
@@ -63,7 +108,7 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
                 pass
             return True
         except Exception as exc:
-            log.error("Ignore style '%s': %s" % (sty, exc))
+            log.error("Ignore style '%s': %s", sty, exc)
             return False
 
     def _filter_style(self, sty):
@@ -75,9 +120,20 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
             with matplotlib.style.context(self.filter_style(self.style)):
                 return matplotlib.rcParams[param]
         else:
-            log.error("Invalid param '%s' for matplotlib.rcParams!" % param)
+            log.error("Invalid param '%s' for matplotlib.rcParams!", param)
             return None
 
+    def _pixel_size(self):
+        '''Return the (width, height) of figure in pixels, from style.'''
+        figsize = self.param_from_style('figure.figsize')
+        dpi = self.param_from_style('savefig.dpi')
+        if dpi == 'figure':
+            dpi = self.param_from_style('figure.dpi')
+        try:
+            return int(figsize[0] * dpi), int(figsize[1] * dpi)
+        except (TypeError, IndexError):
+            return super(MatplotlibPlotter, self)._pixel_size()
+
     def _add_axes(self, fig, data, layout, axstyle):
         '''
         Add axes to *fig*: `matplotlib.figure.Figure` instance
@@ -92,61 +148,74 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
         with matplotlib.style.context(self.filter_style(axstyle)):
             # use layout
             try:
-                log.ddebug("Adding axes %s ..." % layout[0])
+                log.ddebug("Adding axes %s ...", layout[0])
+                if layout[1].get('projection', None) == '3d':
+                    import mpl_toolkits.mplot3d
                 if isinstance(layout[0], list):
                     ax = fig.add_axes(layout[0], **layout[1])
                 else:
                     ax = fig.add_subplot(layout[0], **layout[1])
             except Exception:
-                log.error("Failed to add axes %s!" % layout[0], exc_info=1)
+                log.error("Failed to add axes %s!", layout[0], exc_info=1)
                 return
             # use data
             axesdict, artistdict = {0: ax}, {}
             for index, axfunc, fargs, fkwargs in data:
                 if axfunc in ('twinx', 'twiny'):
-                    log.ddebug("Creating twin axes %s: %s ..."
-                               % (index, axfunc))
+                    log.ddebug("Creating twin axes %s: %s ...",
+                               index, axfunc)
                     try:
                         ax = getattr(ax, axfunc)()
                         if index in axesdict:
-                            log.warn("Duplicate index %s!" % index)
+                            log.warn("Duplicate index %s!", index)
                         axesdict[index] = ax
                         if 'nextcolor' in fkwargs:
                             for i in range(fkwargs['nextcolor']):
                                 # i=next(ax._get_lines.prop_cycler)
                                 i = ax._get_lines.get_next_color()
                     except Exception:
-                        log.error("Failed to create axes %s!"
-                                  % index, exc_info=1)
+                        log.error("Failed to create axes %s!",
+                                  index, exc_info=1)
                 elif axfunc == 'revise':
-                    log.ddebug("Revising axes %s ..." % layout[0])
+                    log.ddebug("Revising axes %s ...", layout[0])
                     try:
+                        if isinstance(fargs, str):
+                            fargs = _Mpl_Revise_Operations[fargs]
                         fargs(fig, axesdict, artistdict, **fkwargs)
                     except Exception:
-                        log.error("Failed to revise axes %s!"
-                                  % layout[0], exc_info=1)
+                        log.error("Failed to revise axes %s!",
+                                  layout[0], exc_info=1)
                 else:
-                    log.ddebug("Adding artist %s: %s ..." % (index, axfunc))
+                    log.ddebug("Adding artist %s: %s ...", index, axfunc)
                     try:
                         art = getattr(ax, axfunc)(*fargs, **fkwargs)
                         if index in artistdict:
-                            log.warn("Duplicate index %s!" % index)
+                            log.warn("Duplicate index %s!", index)
                         artistdict[index] = art
                     except Exception:
-                        log.error("Failed to add artist %s!"
-                                  % index, exc_info=1)
+                        log.error("Failed to add artist %s!",
+                                  index, exc_info=1)
 
     def _create_figure(self, num, axesstructures, figstyle):
         '''Create object *fig*.'''
         with matplotlib.style.context(self.filter_style(figstyle)):
-            fig = matplotlib.pyplot.figure(num=num)
+            if self.headless:
+                fig = matplotlib.figure.Figure()
+                FigureCanvasAgg(fig)
+            else:
+                # pyplot selects backend, import it only when needed
+                import matplotlib.pyplot as pyplot
+                fig = pyplot.figure(num=num)
             for i, axstructure in enumerate(axesstructures, 1):
-                log.ddebug("Picking AxesStructure %d ..." % i)
+                log.ddebug("Picking AxesStructure %d ...", i)
                 self.add_axes(fig, axstructure)
         return fig
 
     def _show_figure(self, fig):
         '''Display *fig*.'''
+        if self.headless:
+            log.warn("Headless plotter can't display figures!")
+            return fig
         if matplotlib.get_backend() in (
                 'nbAgg',
                 'nbagg',
@@ -158,18 +227,31 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
 
     def _close_figure(self, fig):
         '''Close *fig*.'''
-        matplotlib.pyplot.close(fig)
+        if not self.headless:
+            import matplotlib.pyplot as pyplot
+            pyplot.close(fig)
         fig.clf()
 
     def _save_figure(self, fig, fpath, **kwargs):
         '''Save *fig* to *fpath*.'''
         fig.savefig(fpath, **kwargs)
 
+    def _figure_to_bytes(self, fig, fmt, **kwargs):
+        '''Render *fig* to bytes in format *fmt*.'''
+        if fmt == 'rgba':
+            if fig.canvas is None or not hasattr(fig.canvas, 'buffer_rgba'):
+                FigureCanvasAgg(fig)
+            fig.canvas.draw()
+            return bytes(fig.canvas.buffer_rgba())
+        with io.BytesIO() as buf:
+            fig.savefig(buf, format=fmt, **kwargs)
+            return buf.getvalue()
+
     @staticmethod
     def _template_line_axstructs(LINE, title, xlabel, ylabel, xlim, ylim,
                                  ylabel_rotation, legend_kwargs):
         '''For :meth:`template_line_axstructs`.'''
-        log.debug("Getting Axes %s ..." % 111)
+        log.debug("Getting Axes %s ...", 111)
         data, layoutkw, addlegend = [], {}, False
         for i, ln in enumerate(LINE, 1):
             if len(ln) == 3:
@@ -219,8 +301,7 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
                                  dict(zdir=x, offset=_offsetd[x])])
         if colorbar:
             order += 1
-            data.append([order, 'revise',
-                         lambda fig, ax, art: fig.colorbar(art[1]), {}])
+            data.append([order, 'revise', 'colorbar', {'artist': 1}])
         if grid_alpha is not None:
             order += 1
             data.append([order, 'grid', (), dict(alpha=grid_alpha)])
@@ -228,8 +309,27 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
         if not plot_method_args and plot_method == 'contourf':
             plotarg.extend([100])
         plotkw.update(vmin=-Zmax, vmax=Zmax)
+        if plot_method == 'imshow':
+            # uniform rectilinear grid, cell centers at X, Y
+            x, y = X[0, :], Y[:, 0]
+            dx = (x[-1] - x[0]) / (len(x) - 1) / 2 if len(x) > 1 else 0.5
+            dy = (y[-1] - y[0]) / (len(y) - 1) / 2 if len(y) > 1 else 0.5
+            plotkw.update(extent=[x[0] - dx, x[-1] + dx,
+                                  y[0] - dy, y[-1] + dy],
+                          origin='lower', aspect='auto',
+                          interpolation='nearest')
         plotkw.update(plot_method_kwargs)
-        data.insert(0,  [1, plot_method, [X, Y, Z] + plotarg, plotkw])
+        if plot_method == 'imshow':
+            data.insert(0,  [1, plot_method, [Z] + plotarg, plotkw])
+        else:
+            data.insert(0,  [1, plot_method, [X, Y, Z] + plotarg, plotkw])
+        if (Z.size >= MatplotlibPlotter.rasterize_size
+                and plot_method not in ('plot_surface', 'imshow')):
+            if plot_method == 'contourf':
+                order += 1
+                data.append([order, 'revise', 'rasterize', {'artist': 1}])
+            else:
+                plotkw.setdefault('rasterized', True)
         if title:
             layoutkw['title'] = title
         if xlabel:
@@ -246,7 +346,7 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
         AxStructs = []
         for row in range(len(YINFO)):
             number = int("%s1%s" % (len(YINFO), row + 1))
-            log.debug("Getting Axes %s ..." % number)
+            log.debug("Getting Axes %s ...", number)
             layout = dict(xlim=xlim)
             if row == 0 and title:
                 layout['title'] = title
@@ -297,11 +397,11 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
         AxStructs = []
         for i, _results in enumerate(zip_results, 0):
             ax, pos = _results
-            log.debug("Getting Axes %s ..." % (pos,))
+            log.debug("Getting Axes %s ...", pos)
             if isinstance(pos, (int, list, matplotlib.gridspec.SubplotSpec)):
                 ax['layout'][0] = pos
             else:
-                log.error("`zip_results[%d]`: invalid position!" % i)
+                log.error("`zip_results[%d]`: invalid position!", i)
                 continue
             AxStructs.append(ax)
         if not suptitle:
@@ -309,9 +409,8 @@ class MatplotlibPlotter(BasePlotter, BasePloTemplate):
 
         try:
             data = AxStructs[0]['data']
-
-            def addsuptitle(fig, ax, art): return fig.suptitle(suptitle)
-            data.append([len(data) + 1, 'revise', addsuptitle, dict()])
+            data.append([len(data) + 1, 'revise', 'suptitle',
+                         dict(t=suptitle)])
         except Exception:
-            log.error("Failed to set suptitle: %s!" % suptitle)
+            log.error("Failed to set suptitle: %s!", suptitle)
         return AxStructs, []
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import tempfile
+import unittest
+import numpy
+
+from ..axstructs import dumps, loads, dump, load
+
+
+class TestAxesStructuresSerialization(unittest.TestCase):
+    '''
+    Test functions dumps, loads, dump, load
+    '''
+
+    def setUp(self):
+        X, Y = numpy.meshgrid(numpy.arange(3), numpy.linspace(0, 1, 4))
+        self.axstructs = [{
+            'data': [
+                [1, 'pcolormesh', [X, Y, numpy.eye(4, 3)],
+                 dict(vmin=-1.0, vmax=numpy.float64(1.0), cmap='jet')],
+                [2, 'plot', (range(3), numpy.array([1j, 2, 3])),
+                 dict(label='line')],
+                [3, 'revise', 'colorbar', {'artist': 1}],
+            ],
+            'layout': [111, dict(title='t', xlim=(0, 2))],
+        }, {
+            'data': [[1, 'plot', (numpy.zeros((0,)), []), {}]],
+            'layout': [[0.1, 0.1, 0.8, 0.2], {}],
+            'axstyle': [{'axes.grid': True}],
+        }]
+        self.add_style = [{'figure.subplot.hspace': 0.02}]
+        self.tmpfile = tempfile.mktemp(suffix='-axstructs.bin')
+
+    def tearDown(self):
+        if os.path.isfile(self.tmpfile):
+            os.remove(self.tmpfile)
+
+    def test_dumps_loads(self):
+        data = dumps(self.axstructs, self.add_style)
+        self.assertIsInstance(data, bytes)
+        axstructs, add_style = loads(data)
+        self.assertListEqual(self.add_style, add_style)
+        d1, d2 = axstructs[0]['data'], self.axstructs[0]['data']
+        for i in range(3):
+            self.assertTrue(numpy.array_equal(d1[0][2][i], d2[0][2][i]))
+        self.assertEqual(d2[0][2][1].dtype, d1[0][2][1].dtype)
+        self.assertDictEqual(d2[0][3], d1[0][3])
+        self.assertIsInstance(d1[1][2], tuple)
+        self.assertListEqual([0, 1, 2], d1[1][2][0])
+        self.assertTrue(numpy.array_equal(d2[1][2][1], d1[1][2][1]))
+        self.assertListEqual(d2[2], d1[2])
+        self.assertEqual((0, 2), axstructs[0]['layout'][1]['xlim'])
+        self.assertEqual((0,), axstructs[1]['data'][0][2][0].shape)
+        self.assertDictEqual(self.axstructs[1]['axstyle'][0],
+                             axstructs[1]['axstyle'][0])
+        with self.assertRaises(ValueError):
+            loads(b'not-axstructs-bytes')
+
+    def test_dump_load(self):
+        dump(self.axstructs, self.add_style, self.tmpfile)
+        axstructs, add_style = load(self.tmpfile)
+        self.assertTrue(numpy.array_equal(
+            self.axstructs[0]['data'][0][2][2], axstructs[0]['data'][0][2][2]))
+
+    def test_unsupported(self):
+        self.axstructs[0]['data'].append(
+            [4, 'revise', lambda fig, ax, art: None, {}])
+        with self.assertRaises(TypeError):
+            dumps(self.axstructs)
+        with self.assertRaises(TypeError):
+            dumps([{'data': [[1, 'plot', (numpy.array([None]),), {}]]}])
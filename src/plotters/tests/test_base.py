@@ -3,8 +3,10 @@
 # Copyright (c) 2018 shmilee
 
 import os
+import sys
 import unittest
 import tempfile
+import subprocess
 import numpy
 
 from ..base import BasePlotter, BasePloTemplate
@@ -49,6 +51,9 @@ class ImpBasePlotter(BasePlotter, BasePloTemplate):
         with open(fpath, 'w') as f:
             f.write(fig['num'])
 
+    def _figure_to_bytes(self, fig, fmt, **kwargs):
+        return ('%s.%s' % (fig['num'], fmt)).encode()
+
     @staticmethod
     def _template_line_axstructs(*input_list):
         return input_list, []
@@ -80,6 +85,18 @@ class TestBasePlotter(unittest.TestCase):
         if os.path.isfile(self.tmpfile):
             os.remove(self.tmpfile)
 
+    def test_plotter_lazy_import(self):
+        pkg = __name__.split('.')[0]
+        pkgdir = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        code = ('import sys, {0}.loaders, {0}.savers, {0}.plotters; '
+                'import {0}.processors.basecore; '
+                'print([m for m in ("numpy", "matplotlib", "h5py") '
+                'if m in sys.modules])').format(pkg)
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(pkgdir))
+        out = subprocess.check_output([sys.executable, '-c', code], env=env)
+        self.assertEqual(out.decode().strip(), '[]')
+
     def test_plotter_init(self):
         self.assertEqual(self.plotter.name, 'test-plotter')
         self.assertListEqual(self.plotter.style, ['s99'])
@@ -136,6 +153,9 @@ class TestBasePlotter(unittest.TestCase):
         self.plotter.save_figure('test-f2', self.tmpfile)
         with open(self.tmpfile, 'r') as f:
             self.assertEqual(f.read(), 'test-f2')
+        self.assertEqual(self.plotter.figure_to_bytes('test-f2'),
+                         b'test-f2.png')
+        self.assertIsNone(self.plotter.figure_to_bytes('test-f3'))
 
     def test_plotter_template_line_axstructs(self):
         fun = self.plotter.template_line_axstructs
@@ -153,6 +173,50 @@ class TestBasePlotter(unittest.TestCase):
         self.assertNotEqual([], axstruct)
         self.assertIsNone(axstruct[2])
 
+    def test_plotter_template_line_decimate(self):
+        fun = self.plotter.template_line_axstructs
+        x = numpy.linspace(0, 100, 100000)
+        y = numpy.sin(x)
+        y[54321] = 5.0
+        calculation = dict(LINE=[(x, y, 'sin'), ([1, 2], [3, 4])])
+        axstruct, add_style = fun(calculation)
+        self.assertEqual(100000, len(axstruct[0][0][0]))
+        for method in self.plotter.decimate_methods:
+            calculation.update(decimate=1000, decimate_method=method)
+            axstruct, add_style = fun(calculation)
+            X, Y, label = axstruct[0][0]
+            self.assertTrue(len(X) <= 1002)
+            self.assertEqual(len(X), len(Y))
+            self.assertEqual('sin', label)
+            self.assertEqual((x[0], x[-1]), (X[0], X[-1]))
+            self.assertEqual(5.0, Y.max())
+            if method == 'minmax':
+                self.assertEqual(y.min(), Y.min())
+            self.assertListEqual([1, 2], list(axstruct[0][1][0]))
+        self.assertEqual(100000, len(calculation['LINE'][0][0]))
+
+    def test_plotter_template_line_decimate_nan(self):
+        fun = self.plotter.template_line_axstructs
+        x = numpy.linspace(0, 100, 10000)
+        y = numpy.sin(x)
+        # blow up, then all NaN
+        y[6000:6100] = numpy.exp(numpy.arange(100))
+        y[6100:] = numpy.nan
+        y[100] = numpy.nan
+        calculation = dict(LINE=[(x, y, 'sin')])
+        for method in self.plotter.decimate_methods:
+            calculation.update(decimate=100, decimate_method=method)
+            axstruct, add_style = fun(calculation)
+            X, Y, label = axstruct[0][0]
+            self.assertTrue(len(X) <= 102)
+            self.assertEqual((x[0], x[-1]), (X[0], X[-1]))
+            if method == 'minmax':
+                self.assertEqual(numpy.nanmax(y), numpy.nanmax(Y))
+        calculation.update(LINE=[(x, numpy.full(10000, numpy.nan))],
+                           decimate_method='minmax')
+        axstruct, add_style = fun(calculation)
+        self.assertTrue(len(axstruct[0][0][0]) <= 102)
+
     def test_plotter_template_pcolor_axstructs(self):
         fun = self.plotter.template_pcolor_axstructs
         calculation = dict(
@@ -180,6 +244,37 @@ class TestBasePlotter(unittest.TestCase):
         self.assertIsNotNone(axstruct[7])
         self.assertListEqual(['x', 'z'], axstruct[-1])
 
+    def test_plotter_template_pcolor_mesh_downsample(self):
+        fun = self.plotter.template_pcolor_axstructs
+        x, y = numpy.linspace(0, 1, 3000), numpy.linspace(0, 2, 1000)
+        Z = numpy.random.rand(1000, 3000) - 0.5
+        Z[501, 1234] = 9.0
+        calculation = dict(X=x, Y=y, Z=Z)
+        axstruct, add_style = fun(calculation)
+        self.assertEqual('imshow', axstruct[3])
+        self.assertEqual((1000, 1500), axstruct[2].shape)
+        calculation.update(downsample=(100, 300), downsample_method='max')
+        axstruct, add_style = fun(calculation)
+        self.assertEqual((100, 300), axstruct[2].shape)
+        self.assertEqual(9.0, axstruct[2].max())
+        self.assertAlmostEqual(x.mean(), axstruct[0].mean())
+        calculation.update(X=x ** 2, downsample=False, plot_method='pcolor')
+        axstruct, add_style = fun(calculation)
+        self.assertEqual('pcolormesh', axstruct[3])
+        self.assertIs(Z, axstruct[2])
+        calculation.update(plot_method='contourf', downsample=100)
+        axstruct, add_style = fun(calculation)
+        self.assertEqual('contourf', axstruct[3])
+        self.assertEqual((100, 100), axstruct[2].shape)
+        for n in (0, 1, -5):
+            calculation.update(downsample=n)
+            axstruct, add_style = fun(calculation)
+            self.assertIs(Z, axstruct[2])
+        X, Y = numpy.meshgrid(x, y)
+        calculation.update(X=X * Y, Y=Y, plot_method='pcolor')
+        axstruct, add_style = fun(calculation)
+        self.assertEqual('pcolor', axstruct[3])
+
     def test_plotter_template_sharex_twinx_axstructs(self):
         fun = self.plotter.template_sharex_twinx_axstructs
         calculation = dict(
@@ -207,6 +302,13 @@ class TestBasePlotter(unittest.TestCase):
         ))
         axstruct, add_style = fun(calculation)
         self.assertEqual(calculation['hspace'], axstruct[2])
+        calculation.update(decimate=10)
+        axstruct, add_style = fun(calculation)
+        X, YINFO = axstruct[0], axstruct[1]
+        self.assertTrue(len(X) < 99)
+        self.assertEqual(len(X), len(YINFO[0]['left'][0][0]))
+        self.assertEqual(len(X), len(YINFO[0]['left'][1][0]))
+        self.assertEqual('dec', YINFO[0]['left'][0][1])
         self.assertEqual(calculation['title'], axstruct[3])
         self.assertEqual(calculation['xlabel'], axstruct[4])
         self.assertListEqual(calculation['xlim'], axstruct[5])
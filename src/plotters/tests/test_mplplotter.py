@@ -213,6 +213,46 @@ class TestMatplotlibPlotter(unittest.TestCase):
         self.plotter.close_figure('all')
         self.assertListEqual(self.plotter.figures, [])
 
+    def test_mplplotter_headless(self):
+        import matplotlib.pyplot as plt
+        from ..mplplotter import MatplotlibPlotter
+        plotter = MatplotlibPlotter('mpl::headless', headless=True)
+        fignums = plt.get_fignums()
+        plotter.create_figure('test-h1', ax1, add_style=['seaborn'])
+        # not registered in pyplot
+        self.assertListEqual(plt.get_fignums(), fignums)
+        png = plotter.figure_to_bytes('test-h1', 'png')
+        self.assertTrue(png.startswith(b'\x89PNG\r\n\x1a\n'))
+        width, height = plotter.get_figure('test-h1').canvas.get_width_height()
+        rgba = plotter.figure_to_bytes('test-h1', 'rgba')
+        self.assertEqual(len(rgba), width * height * 4)
+        self.assertIsNone(plotter.figure_to_bytes('test-h0'))
+        plotter.close_figure('all')
+        self.assertListEqual(plotter.figures, [])
+        self.assertListEqual(plt.get_fignums(), fignums)
+
+    def test_mplplotter_rasterize_size(self):
+        from ..mplplotter import MatplotlibPlotter
+        plotter = MatplotlibPlotter('mpl::headless', headless=True)
+        bigx, bigy = np.meshgrid(np.arange(100), np.arange(120))
+        bigdata = np.sin(bigx / 20) * np.cos(bigy / 20)
+        self.assertGreaterEqual(bigdata.size, plotter.rasterize_size)
+        self.assertLess(fielddata.size, plotter.rasterize_size)
+        for method in ('pcolormesh', 'contourf'):
+            for Z, X, Y, big in [(bigdata, bigx, bigy, True),
+                                 (fielddata, fieldx, fieldy, False)]:
+                axstruct, sty = plotter.template_pcolor_axstructs(dict(
+                    X=X, Y=Y, Z=Z, plot_method=method, title='rasterize'))
+                fig = plotter.create_figure('test-r', *axstruct,
+                                            add_style=sty)
+                artists = fig.axes[0].collections
+                self.assertTrue(artists)
+                for artist in artists:
+                    self.assertEqual(bool(artist.get_rasterized()), big)
+                png = plotter.figure_to_bytes('test-r', 'png')
+                self.assertTrue(png.startswith(b'\x89PNG'))
+                plotter.close_figure('test-r')
+
     def test_mplplotter_template_line_axstructs(self):
         axstruct, sty = self.plotter.template_line_axstructs(temp_lineresults)
         self.plotter.create_figure('template-f1', *axstruct, add_style=sty)
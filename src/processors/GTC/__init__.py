@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains cores for GTC outputs, one module for each kind of output file.
+Use :func:`get_registry` to get all cores of a GTC version.
+'''
+
+import importlib
+
+from ..coreregistry import CoreRegistry
+
+__all__ = ['get_registry']
+
+versions = ['110922']
+_cores = {
+    '110922': [
+        ('gtc', 'GtcCoreV110922'),
+        ('history', 'HistoryCoreV110922'),
+        ('data1d', 'Data1dCoreV110922'),
+        ('snapshot', 'SnapshotCoreV110922'),
+        ('equilibrium', 'EquilibriumCoreV110922'),
+        ('meshgrid', 'MeshgridCoreV110922'),
+        ('trackparticle', 'TrackParticleCoreV110922'),
+        ('contrib_data1drzf', 'Data1dRZFCoreV110922'),
+        ('history', 'HistoryBinaryCoreV110922'),
+        ('data1d', 'Data1dBinaryCoreV110922'),
+        ('snapshot', 'SnapshotBinaryCoreV110922'),
+    ],
+}
+_registries = {}
+
+
+def get_registry(version='110922'):
+    '''
+    Return a :class:`coreregistry.CoreRegistry` of GTC cores of *version*.
+    Raises ValueError if *version* is not supported.
+    '''
+    if version not in versions:
+        raise ValueError('Unsupported GTC version: "%s"! '
+                         'Did you mean one of: "%s"?'
+                         % (version, ', '.join(versions)))
+    if version not in _registries:
+        registry = CoreRegistry()
+        for module, name in _cores[version]:
+            module = importlib.import_module('.' + module, __name__)
+            registry.register(getattr(module, name))
+        _registries[version] = registry
+    return _registries[version]
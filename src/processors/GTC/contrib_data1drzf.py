@@ -29,7 +29,7 @@ class Data1dRZFCoreV110922(BaseCore):
     def _dig(self):
         '''Read 'gtc.out'.'''
         with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
+            log.ddebug("Read file '%s'.", self.file)
             outdata = f.read()
         sd = {}
         numpat = r'[-+]?\d+[\.]?\d*[eE]?[-+]?\d*'
@@ -41,7 +41,7 @@ class Data1dRZFCoreV110922(BaseCore):
                + numpat + r'?)\s+?\*{5}')
         mdata = [m.groupdict() for m in re.finditer(pat, outdata, re.M)]
         if len(mdata) == 2 and len(mdata[1]) == 4:
-            log.debug("Filling datakeys: %s ..." %
+            log.debug("Filling datakeys: %s ...",
                       str([key for key, val in mdata[1].items()]))
             sd.update({key: int(val) if val.isdigit() else float(val)
                        for key, val in mdata[1].items()})
@@ -103,7 +103,7 @@ class ResidualZFFigInfo(Field00FigInfo):
             if Z1[i] != 0:
                 break
         if i != istep:
-            log.warn("Find nozero in '%s', before istep: '%s'!" % (i, istep))
+            log.warn("Find nozero in '%s', before istep: '%s'!", i, istep)
         time = np.arange(istep, Z1.size) * tunit
         Z1, Z2 = Z1[istep:] / abs(Z1[istep]), Z2[istep:] / abs(Z2[istep])
         # find residual region
@@ -121,10 +121,10 @@ class ResidualZFFigInfo(Field00FigInfo):
                 idx1, len1 = Z1.size // 2, Z1.size // 4
             if len2 == 0:
                 idx2, len2 = Z1.size // 2, Z1.size // 4
-        log.parm("Residual region of r=%s: [%s,%s], index: [%s,%s)." % (
-            iZ1, time[idx1], time[idx1 + len1 - 1], idx1, idx1 + len1))
-        log.parm("Residual region of r=%s: [%s,%s], index: [%s,%s)." % (
-            iZ2, time[idx2], time[idx2 + len2 - 1], idx2, idx2 + len2))
+        log.parm("Residual region of r=%s: [%s,%s], index: [%s,%s).",
+                 iZ1, time[idx1], time[idx1 + len1 - 1], idx1, idx1 + len1)
+        log.parm("Residual region of r=%s: [%s,%s], index: [%s,%s).",
+                 iZ2, time[idx2], time[idx2 + len2 - 1], idx2, idx2 + len2)
         res1, res2 = sum(Z1[idx1:idx1 + len1]) / len1, \
             sum(Z2[idx2:idx2 + len2]) / len2
         ax2_calc = dict(
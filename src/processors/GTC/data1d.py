@@ -61,9 +61,10 @@ diagnosis.F90:194-203, ::
 '''
 
 import numpy
+from ..fortranio import read_numbers, fortran_rows
 from ..basecore import BaseCore, BasePcolorFigInfo, log
 
-__all__ = ['Data1dCoreV110922']
+__all__ = ['Data1dCoreV110922', 'Data1dBinaryCoreV110922']
 
 
 class Data1dCoreV110922(BaseCore):
@@ -95,32 +96,36 @@ class Data1dCoreV110922(BaseCore):
         # 7. fieldrms(0:mpsi,nfield)
         'fieldrms-phi', 'fieldrms-apara', 'fieldrms-fluidne')
 
+    # text or binary, None for auto selection
+    _binary = None
+
     def _dig(self):
         '''Read 'data1d.out'.'''
-        with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
-            outdata = f.readlines()
+        with self.rawloader.getbuffer(self.file) as buf:
+            log.ddebug("Read file '%s'.", self.file)
+            # first record data1di(0:mpsi,mpdata1d) tells size of reals
+            header, outdata = read_numbers(
+                buf, 7, 0, binary=self._binary,
+                recordsize=lambda ints: ints[1] * ints[4])
 
         sd = {}
         # 1. diagnosis.F90:opendiag():739
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[:7]))
-        for i, key in enumerate(self._datakeys[:7]):
-            sd.update({key: int(outdata[i].strip())})
+        log.debug("Filling datakeys: %s ...", self._datakeys[:7])
+        sd.update(zip(self._datakeys[:7], header))
 
         # 2. diagnosis.F90:opendiag():790
-        outdata = numpy.array([float(n.strip()) for n in outdata[7:]])
         ndata = sd['mpsi+1'] * (sd['nspecies'] * sd['mpdata1d'] +
                                 sd['nfield'] * sd['mfdata1d'])
         if len(outdata) // ndata != sd['ndstep']:
-            log.debug("Filling datakeys: %s ..." % 'ndstep')
+            log.debug("Filling datakeys: %s ...", 'ndstep')
             sd.update({'ndstep': len(outdata) // ndata})
             outdata = outdata[:sd['ndstep'] * ndata]
 
-        # reshape outdata
-        outdata = outdata.reshape((ndata, sd['ndstep']), order='F')
+        # reshape outdata, C-contiguous rows
+        outdata = fortran_rows(outdata, ndata)
 
         # 3. data1di(0:mpsi,mpdata1d), mpdata1d=3
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[7:10]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[7:10])
         sd.update({'i-particle-flux': outdata[:sd['mpsi+1'], :]})
         index0, index1 = sd['mpsi+1'], 2 * sd['mpsi+1']
         sd.update({'i-energy-flux':  outdata[index0:index1, :]})
@@ -129,7 +134,7 @@ class Data1dCoreV110922(BaseCore):
 
         # 4. data1de(0:mpsi,mpdata1d)
         if sd['nspecies'] > 1 and sd['nhybrid'] > 0:
-            log.debug("Filling datakeys: %s ..." % str(self._datakeys[10:13]))
+            log.debug("Filling datakeys: %s ...", self._datakeys[10:13])
             index0, index1 = index1, index1 + sd['mpsi+1']
             sd.update({'e-particle-flux': outdata[index0:index1, :]})
             index0, index1 = index1, index1 + sd['mpsi+1']
@@ -143,7 +148,7 @@ class Data1dCoreV110922(BaseCore):
         # 5. data1df(0:mpsi,mpdata1d)
         if ((sd['nspecies'] == 2 and sd['nhybrid'] == 0) or
                 (sd['nspecies'] == 3 and sd['nhybrid'] > 0)):
-            log.debug("Filling datakeys: %s ..." % str(self._datakeys[13:16]))
+            log.debug("Filling datakeys: %s ...", self._datakeys[13:16])
             index0, index1 = index1, index1 + sd['mpsi+1']
             sd.update({'f-particle-flux': outdata[index0:index1, :]})
             index0, index1 = index1, index1 + sd['mpsi+1']
@@ -155,7 +160,7 @@ class Data1dCoreV110922(BaseCore):
                        'f-energy-flux': [], 'f-momentum-flux': []})
 
         # 6. field00(0:mpsi,nfield), nfield=3
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[16:19]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[16:19])
         index0 = sd['mpsi+1'] * sd['nspecies'] * sd['mpdata1d']
         index1 = index0 + sd['mpsi+1']
         sd.update({'field00-phi': outdata[index0:index1, :]})
@@ -165,7 +170,7 @@ class Data1dCoreV110922(BaseCore):
         sd.update({'field00-fluidne': outdata[index0:index1, :]})
 
         # 7. fieldrms(0:mpsi,nfield)
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[19:22]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[19:22])
         index0, index1 = index1, index1 + sd['mpsi+1']
         sd.update({'fieldrms-phi': outdata[index0:index1, :]})
         index0, index1 = index1, index1 + sd['mpsi+1']
@@ -251,5 +256,17 @@ class FieldRMSFigInfo(BasePcolorFigInfo):
                     xlabel=r'time($R_0/c_s$)', ylabel=r'$r$(mpsi)')
 
 
+class Data1dBinaryCoreV110922(Data1dCoreV110922):
+    '''
+    Radial Time Data, in Fortran unformatted sequential or stream file
+    'data1d.bin'. Dig the same datakeys as text file.
+    '''
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>data1d)\.bin$',
+                    r'.*/(?P<group>data1d)\.bin$']
+    _binary = True
+
+
 Data1dCoreV110922.figureclasses = [
     FluxFigInfo, Field00FigInfo, FieldRMSFigInfo]
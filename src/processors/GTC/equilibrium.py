@@ -82,12 +82,12 @@ class EquilibriumCoreV110922(BaseCore):
     def _dig(self):
         '''Read 'equilibrium.out'.'''
         with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
+            log.ddebug("Read file '%s'.", self.file)
             outdata = f.readlines()
 
         sd = {}
         # 1. first part
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[:3]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[:3])
         sd.update({'nplot-1d': int(outdata[0].strip()),
                    'nrad': int(outdata[1].strip())})
         size1 = (sd['nplot-1d'] + 1) * sd['nrad']
@@ -96,12 +96,12 @@ class EquilibriumCoreV110922(BaseCore):
         data1 = data1.reshape(shape1, order='C')
         sd.update({'1d-data': data1})
         # 2. second part
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[3:6]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[3:6])
         index2 = 2 + size1
         sd.update({'nplot-2d': int(outdata[index2].strip()),
                    'mpsi-over-mskip+1': int(outdata[index2 + 1].strip()),
                    'lst': int(outdata[index2 + 2].strip())})
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[6:]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[6:])
         size2 = (sd['nplot-2d'] + 2) * sd['mpsi-over-mskip+1'] * sd['lst']
         shape2 = ((sd['nplot-2d'] + 2), sd['mpsi-over-mskip+1'] * sd['lst'])
         data2 = numpy.array([float(n.strip())
@@ -290,7 +290,7 @@ class Plot2DFigInfo(BasePcolorFigInfo):
                 data.append([len(data) + 1, 'set_aspect', ('equal',), dict()])
             except Exception:
                 log.error(
-                    "Failed to patch fignum %s!" % self.fignum, exc_info=1)
+                    "Failed to patch fignum %s!", self.fignum, exc_info=1)
         return AxStrus, add_style
 
 
@@ -328,7 +328,7 @@ class Plot2DMeshFigInfo(BaseLineFigInfo):
                 data.append([len(data) + 1, 'set_aspect', ('equal',), dict()])
             except Exception:
                 log.error(
-                    "Failed to patch fignum %s!" % self.fignum, exc_info=1)
+                    "Failed to patch fignum %s!", self.fignum, exc_info=1)
         return AxStrus, add_style
 
 
@@ -379,8 +379,8 @@ class Plot2DThetaFigInfo(BaseLineFigInfo):
             isp = kwargs.pop('isp')
             if isinstance(isp, int) and isp <= self.isp:
                 self.isp = isp
-        log.parm("fix: psi=isp=%d. Maximal isp=%d."
-                 % (self.isp, data['mpsi-over-mskip+1'] - 1))
+        log.parm("fix: psi=isp=%d. Maximal isp=%d.",
+                 self.isp, data['mpsi-over-mskip+1'] - 1)
         super(Plot2DThetaFigInfo, self).calculate(data, **kwargs)
 
 
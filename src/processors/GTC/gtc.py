@@ -36,7 +36,7 @@ class GtcCoreV110922(BaseCore):
     def _dig(self):
         '''Read 'gtc.out' parameters.'''
         with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
+            log.ddebug("Read file '%s'.", self.file)
             outdata = f.readlines()
 
         sd = {}
@@ -54,9 +54,9 @@ class GtcCoreV110922(BaseCore):
                     val = float(val)
                     # if int(val) - val == 0:
                     #    val = int(val)
-                log.ddebug("Filling datakey: %s=%s ..." % (key.lower(), val))
+                log.ddebug("Filling datakey: %s=%s ...", key.lower(), val)
                 sd.update({key.lower(): val})
-        log.debug("Filled datakeys: %s ..." % str(tuple(sd.keys())))
+        log.debug("Filled datakeys: %s ...", tuple(sd.keys()))
 
         # search other parameters, one by one
         otherparapats = [
@@ -90,10 +90,10 @@ class GtcCoreV110922(BaseCore):
                         val = int(val)
                     else:
                         val = float(val)
-                    log.ddebug("Filling datakey: %s=%s ..." % (key, val))
+                    log.ddebug("Filling datakey: %s=%s ...", key, val)
                     debugkeys.append(key)
                     sd.update({key: val})
-        log.debug("Filled datakeys: %s ..." % str(debugkeys))
+        log.debug("Filled datakeys: %s ...", debugkeys)
 
         # backup gtc.out, broken with archive loader
         # log.ddebug("Filling datakey: %s ..." % 'backup-gtcout')
@@ -59,9 +59,10 @@ diagfast(mpdiag), pushf.F90:472-483
 
 import numpy as np
 from .. import tools
+from ..fortranio import read_numbers, fortran_rows
 from ..basecore import BaseCore, BaseFigInfo, BaseSharexTwinxFigInfo, log
 
-__all__ = ['HistoryCoreV110922']
+__all__ = ['HistoryCoreV110922', 'HistoryBinaryCoreV110922']
 
 
 class HistoryCoreV110922(BaseCore):
@@ -93,51 +94,57 @@ class HistoryCoreV110922(BaseCore):
         'fieldmode-apara-real', 'fieldmode-apara-imag',
         'fieldmode-fluidne-real', 'fieldmode-fluidne-imag')
 
+    # text or binary, None for auto selection
+    _binary = None
+
     def _dig(self):
         '''Read 'history.out'.'''
-        with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
-            outdata = f.readlines()
+        with self.rawloader.getbuffer(self.file) as buf:
+            log.ddebug("Read file '%s'.", self.file)
+            header, outdata = read_numbers(buf, 6, 1, binary=self._binary)
 
         sd = {}
-        # 1. diagnosis.F90:opendiag():734-735
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[:7]))
-        for i, key in enumerate(self._datakeys[:6]):
-            sd.update({key: int(outdata[i].strip())})
-        # 1. tstep*ndiag
-        sd.update({'tstep*ndiag': float(outdata[6].strip())})
+        # 1. diagnosis.F90:opendiag():734-735, tstep*ndiag
+        log.debug("Filling datakeys: %s ...", self._datakeys[:7])
+        sd.update(zip(self._datakeys[:7], header))
 
         # 2. diagnosis.F90:opendiag():729::
-        outdata = np.array([float(n.strip()) for n in outdata[7:]])
         ndata = sd['nspecies'] * sd['mpdiag'] + \
             sd['nfield'] * (2 * sd['modes'] + sd['mfdiag'])
         if len(outdata) // ndata != sd['ndstep']:
             ndstep = len(outdata) // ndata
-            log.debug("Updating datakey: %s=%d ..." % ('ndstep', ndstep))
+            log.debug("Updating datakey: %s=%d ...", 'ndstep', ndstep)
             sd.update({'ndstep': len(outdata) // ndata})
             outdata = outdata[:sd['ndstep'] * ndata]
 
-        # reshape outdata
-        outdata = outdata.reshape((ndata, sd['ndstep']), order='F')
+        # reshape outdata, C-contiguous rows
+        # fieldmode(2,modes,nfield) rows -> real rows, imag rows of each field
+        index0 = sd['nspecies'] * sd['mpdiag'] + sd['nfield'] * sd['mfdiag']
+        order = list(range(index0))
+        for i in range(sd['nfield']):
+            start = index0 + i * 2 * sd['modes']
+            order.extend(range(start, start + 2 * sd['modes'], 2))
+            order.extend(range(start + 1, start + 2 * sd['modes'], 2))
+        outdata = fortran_rows(outdata, ndata, order)
 
         # 3. partdata(mpdiag,nspecies)
-        log.debug("Filling datakey: %s ..." % 'ion')
+        log.debug("Filling datakey: %s ...", 'ion')
         sd.update({'ion': outdata[:sd['mpdiag'], :]})
         if sd['nspecies'] > 1:
-            log.debug("Filling datakey: %s ..." % 'electron')
+            log.debug("Filling datakey: %s ...", 'electron')
             index0, index1 = sd['mpdiag'], 2 * sd['mpdiag']
             sd.update({'electron': outdata[index0:index1, :]})
         else:
             sd.update({'electron': []})
         if sd['nspecies'] > 2:
-            log.debug("Filling datakey: %s ..." % 'fastion')
+            log.debug("Filling datakey: %s ...", 'fastion')
             index0, index1 = 2 * sd['mpdiag'], 3 * sd['mpdiag']
             sd.update({'fastion': outdata[index0:index1, :]})
         else:
             sd.update({'fastion': []})
 
         # 4. fieldtime(mfdiag,nfield)
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[10:13]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[10:13])
         index0 = sd['nspecies'] * sd['mpdiag']
         index1 = index0 + sd['mfdiag']
         sd.update({'fieldtime-phi': outdata[index0:index1, :]})
@@ -146,17 +153,13 @@ class HistoryCoreV110922(BaseCore):
         index0, index1 = index1, index1 + sd['mfdiag']
         sd.update({'fieldtime-fluidne': outdata[index0:index1, :]})
 
-        # 5. fieldmode(2,modes,nfield)
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[13:]))
-        index0, index1 = index1, index1 + 2 * sd['modes']
-        sd.update({'fieldmode-phi-real': outdata[index0:index1:2, :]})
-        sd.update({'fieldmode-phi-imag': outdata[index0 + 1:index1:2, :]})
-        index0, index1 = index1, index1 + 2 * sd['modes']
-        sd.update({'fieldmode-apara-real': outdata[index0:index1:2, :]})
-        sd.update({'fieldmode-apara-imag': outdata[index0 + 1:index1:2, :]})
-        index0, index1 = index1, index1 + 2 * sd['modes']
-        sd.update({'fieldmode-fluidne-real': outdata[index0:index1:2, :]})
-        sd.update({'fieldmode-fluidne-imag': outdata[index0 + 1:index1:2, :]})
+        # 5. fieldmode(2,modes,nfield), real rows, imag rows
+        log.debug("Filling datakeys: %s ...", self._datakeys[13:])
+        for field in ('phi', 'apara', 'fluidne'):
+            index0, index1 = index1, index1 + sd['modes']
+            sd.update({'fieldmode-%s-real' % field: outdata[index0:index1, :]})
+            index0, index1 = index1, index1 + sd['modes']
+            sd.update({'fieldmode-%s-imag' % field: outdata[index0:index1, :]})
 
         return sd
 
@@ -317,8 +320,8 @@ class ModeFigInfo(BaseFigInfo):
             if region_len == 0:
                 reg1, region_len = 0, ndstep // 4
             reg2 = reg1 + region_len
-        log.parm("Find growth region: [%s,%s], index: [%s,%s)."
-                 % (time[reg1], time[reg2 - 1], reg1, reg2))
+        log.parm("Find growth region: [%s,%s], index: [%s,%s).",
+                 time[reg1], time[reg2 - 1], reg1, reg2)
         # polyfit region1
         result, line = tools.fitline(
             time[reg1:reg2], logya[reg1:reg2], 1,
@@ -340,7 +343,7 @@ class ModeFigInfo(BaseFigInfo):
             np.divide(yreal, np.exp(growth * time)), 47, 3)
         index = [i for i in tools.argrelextrema(normreal, m='both')
                  if reg1 + 0.1 * region_len <= i < reg1 + 0.9 * region_len]
-        log.parm("Real argrelextrema: %s" % index)
+        log.parm("Real argrelextrema: %s", index)
         if len(index) >= 2:
             reg3, reg4, nT1 = index[0], index[-1], (len(index) - 1) / 2
             omega1 = 2 * np.pi * nT1 / (time[reg4] - time[reg3])
@@ -351,7 +354,7 @@ class ModeFigInfo(BaseFigInfo):
             np.divide(yimag, np.exp(growth * time)), 47, 3)
         index = [i for i in tools.argrelextrema(normimag, m='both')
                  if reg1 + 0.1 * region_len <= i < reg1 + 0.9 * region_len]
-        log.parm("Imag argrelextrema: %s" % index)
+        log.parm("Imag argrelextrema: %s", index)
         if len(index) >= 2:
             reg5, reg6, nT2 = index[0], index[-1], (len(index) - 1) / 2
             omega2 = 2 * np.pi * nT2 / (time[reg6] - time[reg5])
@@ -384,7 +387,7 @@ class ModeFigInfo(BaseFigInfo):
         _tf, _af, _pf = tools.fft(dt, sgn)
         index = np.argmax(_pf)
         omega3 = _tf[index]
-        log.parm("Get frequency: %s, %s" % (index, _tf[index]))
+        log.parm("Get frequency: %s, %s", index, _tf[index])
         ax4_calc = dict(
             LINE=[(_tf, _pf, 'power spectral'),
                   ([omega3], [_pf[index]], r'$\omega_{pmax}=%.6f$' % omega3)],
@@ -395,5 +398,17 @@ class ModeFigInfo(BaseFigInfo):
         self.calculation.update(omega3=omega3)
 
 
+class HistoryBinaryCoreV110922(HistoryCoreV110922):
+    '''
+    History Data, in Fortran unformatted sequential or stream file
+    'history.bin'. Dig the same datakeys as text file.
+    '''
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>history)\.bin$',
+                    r'.*/(?P<group>history)\.bin$']
+    _binary = True
+
+
 HistoryCoreV110922.figureclasses = [
     ParticleFigInfo, FieldFigInfo, ModeFigInfo]
@@ -51,17 +51,17 @@ class MeshgridCoreV110922(BaseCore):
     def _dig(self):
         '''Read 'meshgrid.out'.'''
         with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
+            log.ddebug("Read file '%s'.", self.file)
             outdata = f.readlines()
 
         sd = {}
         shape = (7, len(outdata) // 7)
         outdata = outdata[:len(outdata) // 7 * 7]
         if len(outdata) % 7 != 0:
-            log.warn("Missing some raw data in '%s'! Guess the shape '%s'."
-                     % (self.file, shape))
+            log.warn("Missing some raw data in '%s'! Guess the shape '%s'.",
+                     self.file, shape)
 
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[:]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[:])
         outdata = numpy.array([float(n.strip()) for n in outdata])
         outdata = outdata.reshape(shape, order='F')
         for i, key in enumerate(self._datakeys):
@@ -36,12 +36,13 @@ field quantities: phi, a_para, fluidne.
 '''
 
 import numpy as np
+from ..fortranio import read_numbers, fortran_blocks
 from ..basecore import (
     BaseCore, BaseFigInfo, log,
     BaseSharexTwinxFigInfo, BasePcolorFigInfo,
 )
 
-__all__ = ['SnapshotCoreV110922']
+__all__ = ['SnapshotCoreV110922', 'SnapshotBinaryCoreV110922']
 
 
 class SnapshotCoreV110922(BaseCore):
@@ -81,36 +82,37 @@ class SnapshotCoreV110922(BaseCore):
         # 5. fluxdata(0:mtgrid,mtoroidal,nfield)
         'fluxdata-phi', 'fluxdata-apara', 'fluxdata-fluidne')
 
+    # text or binary, None for auto selection
+    _binary = None
+
     def _dig(self):
-        '''Read 'snap%05d.out' % istep.'''
-        with self.rawloader.get(self.file) as f:
-            log.ddebug("Read file '%s'." % self.file)
-            outdata = f.readlines()
+        '''
+        Read 'snap%05d.out' % istep.
+        Each Fortran array block is copied once into C-contiguous arrays.
+        '''
+        with self.rawloader.getbuffer(self.file) as buf:
+            log.ddebug("Read file '%s'.", self.file)
+            header, outdata = read_numbers(buf, 6, 1, binary=self._binary)
 
         sd = {}
-        # 1. parameters
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[:7]))
-        for i, key in enumerate(self._datakeys[:6]):
-            sd.update({key: int(outdata[i].strip())})
-        # 1. T_up, 1.0/emax_inv
-        sd.update({'T_up': float(outdata[6].strip())})
-
-        outdata = np.array([float(n.strip()) for n in outdata[7:]])
+        # 1. parameters, T_up=1.0/emax_inv
+        log.debug("Filling datakeys: %s ...", self._datakeys[:7])
+        sd.update(zip(self._datakeys[:7], header))
 
         # 2. profile(0:mpsi,6,nspecies)
         tempsize = sd['mpsi+1'] * 6 * sd['nspecies']
         tempshape = (sd['mpsi+1'], 6, sd['nspecies'])
-        tempdata = outdata[:tempsize].reshape(tempshape, order='F')
-        log.debug("Filling datakey: %s ..." % 'ion-profile')
-        sd.update({'ion-profile': tempdata[:, :, 0]})
+        tempdata = fortran_blocks(outdata[:tempsize], tempshape)
+        log.debug("Filling datakey: %s ...", 'ion-profile')
+        sd.update({'ion-profile': tempdata[0]})
         if sd['nspecies'] > 1:
-            log.debug("Filling datakey: %s ..." % 'electron-profile')
-            sd.update({'electron-profile': tempdata[:, :, 1]})
+            log.debug("Filling datakey: %s ...", 'electron-profile')
+            sd.update({'electron-profile': tempdata[1]})
         else:
             sd.update({'electron-profile': []})
         if sd['nspecies'] > 2:
-            log.debug("Filling datakey: %s ..." % 'fastion-profile')
-            sd.update({'fastion-profile': tempdata[:, :, 2]})
+            log.debug("Filling datakey: %s ...", 'fastion-profile')
+            sd.update({'fastion-profile': tempdata[2]})
         else:
             sd.update({'fastion-profile': []})
 
@@ -119,45 +121,57 @@ class SnapshotCoreV110922(BaseCore):
         tempsize = sd['nvgrid'] * 4 * sd['nspecies']
         index1 = index0 + tempsize
         tempshape = (sd['nvgrid'], 4, sd['nspecies'])
-        tempdata = outdata[index0:index1].reshape(tempshape, order='F')
-        log.debug("Filling datakey: %s ..." % 'ion-pdf')
-        sd.update({'ion-pdf': tempdata[:, :, 0]})
+        tempdata = fortran_blocks(outdata[index0:index1], tempshape)
+        log.debug("Filling datakey: %s ...", 'ion-pdf')
+        sd.update({'ion-pdf': tempdata[0]})
         if sd['nspecies'] > 1:
-            log.debug("Filling datakey: %s ..." % 'electron-pdf')
-            sd.update({'electron-pdf': tempdata[:, :, 1]})
+            log.debug("Filling datakey: %s ...", 'electron-pdf')
+            sd.update({'electron-pdf': tempdata[1]})
         else:
             sd.update({'electron-pdf': []})
         if sd['nspecies'] > 2:
-            log.debug("Filling datakey: %s ..." % 'fastion-pdf')
-            sd.update({'fastion-pdf': tempdata[:, :, 2]})
+            log.debug("Filling datakey: %s ...", 'fastion-pdf')
+            sd.update({'fastion-pdf': tempdata[2]})
         else:
             sd.update({'fastion-pdf': []})
 
         # 4. poloidata(0:mtgrid,0:mpsi,nfield+2), nfield=3
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[13:18]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[13:18])
         tempsize = sd['mtgrid+1'] * sd['mpsi+1'] * (sd['nfield'] + 2)
         index0, index1 = index1, index1 + tempsize
         tempshape = (sd['mtgrid+1'], sd['mpsi+1'], sd['nfield'] + 2)
-        tempdata = outdata[index0:index1].reshape(tempshape, order='F')
-        sd.update({'poloidata-phi': tempdata[:, :, 0]})
-        sd.update({'poloidata-apara': tempdata[:, :, 1]})
-        sd.update({'poloidata-fluidne': tempdata[:, :, 2]})
-        sd.update({'poloidata-x': tempdata[:, :, 3]})
-        sd.update({'poloidata-z': tempdata[:, :, 4]})
+        tempdata = fortran_blocks(outdata[index0:index1], tempshape)
+        sd.update({'poloidata-phi': tempdata[0]})
+        sd.update({'poloidata-apara': tempdata[1]})
+        sd.update({'poloidata-fluidne': tempdata[2]})
+        sd.update({'poloidata-x': tempdata[3]})
+        sd.update({'poloidata-z': tempdata[4]})
 
         # 5. fluxdata(0:mtgrid,mtoroidal,nfield)
-        log.debug("Filling datakeys: %s ..." % str(self._datakeys[18:]))
+        log.debug("Filling datakeys: %s ...", self._datakeys[18:])
         tempsize = sd['mtgrid+1'] * sd['mtoroidal'] * sd['nfield']
         index0, index1 = index1, index1 + tempsize
         tempshape = (sd['mtgrid+1'], sd['mtoroidal'], sd['nfield'])
-        tempdata = outdata[index0:index1].reshape(tempshape, order='F')
-        sd.update({'fluxdata-phi': tempdata[:, :, 0]})
-        sd.update({'fluxdata-apara': tempdata[:, :, 1]})
-        sd.update({'fluxdata-fluidne': tempdata[:, :, 2]})
+        tempdata = fortran_blocks(outdata[index0:index1], tempshape)
+        sd.update({'fluxdata-phi': tempdata[0]})
+        sd.update({'fluxdata-apara': tempdata[1]})
+        sd.update({'fluxdata-fluidne': tempdata[2]})
 
         return sd
 
 
+class SnapshotBinaryCoreV110922(SnapshotCoreV110922):
+    '''
+    Snapshot Data, in Fortran unformatted sequential or stream file
+    'snap%05d.bin' % istep. Dig the same datakeys as text file.
+    '''
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>snap\d{5})\.bin$',
+                    r'.*/(?P<group>snap\d{5})\.bin$']
+    _binary = True
+
+
 class ProfilePdfFigInfo(BaseSharexTwinxFigInfo):
     '''Figures of ion, electron, fastion radial profiles and pdf.'''
     __slots__ = ['particle', 'pf']
@@ -257,7 +271,7 @@ class FieldFluxPloidalFigInfo(BasePcolorFigInfo):
                 data.append([len(data) + 1, 'set_aspect', ('equal',), dict()])
             except Exception:
                 log.error(
-                    "Failed to patch fignum %s!" % self.fignum, exc_info=1)
+                    "Failed to patch fignum %s!", self.fignum, exc_info=1)
         return AxStrus, add_style
 
 
@@ -288,10 +302,10 @@ class FieldSpectrumFigInfo(BaseFigInfo):
         mtgrid1, mtoroidal = data['mtgrid+1'], data['mtoroidal']
         fluxdata = data['fluxdata-%s' % self.field]
         if fluxdata.size == 0:
-            log.warn("No data for fignum %s." % self.fignum)
+            log.warn("No data for fignum %s.", self.fignum)
             return
         if fluxdata.shape != (mtgrid1, mtoroidal):
-            log.error("Invalid fluxdata shape for fignum %s!" % self.fignum)
+            log.error("Invalid fluxdata shape for fignum %s!", self.fignum)
             return
         mtgrid = mtgrid1 - 1
         maxmmode = int(mtgrid / 2 + 1)
@@ -304,8 +318,8 @@ class FieldSpectrumFigInfo(BaseFigInfo):
         if ('pmode' in kwargs and isinstance(kwargs['pmode'], (int, float))
                 and int(kwargs['pmode']) <= maxpmode):
             pmode = int(kwargs['pmode'])
-        log.parm("Poloidal and parallel range: m=%s, p=%s. Maximal m=%s, p=%s"
-                 % (mmode, pmode, maxmmode, maxpmode))
+        log.parm("Poloidal and parallel range: m=%s, p=%s. Maximal m=%s, p=%s",
+                 mmode, pmode, maxmmode, maxpmode)
         X1, Y1 = np.arange(1, mmode + 1), np.zeros(mmode)
         X2, Y2 = np.arange(1, pmode + 1), np.zeros(pmode)
         for i in range(mtoroidal):
@@ -360,10 +374,10 @@ class FieldProfileFigInfo(BaseFigInfo):
         mpsi1, mtgrid1 = data['mpsi+1'], data['mtgrid+1']
         pdata = data['poloidata-%s' % self.field]
         if pdata.size == 0:
-            log.warn("No data for fignum %s." % self.fignum)
+            log.warn("No data for fignum %s.", self.fignum)
             return
         if pdata.shape != (mtgrid1, mpsi1):
-            log.error("Invalid poloidata shape for fignum %s!" % self.fignum)
+            log.error("Invalid poloidata shape for fignum %s!", self.fignum)
             return
         itgrid = 0
         ipsi = (mpsi1 - 1) // 2
@@ -374,8 +388,8 @@ class FieldProfileFigInfo(BaseFigInfo):
                 and kwargs['ipsi'] < mpsi1):
             ipsi = kwargs['ipsi']
         log.parm("Poloidal and radius cut: itgrid=%s, ipsi=%s. "
-                 "Maximal itgrid=%s, ipsi=%s."
-                 % (itgrid, ipsi, mtgrid1 - 1, mpsi1 - 1))
+                 "Maximal itgrid=%s, ipsi=%s.",
+                 itgrid, ipsi, mtgrid1 - 1, mpsi1 - 1)
         X1, Y11 = np.arange(0, mpsi1), pdata[itgrid, :]
         X2 = np.arange(0, mtgrid1) / mtgrid1 * 2 * np.pi
         Y21 = pdata[:, ipsi]
@@ -60,7 +60,7 @@ class TrackParticleCoreV110922(BaseCore):
         keyprefix = ['ion', 'electron', 'fastion']
         for f in self.file:
             with self.rawloader.get(f) as fid:
-                log.ddebug("Read file '%s'." % fid.name)
+                log.ddebug("Read file '%s'.", fid.name)
                 istep = fid.readline()
                 while istep:
                     nums = [int(n) for n in fid.readline().split()]
@@ -85,7 +85,7 @@ class TrackParticleCoreV110922(BaseCore):
                 particle[key].sort()
                 particle[key] = np.array(particle[key])
             if particle.keys():
-                log.debug("Filling datakeys: %s ..." %
+                log.debug("Filling datakeys: %s ...",
                           str(tuple(particle.keys())))
                 sd.update(particle)
         return sd
@@ -136,8 +136,8 @@ class OrbitFigInfo(BaseFigInfo):
         trackp = 'trackp/%s-' % self.species
         particles = self.pckloader.find(trackp)
         total = len(particles)
-        log.parm("Total number of tracked %s particles: %d."
-                 % (self.species, total))
+        log.parm("Total number of tracked %s particles: %d.",
+                 self.species, total)
         # sorted key function
         skey = kwargs['skey'] if 'skey' in kwargs else 'increase'
         if isinstance(skey, types.FunctionType):
@@ -163,9 +163,9 @@ class OrbitFigInfo(BaseFigInfo):
         ax_cal = {}
         for n, idx in enumerate(index):
             number = int("33%s" % str(n + 1))
-            log.debug("calculating Axes %d ..." % number)
+            log.debug("calculating Axes %d ...", number)
             if idx + 1 > total:
-                log.error("Failed to calculate Axes %d ..." % number)
+                log.error("Failed to calculate Axes %d ...", number)
                 continue
             try:
                 pdata = self.pckloader[particles[idx]]
@@ -193,8 +193,8 @@ class OrbitFigInfo(BaseFigInfo):
                     ]
                     ax_cal[number] = dict(layoutkw=lay, data=data)
             except Exception:
-                log.error("Failed to get data of '%s' from %s!"
-                          % (self.species + ':' + pname, self.pckloader.path),
+                log.error("Failed to get data of '%s' from %s!",
+                          self.species + ':' + pname, self.pckloader.path,
                           exc_info=1)
         self.calculation['axes_results'] = ax_cal
         # suptitle
@@ -243,7 +243,7 @@ class OrbitFigInfo(BaseFigInfo):
 
     def serve(self, plotter):
         if not plotter.name.startswith('mpl::'):
-            log.error("Need 'mpl::' plotter, not %s!" % plotter.name)
+            log.error("Need 'mpl::' plotter, not %s!", plotter.name)
             raise ValueError("Plotter %s not supported!" % plotter.name)
         AxStrus = []
         for number in range(331, 340):
@@ -265,10 +265,8 @@ class OrbitFigInfo(BaseFigInfo):
         # suptitle
         data = AxStrus[0]['data']
         order = len(data) + 1
-
-        def addsuptitle(fig, ax, art):
-            return fig.suptitle(self.calculation['suptitle'])
-        data.append([order, 'revise', addsuptitle, dict()])
+        data.append([order, 'revise', 'suptitle',
+                     dict(t=self.calculation['suptitle'])])
         return AxStrus, []
 
 
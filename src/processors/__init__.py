@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+This is the subpackage ``processors`` of gdpy3.
+It contains the core base classes in :mod:`basecore`,
+tools for cores in :mod:`tools`,
+text or Fortran binary numbers reader for cores in :mod:`fortranio`,
+registry to classify raw files and groups of many cores in :mod:`coreregistry`,
+cooked results cache in :mod:`cookcache`,
+scheduler to cook many figures together in :mod:`cookscheduler`,
+and cores for each GTC version in subpackages like :mod:`GTC`.
+'''
@@ -10,6 +10,7 @@ import os
 import re
 
 from ..glogger import getGLogger
+from ..gprofiler import profile
 from ..loaders import is_rawloader, is_pckloader
 from ..plotters import is_plotter
 
@@ -38,9 +39,11 @@ class BaseCore(object):
     pckloader: pckloader object to get pickled data
     figurenums: tuple
         figure nums(labels) in the *group*
+    cookcache: :class:`cookcache.CookCache` object or None
+        cache of cooked results, set by :meth:`set_cook_args`
     '''
     __slots__ = ['rawloader', 'file', 'nfiles', 'group',
-                 'pckloader', 'figurenums']
+                 'pckloader', 'figurenums', 'cookcache']
     instructions = ['dig', 'cook']
     filepatterns = ['^(?P<group>file)\.ext$', '.*/(?P<group>file)\.ext$']
     grouppattern = '^group$'
@@ -56,6 +59,7 @@ class BaseCore(object):
         self.group = None
         self.pckloader = None
         self.figurenums = tuple(self.get_figurenums())
+        self.cookcache = None
 
     @classmethod
     def match_files(cls, rawloader):
@@ -90,9 +94,10 @@ class BaseCore(object):
         for pat in cls.filepatterns:
             if re.match(pat, file):
                 result = True
+                break
         if not result:
-            log.error("Invalid 'file' str: %s, its pattern: '%s'."
-                      % (file, cls.filepatterns))
+            log.error("Invalid 'file' str: %s, its pattern: '%s'.",
+                      file, cls.filepatterns)
         return result
 
     @classmethod
@@ -104,8 +109,8 @@ class BaseCore(object):
         if re.match(cls.grouppattern, group):
             return True
         else:
-            log.error("Invalid 'group' str: %s, its pattern: '%s'."
-                      % (group, cls.grouppattern))
+            log.error("Invalid 'group' str: %s, its pattern: '%s'.",
+                      group, cls.grouppattern)
             return False
 
     @staticmethod
@@ -126,11 +131,16 @@ class BaseCore(object):
                 star = '*' * (len(f) - len(sub))
                 return '%s%s' % (sub, star)
 
-    def set_dig_args(self, rawloader, file, group=None):
-        '''Set :meth:`dig` arguments.'''
+    def set_dig_args(self, rawloader, file, group=None, checked=False):
+        '''
+        Set :meth:`dig` arguments.
+        If *checked* is True, *file* and *group* are got from a match,
+        like :meth:`CoreRegistry.dig_tasks`, their patterns are not
+        checked again.
+        '''
         if 'dig' not in self.instructions:
-            log.error("Core %s: no '%s' instruction!"
-                      % (self.__class__.__name__, 'dig'))
+            log.error("Core %s: no '%s' instruction!",
+                      self.__class__.__name__, 'dig')
             return
         if not is_rawloader(rawloader):
             raise ValueError("Not a rawloader object!")
@@ -142,7 +152,7 @@ class BaseCore(object):
             if file not in rawloader:
                 raise ValueError("'%s' is not in rawloader: %s!"
                                  % (file, rawloader.path))
-            if not self._check_filestr(file):
+            if not checked and not self._check_filestr(file):
                 raise ValueError("Invalid 'file' str: %s!" % file)
             self.file = file
         elif self.nfiles == '+':
@@ -153,16 +163,16 @@ class BaseCore(object):
                 if f not in rawloader:
                     raise ValueError("'%s' is not in rawloader: %s!"
                                      % (f, rawloader.path))
-                if not self._check_filestr(f):
+                if not checked and not self._check_filestr(f):
                     raise ValueError("Invalid 'file' str: %s!" % f)
             self.file = file
         else:
             pass
         if group:
-            if self._check_groupstr(group):
+            if checked or self._check_groupstr(group):
                 if self.group:
-                    log.debug("'group': replace '%s' with '%s'!"
-                              % (self.group, group))
+                    log.debug("'group': replace '%s' with '%s'!",
+                              self.group, group)
                 self.group = group
             else:
                 raise ValueError("Invalid 'group' str: %s!" % group)
@@ -183,13 +193,14 @@ class BaseCore(object):
                     break
             if group:
                 if self.group:
-                    log.debug("'group': replace '%s' with '%s'!"
-                              % (self.group, group))
+                    log.debug("'group': replace '%s' with '%s'!",
+                              self.group, group)
                 self.group = group
             else:
                 raise ValueError("Please set 'group' by yourself!")
-        log.debug("Dig file: %s; group: %s." % (self.file, self.group))
+        log.debug("Dig file: %s; group: %s.", self.file, self.group)
 
+    @profile('dig', name=lambda self: str(self.group))
     def dig(self):
         '''
         Read raw data, convert them. Return a dict.
@@ -198,27 +209,32 @@ class BaseCore(object):
             log.error(
                 "Please set 'rawloader', 'file', 'group' before dig data!")
             return
-        log.debug('Dig raw data in %s ...' % self.file)
+        log.debug('Dig raw data in %s ...', self.file)
         return self._dig()
 
-    def set_cook_args(self, pckloader, group):
-        '''Set :meth:`cook` arguments.'''
+    def set_cook_args(self, pckloader, group, cookcache=None):
+        '''
+        Set :meth:`cook` arguments.
+        *cookcache*: :class:`cookcache.CookCache` object, optional
+        '''
         if 'cook' not in self.instructions:
-            log.error("Core %s: no '%s' instruction!"
-                      % (self.__class__.__name__, 'cook'))
+            log.error("Core %s: no '%s' instruction!",
+                      self.__class__.__name__, 'cook')
             return
         if not is_pckloader(pckloader):
             raise ValueError("Not a pckloader object!")
         self.pckloader = pckloader
         if self._check_groupstr(group):
             if self.group:
-                log.debug("'group': replace '%s' with '%s'!"
-                          % (self.group, group))
+                log.debug("'group': replace '%s' with '%s'!",
+                          self.group, group)
             else:
-                log.debug("Cook group: %s." % group)
+                log.debug("Cook group: %s.", group)
             self.group = group
         else:
             raise ValueError("Invalid 'group' str: %s!" % group)
+        if cookcache is not None:
+            self.cookcache = cookcache
 
     @classmethod
     def get_figurenums(cls):
@@ -228,11 +244,15 @@ class BaseCore(object):
                 result.extend(c.figurenums)
         return sorted(result)
 
+    @profile('cook', name=lambda self, fignum, *args, **kwargs:
+             '%s/%s' % (self.group, fignum), nbytes=None)
     def cook(self, fignum, figkwargs={}):
         '''
         Read and calculate pck data. Return a :class:`BaseFigInfo` instance.
         Use :meth:`see_figkwargs` to get
         :meth:`BaseFigInfo.calculate` kwargs for the figinfo 'fignum'.
+        If :attr:`cookcache` is set, reuse the cached calculation
+        for the same source data and *figkwargs*.
         '''
         if not self.pckloader or not self.group:
             log.error(
@@ -241,8 +261,8 @@ class BaseCore(object):
         if fignum.startswith('%s/' % self.group):
             fignum = fignum[len(self.group) + 1:]
         if fignum not in self.figurenums:
-            log.error("%s not found in figurenums of class %s!"
-                      % (fignum, self.__class__.__name__))
+            log.error("%s not found in figurenums of class %s!",
+                      fignum, self.__class__.__name__)
             return
         else:
             figinfocls = None
@@ -251,23 +271,44 @@ class BaseCore(object):
                     figinfocls = c
                     break
         if figinfocls:
-            log.debug('Cook pck data for %s/%s ...' % (self.group, fignum))
+            log.debug('Cook pck data for %s/%s ...', self.group, fignum)
             figinfo = figinfocls(fignum, self.group)
+            cache, cachekey = self.cookcache, None
+            if cache is not None:
+                cachekey = cache.make_key(self, figinfo, figkwargs,
+                                          pckloader=self.pckloader)
+                calculation = cache.get(cachekey) if cachekey else None
+                if calculation is not None:
+                    log.debug('Use cached calculation for %s/%s.',
+                              self.group, fignum)
+                    figinfo.calculation = calculation
+                    return figinfo
             try:
                 data = figinfo.get_data(self.pckloader)
             except Exception:
-                log.error("figurenum %s/%s: can't get data!"
-                          % (self.group, fignum), exc_info=1)
+                log.error("figurenum %s/%s: can't get data!",
+                          self.group, fignum, exc_info=1)
                 return figinfo
+            if cache is not None and cachekey is None:
+                cachekey = cache.make_key(self, figinfo, figkwargs, data=data)
+                calculation = cache.get(cachekey) if cachekey else None
+                if calculation is not None:
+                    log.debug('Use cached calculation for %s/%s.',
+                              self.group, fignum)
+                    figinfo.calculation = calculation
+                    return figinfo
             try:
                 figinfo.calculate(data, **figkwargs)
             except Exception:
-                log.error("figurenum %s/%s: calculate() failed!"
-                          % (self.group, fignum), exc_info=1)
+                log.error("figurenum %s/%s: calculate() failed!",
+                          self.group, fignum, exc_info=1)
+            else:
+                if cachekey:
+                    cache.set(cachekey, figinfo.calculation)
             return figinfo
         else:
-            log.error("FigInfo class not found for figurenum: %s/%s!"
-                      % (self.group, fignum))
+            log.error("FigInfo class not found for figurenum: %s/%s!",
+                      self.group, fignum)
             return
 
     def see_figkwargs(self, fignum, see='help'):
@@ -276,7 +317,7 @@ class BaseCore(object):
         *see*: str, 'help' or 'print'
         '''
         if fignum not in self.figurenums:
-            log.error("%s not found in figurenums!" % fignum)
+            log.error("%s not found in figurenums!", fignum)
             return
         else:
             figinfocls = None
@@ -290,8 +331,8 @@ class BaseCore(object):
             else:
                 print(figinfocls.calculate.__doc__)
         else:
-            log.error("FigInfo class not found for figurenum: %s/%s!"
-                      % (self.group, fignum))
+            log.error("FigInfo class not found for figurenum: %s/%s!",
+                      self.group, fignum)
             return
 
 
@@ -370,8 +411,8 @@ class BaseFigInfo(object):
             try:
                 template_method = getattr(plotter, self.template)
             except AttributeError:
-                log.error("Template %s not found in plotter %s!"
-                          % (self.template, plotter.name))
+                log.error("Template %s not found in plotter %s!",
+                          self.template, plotter.name)
                 raise
         else:
             raise ValueError("Not a plotter object!")
@@ -409,17 +450,22 @@ class BaseLineFigInfo(BaseFigInfo):
             default [min(X), max(X)]
         *ylabel_rotation*: str or int
             default 'vertical'
+        *decimate*: bool or int
+            decimate long lines to about *decimate* points,
+            True for two times of figure pixel width, default False
+        *decimate_method*: str
+            'minmax' or 'lttb', default 'minmax'
         '''
         self.calculation.update(self._get_data_LINE_title_etc(data))
         if len(self.calculation['LINE']) == 0:
-            log.warn("No data for fignum %s." % self.fignum)
+            log.warn("No data for fignum %s.", self.fignum)
         debug_kw = {}
-        for k in ['xlim', 'ylabel_rotation']:
+        for k in ['xlim', 'ylabel_rotation', 'decimate', 'decimate_method']:
             if k in kwargs:
                 self.calculation[k] = kwargs[k]
             if k in self.calculation:
                 debug_kw[k] = self.calculation[k]
-        log.ddebug("Some kwargs accepted: %s" % debug_kw)
+        log.ddebug("Some kwargs accepted: %s", debug_kw)
 
 
 class BaseSharexTwinxFigInfo(BaseFigInfo):
@@ -451,17 +497,23 @@ class BaseSharexTwinxFigInfo(BaseFigInfo):
             default [min(X), max(X)]
         *ylabel_rotation*: str or int
             default 'vertical'
+        *decimate*: bool or int
+            decimate long lines to about *decimate* points,
+            True for two times of figure pixel width, default False
+        *decimate_method*: str
+            'minmax' or 'lttb', default 'minmax'
         '''
         self.calculation.update(self._get_data_X_Y_title_etc(data))
         if len(self.calculation['YINFO']) == 0:
-            log.warn("No data for fignum %s." % self.fignum)
+            log.warn("No data for fignum %s.", self.fignum)
         debug_kw = {}
-        for k in ['hspace', 'xlim', 'ylabel_rotation']:
+        for k in ['hspace', 'xlim', 'ylabel_rotation',
+                  'decimate', 'decimate_method']:
             if k in kwargs:
                 self.calculation[k] = kwargs[k]
             if k in self.calculation:
                 debug_kw[k] = self.calculation[k]
-        log.ddebug("Some kwargs accepted: %s" % debug_kw)
+        log.ddebug("Some kwargs accepted: %s", debug_kw)
 
 
 class BasePcolorFigInfo(BaseFigInfo):
@@ -492,21 +544,23 @@ class BasePcolorFigInfo(BaseFigInfo):
         2. *colorbar* : default True
         3. other keyword arguments:
             *plot_method_args*, *plot_method_kwargs*,
-            *grid_alpha*, *plot_surface_shadow*
+            *grid_alpha*, *plot_surface_shadow*,
+            *downsample*, *downsample_method*
         '''
         self.calculation.update(self._get_data_X_Y_Z_title_etc(data))
         if len(self.calculation['Z']) == 0:
-            log.warn("No data for fignum %s." % self.fignum)
+            log.warn("No data for fignum %s.", self.fignum)
         self.calculation['plot_method'] = self.default_plot_method
         debug_kw = {}
         for k in ['plot_method', 'plot_method_args',
                   'plot_method_kwargs', 'colorbar',
-                  'grid_alpha', 'plot_surface_shadow']:
+                  'grid_alpha', 'plot_surface_shadow',
+                  'downsample', 'downsample_method']:
             if k in kwargs:
                 self.calculation[k] = kwargs[k]
             if k in self.calculation:
                 debug_kw[k] = self.calculation[k]
-        log.ddebug("Some kwargs accepted: %s" % debug_kw)
+        log.ddebug("Some kwargs accepted: %s", debug_kw)
 
 
 BaseCore.figureclasses = []  # [BaseFigInfo, BaseSharexTwinxFigInfo]
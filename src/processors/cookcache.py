@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains cook results cache class.
+'''
+
+import os
+import copy
+import pickle
+import hashlib
+import collections
+import numpy
+
+from ..glogger import getGLogger
+
+__all__ = ['CookCache']
+log = getGLogger('C')
+
+
+class CookCache(object):
+    '''
+    Cache :attr:`BaseFigInfo.calculation` of cooked figures.
+
+    A result is keyed by (core class, group, fignum, version of source data,
+    canonicalized figkwargs). The version of source data is the stat of
+    the pckloader file, or the hash of the data content for cache loaders.
+    Results are kept in an in-memory LRU tier, and optionally pickled in
+    a directory beside the pck file.
+
+    Attributes
+    ----------
+    maxsize: int
+        max number of results in the memory tier
+    cachedir: str or None
+        directory of the disk tier, None to disable it
+    hits: int
+        number of results got from cache
+    misses: int
+        number of results not found in cache
+
+    Parameters
+    ----------
+    maxsize: int, default 128
+    cachedir: str, default None
+        use :meth:`get_cachedir` to get the one beside pck file
+    '''
+    __slots__ = ['maxsize', 'cachedir', '_memory', 'hits', 'misses']
+    _suffix = '-cookcache'
+
+    def __init__(self, maxsize=128, cachedir=None):
+        self.maxsize = int(maxsize)
+        self.cachedir = cachedir
+        self._memory = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.cachedir and not os.path.isdir(self.cachedir):
+            try:
+                os.makedirs(self.cachedir)
+            except OSError:
+                log.warn("Can't create cache dir '%s', disk tier disabled!",
+                         self.cachedir)
+                self.cachedir = None
+
+    @classmethod
+    def get_cachedir(cls, pckloader):
+        '''
+        Return the cache directory beside the pck file of *pckloader*.
+        Return None if *pckloader* is not a file loader.
+        '''
+        path = pckloader.path
+        if isinstance(path, str) and os.path.isfile(path):
+            return os.path.splitext(path)[0] + cls._suffix
+        return None
+
+    @staticmethod
+    def _update_hash(sha, value):
+        '''
+        Update *sha* with canonicalized *value*.
+        Raise TypeError if *value* can't be canonicalized.
+        '''
+        if isinstance(value, numpy.ndarray):
+            sha.update(b'ndarray')
+            sha.update(value.dtype.str.encode())
+            sha.update(str(value.shape).encode())
+            if value.dtype.hasobject:
+                sha.update(pickle.dumps(value.tolist()))
+            else:
+                sha.update(numpy.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            sha.update(b'dict')
+            for k in sorted(value.keys(), key=repr):
+                CookCache._update_hash(sha, k)
+                CookCache._update_hash(sha, value[k])
+        elif isinstance(value, (list, tuple, range)):
+            sha.update(type(value).__name__.encode())
+            for v in value:
+                CookCache._update_hash(sha, v)
+        elif isinstance(value, (str, bytes, int, float, complex,
+                                bool, type(None), numpy.generic)):
+            sha.update(type(value).__name__.encode())
+            sha.update(repr(value).encode())
+        else:
+            raise TypeError("Can't canonicalize %s!" % type(value))
+
+    @staticmethod
+    def data_version(pckloader):
+        '''
+        Return version str of the pck file of *pckloader*, or None.
+        '''
+        path = pckloader.path
+        if isinstance(path, str) and os.path.isfile(path):
+            st = os.stat(path)
+            return '%s:%d:%d' % (os.path.abspath(path),
+                                 st.st_mtime_ns, st.st_size)
+        return None
+
+    def make_key(self, core, figinfo, figkwargs, pckloader=None, data=None):
+        '''
+        Return the key str of *figinfo* cooked by *core* with *figkwargs*.
+        Source data is identified by *data* content if given,
+        else by the version of *pckloader*.
+        Return None if the key can't be determined.
+        '''
+        sha = hashlib.sha1()
+        try:
+            self._update_hash(sha, (
+                type(core).__module__, type(core).__name__,
+                figinfo.group, figinfo.fignum,
+                list(figinfo.srckey), list(figinfo.extrakey)))
+            if data is not None:
+                self._update_hash(sha, data)
+            elif pckloader is not None:
+                version = self.data_version(pckloader)
+                if version is None:
+                    return None
+                self._update_hash(sha, version)
+            else:
+                return None
+            self._update_hash(sha, figkwargs)
+        except TypeError as exc:
+            log.debug("Not cacheable %s/%s: %s",
+                      figinfo.group, figinfo.fignum, exc)
+            return None
+        return sha.hexdigest()
+
+    def _diskfile(self, key):
+        return os.path.join(self.cachedir, '%s.pickle' % key)
+
+    def _remember(self, key, calculation):
+        self._memory[key] = calculation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        '''
+        Return a deep copy of cached calculation dict by *key*, or None.
+        So arrays in it can be changed by the caller, not in cache.
+        '''
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            log.ddebug("Cook cache hit in memory: %s", key)
+            return copy.deepcopy(self._memory[key])
+        if self.cachedir:
+            diskfile = self._diskfile(key)
+            if os.path.isfile(diskfile):
+                try:
+                    with open(diskfile, 'rb') as f:
+                        calculation = pickle.load(f)
+                except Exception:
+                    log.warn("Failed to read cache file %s!", diskfile)
+                else:
+                    self._remember(key, calculation)
+                    self.hits += 1
+                    log.ddebug("Cook cache hit on disk: %s", key)
+                    return copy.deepcopy(calculation)
+        self.misses += 1
+        return None
+
+    def set(self, key, calculation):
+        '''
+        Save a deep copy of *calculation* dict with *key*.
+        '''
+        calculation = copy.deepcopy(calculation)
+        self._remember(key, calculation)
+        if self.cachedir:
+            diskfile = self._diskfile(key)
+            tmpfile = '%s-%d.tmp' % (diskfile, os.getpid())
+            try:
+                with open(tmpfile, 'wb') as f:
+                    pickle.dump(calculation, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpfile, diskfile)
+            except Exception as exc:
+                log.warn("Failed to write cache file %s: %s",
+                         diskfile, exc)
+                if os.path.isfile(tmpfile):
+                    os.remove(tmpfile)
+
+    def __contains__(self, key):
+        if key in self._memory:
+            return True
+        return bool(self.cachedir) and os.path.isfile(self._diskfile(key))
+
+    def __len__(self):
+        return len(self._memory)
+
+    def clear(self, disk=False):
+        '''
+        Clear the memory tier, and the disk tier if *disk* is True.
+        '''
+        self._memory.clear()
+        if disk and self.cachedir and os.path.isdir(self.cachedir):
+            for f in os.listdir(self.cachedir):
+                if f.endswith('.pickle'):
+                    os.remove(os.path.join(self.cachedir, f))
+
+    def __repr__(self):
+        return '<{0}.{1} object at {2} with {3} results>'.format(
+            self.__module__, type(self).__name__, hex(id(self)),
+            len(self._memory))
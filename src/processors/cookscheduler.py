@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains cook scheduler class, which cooks many figures of many cores
+with each pck datakey loaded only once.
+'''
+
+import re
+import threading
+import concurrent.futures
+
+from ..glogger import getGLogger
+from ..loaders import is_pckloader
+
+__all__ = ['CookScheduler']
+log = getGLogger('C')
+
+
+def _calculate_in_process(figinfocls, fignum, group, data, figkwargs):
+    '''Recreate the figinfo, then calculate *data* in a worker process.'''
+    figinfo = figinfocls(fignum, group)
+    figinfo.calculate(data, **figkwargs)
+    return figinfo.calculation
+
+
+class _StorePckLoader(object):
+    '''
+    A pckloader proxy, get values from the shared *store* first.
+    Keys missing in *store* are loaded from *pckloader*, then stored.
+    Keys not cached by *pckloader* before are recorded in *loaded*.
+    '''
+    __slots__ = ['pckloader', 'store', 'loaded', '_lock']
+
+    def __init__(self, pckloader, store):
+        self.pckloader = pckloader
+        self.store = store
+        self.loaded = set()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.pckloader, name)
+
+    def __contains__(self, item):
+        return item in self.pckloader
+
+    def get_many(self, *keys):
+        todo = [k for k in keys if k not in self.store]
+        if todo:
+            with self._lock:
+                todo = [k for k in todo if k not in self.store]
+                if todo:
+                    log.debug("Loading %d keys ...", len(todo))
+                    self.loaded.update(k for k in todo
+                                       if k not in self.pckloader.cache)
+                    self.store.update(
+                        zip(todo, self.pckloader.get_many(*todo)))
+        return tuple(self.store[k] for k in keys)
+
+    def get(self, key):
+        return self.get_many(key)[0]
+
+    __getitem__ = get
+
+    def evict(self, *keys):
+        '''
+        Remove *keys* from *store*, and from cache of *pckloader*
+        if they are loaded by this proxy.
+        '''
+        with self._lock:
+            for key in keys:
+                self.store.pop(key, None)
+            uncache = self.loaded.intersection(keys)
+            self.loaded.difference_update(uncache)
+        if uncache:
+            log.ddebug("Evict %d keys.", len(uncache))
+            self.pckloader.clear_cache(*uncache)
+
+
+class CookScheduler(object):
+    '''
+    Cook figures of many cores and groups together.
+
+    The figures' declared keys, :attr:`BaseFigInfo.srckey` and
+    :attr:`BaseFigInfo.extrakey`, make a DAG: datakeys -> figures.
+    All distinct datakeys are read once, group by group, into a shared
+    store, and each figure's :meth:`BaseFigInfo.calculate` is submitted
+    to a worker pool as soon as all its datakeys are ready. A datakey
+    is evicted from the store, and from the pckloader cache if it was
+    not cached before, once the last figure needing it is submitted,
+    so the peak memory is about the data of figures in flight.
+
+    Attributes
+    ----------
+    pckloader: pckloader object to get pickled data
+    cores: list of core instances, one for each core class
+    cookcache: :class:`cookcache.CookCache` object or None
+    workers: int or None, max workers of the pool
+    executor: str, 'thread' or 'process'
+    store: dict
+        shared datakeys loaded by the scheduler, still needed by
+        figures waiting to be submitted
+
+    Parameters
+    ----------
+    pckloader: pckloader object
+    coreclasses: list of core classes which have 'cook' instruction
+    cookcache: :class:`cookcache.CookCache` object, optional
+    workers: int, optional
+    executor: 'thread' or 'process', default 'thread'
+
+    Notes
+    -----
+    1. In 'process' mode, :meth:`BaseFigInfo.calculate` runs in a
+       new figinfo object in worker process, so figinfos which
+       need pckloader in :meth:`calculate` should use 'thread' mode.
+    2. Figure name format: 'group/fignum'.
+    '''
+    __slots__ = ['pckloader', 'cores', 'cookcache', 'workers',
+                 'executor', 'store', '_tasks']
+
+    def __init__(self, pckloader, coreclasses, cookcache=None,
+                 workers=None, executor='thread'):
+        if not is_pckloader(pckloader):
+            raise ValueError("Not a pckloader object!")
+        if executor not in ('thread', 'process'):
+            raise ValueError("'executor' should be 'thread' or 'process', "
+                             "not '%s'!" % executor)
+        self.pckloader = pckloader
+        self.cores = [cls() for cls in coreclasses
+                      if 'cook' in cls.instructions]
+        self.cookcache = cookcache
+        self.workers = workers
+        self.executor = executor
+        self.store = {}
+        self._tasks = {}
+
+    def _find_core(self, group, fignum):
+        for core in self.cores:
+            if (re.match(core.grouppattern, group)
+                    and fignum in core.figurenums):
+                return core
+        return None
+
+    def add(self, *names, figkwargs=None):
+        '''
+        Add figures *names* to cook with *figkwargs*.
+        Return the list of accepted names.
+        '''
+        accepted = []
+        for name in names:
+            group, fignum = name.rsplit('/', 1) if '/' in name else ('', name)
+            if group not in self.pckloader.datagroups:
+                log.error("Group of figure %s not in pckloader!", name)
+                continue
+            core = self._find_core(group, fignum)
+            if core is None:
+                log.error("No core found for figure %s!", name)
+                continue
+            self._tasks[name] = (core, group, fignum, figkwargs or {})
+            accepted.append(name)
+        return accepted
+
+    def add_all(self, figkwargs=None):
+        '''
+        Add all figures of all matched groups in pckloader.
+        Return the list of accepted names.
+        '''
+        names = []
+        for core in self.cores:
+            for group in core.match_groups(self.pckloader):
+                names.extend('%s/%s' % (group, n) for n in core.figurenums)
+        return self.add(*names, figkwargs=figkwargs)
+
+    @property
+    def names(self):
+        '''Names of figures to cook.'''
+        return sorted(self._tasks.keys())
+
+    def _new_figinfo(self, core, group, fignum):
+        for c in core.figureclasses:
+            if fignum in c.figurenums:
+                return c(fignum, group)
+        return None
+
+    @staticmethod
+    def _figinfo_keys(figinfo):
+        return (['%s/%s' % (figinfo.group, k) for k in figinfo.srckey]
+                + list(figinfo.extrakey))
+
+    def dag(self):
+        '''
+        Return the dependency graph, dict: {'group/fignum': [datakeys]}.
+        '''
+        graph = {}
+        for name, (core, group, fignum, _kw) in self._tasks.items():
+            figinfo = self._new_figinfo(core, group, fignum)
+            if figinfo is not None:
+                graph[name] = self._figinfo_keys(figinfo)
+        return graph
+
+    def run(self):
+        '''
+        Cook all added figures.
+        Return a dict: {'group/fignum': :class:`BaseFigInfo` object}.
+        '''
+        results, pending, cachekeys = {}, {}, {}
+        for name in self.names:
+            core, group, fignum, figkwargs = self._tasks[name]
+            try:
+                figinfo = self._new_figinfo(core, group, fignum)
+            except Exception:
+                log.error("Failed to create figinfo of %s!", name,
+                          exc_info=1)
+                continue
+            if self.cookcache is not None:
+                key = self.cookcache.make_key(core, figinfo, figkwargs,
+                                              pckloader=self.pckloader)
+                calculation = self.cookcache.get(key) if key else None
+                if calculation is not None:
+                    figinfo.calculation = calculation
+                    results[name] = figinfo
+                    continue
+                cachekeys[name] = key
+            pending[name] = (figinfo, set(self._figinfo_keys(figinfo)))
+        if not pending:
+            return results
+        # figures waiting for each datakey
+        refs = {}
+        for figinfo, keys in pending.values():
+            for key in keys:
+                refs[key] = refs.get(key, 0) + 1
+        # batches of distinct datakeys: shared keys first, then group by group
+        allkeys = set()
+        for figinfo, keys in pending.values():
+            allkeys.update(keys)
+        allkeys.difference_update(self.store.keys())
+        batches = {}
+        for key in sorted(allkeys):
+            group = key.rsplit('/', 1)[0] if '/' in key else ''
+            batches.setdefault(group, []).append(key)
+        # shared batches, needed by more figures, are loaded first
+        ndependents = {g: sum(1 for _f, keys in pending.values()
+                              if keys.intersection(batches[g]))
+                       for g in batches}
+        groups = sorted(batches, key=lambda g: (-ndependents[g], g))
+        log.debug("Cook %d figures with %d datakeys in %d batches.",
+                  len(pending), len(allkeys), len(batches))
+        proxy = _StorePckLoader(self.pckloader, self.store)
+        if self.executor == 'process':
+            Executor = concurrent.futures.ProcessPoolExecutor
+        else:
+            Executor = concurrent.futures.ThreadPoolExecutor
+        futures = {}
+        with Executor(max_workers=self.workers) as pool:
+            self._submit_ready(pool, proxy, pending, futures, results, refs)
+            for group in groups:
+                keys = batches[group]
+                log.debug("Loading batch '%s': %d keys ...",
+                          group, len(keys))
+                try:
+                    proxy.get_many(*keys)
+                except Exception:
+                    log.error("Failed to load batch '%s'!", group,
+                              exc_info=1)
+                self._submit_ready(pool, proxy, pending, futures, results,
+                                   refs)
+            for name in list(pending):
+                log.error("figurenum %s: can't get data!", name)
+                results[name] = pending.pop(name)[0]
+            # keys of figures failed, or got but not declared
+            proxy.evict(*list(self.store))
+            for future in concurrent.futures.as_completed(futures):
+                name, figinfo = futures[future]
+                results[name] = figinfo
+                try:
+                    calculation = future.result()
+                except Exception:
+                    log.error("figurenum %s: calculate() failed!", name,
+                              exc_info=1)
+                    continue
+                if calculation is not None:
+                    figinfo.calculation = calculation
+                if cachekeys.get(name):
+                    self.cookcache.set(cachekeys[name], figinfo.calculation)
+        return results
+
+    def _submit_ready(self, pool, proxy, pending, futures, results, refs):
+        '''
+        Submit figures whose datakeys are all in store. Then evict
+        datakeys not needed by figures in *pending*, counted in *refs*.
+        '''
+        for name in [n for n, (_f, keys) in pending.items()
+                     if keys.issubset(self.store.keys())]:
+            figinfo, keys = pending.pop(name)
+            figkwargs = self._tasks[name][3]
+            try:
+                data = figinfo.get_data(proxy)
+            except Exception:
+                log.error("figurenum %s: can't get data!", name, exc_info=1)
+                results[name] = figinfo
+                continue
+            finally:
+                for key in keys:
+                    refs[key] -= 1
+                proxy.evict(*[k for k in keys if refs[k] == 0])
+            if self.executor == 'process':
+                future = pool.submit(
+                    _calculate_in_process, type(figinfo),
+                    figinfo.fignum, figinfo.group, data, figkwargs)
+            else:
+                future = pool.submit(self._calculate, figinfo,
+                                     data, figkwargs)
+            futures[future] = (name, figinfo)
+
+    @staticmethod
+    def _calculate(figinfo, data, figkwargs):
+        figinfo.calculate(data, **figkwargs)
+        return None
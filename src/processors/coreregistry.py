@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains core registry class.
+'''
+
+import re
+
+from ..glogger import getGLogger
+from ..loaders import is_rawloader, is_pckloader
+
+__all__ = ['CoreRegistry']
+log = getGLogger('C')
+
+_namedgroup = re.compile(r'\(\?P(?P<kind>[<=])(?P<name>\w+)')
+
+
+class CoreRegistry(object):
+    '''
+    Registry of core classes.
+
+    :attr:`BaseCore.filepatterns` and :attr:`BaseCore.grouppattern` of all
+    registered cores are compiled into one alternation each, so every raw
+    key or pck group is classified by a single regex search, instead of
+    matching every pattern of every core one by one.
+
+    A key may match more than one core, like 'gtc.out'. After a match of
+    core *i*, the search goes on with the alternation of cores after *i*.
+
+    Attributes
+    ----------
+    coreclasses: tuple of registered core classes, in order
+
+    Parameters
+    ----------
+    coreclasses: list of core classes to register
+    '''
+    __slots__ = ['coreclasses', '_filealts', '_groupalts']
+
+    def __init__(self, coreclasses=()):
+        self.coreclasses = ()
+        for cls in coreclasses:
+            self.register(cls)
+
+    def register(self, coreclass):
+        '''Register *coreclass*, return it. So it can be a decorator.'''
+        if coreclass not in self.coreclasses:
+            self.coreclasses += (coreclass,)
+            self._filealts, self._groupalts = {}, {}
+        return coreclass
+
+    def unregister(self, coreclass):
+        '''Remove *coreclass* from the registry.'''
+        if coreclass in self.coreclasses:
+            self.coreclasses = tuple(
+                c for c in self.coreclasses if c is not coreclass)
+            self._filealts, self._groupalts = {}, {}
+
+    def __contains__(self, coreclass):
+        return coreclass in self.coreclasses
+
+    def __iter__(self):
+        return iter(self.coreclasses)
+
+    def __len__(self):
+        return len(self.coreclasses)
+
+    @staticmethod
+    def _rename(pattern, tag):
+        '''Append *tag* to names of named groups in *pattern*.'''
+        return _namedgroup.sub(
+            lambda m: '(?P%s%s%s' % (m.group('kind'), m.group('name'), tag),
+            pattern)
+
+    def _alternation(self, start, attr, cache):
+        '''
+        Return compiled alternation of cores[start:] patterns *attr*,
+        and dict {alternative name: (core index, pattern index)}.
+        '''
+        if start in cache:
+            return cache[start]
+        parts, index = [], {}
+        for i in range(start, len(self.coreclasses)):
+            patterns = getattr(self.coreclasses[i], attr)
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            for j, pat in enumerate(patterns):
+                tag = '__%d_%d' % (i, j)
+                parts.append('(?P<_alt%s>%s)' % (tag, self._rename(pat, tag)))
+                index['_alt%s' % tag] = (i, j)
+        regex = re.compile('|'.join(parts)) if parts else None
+        cache[start] = (regex, index)
+        return cache[start]
+
+    def _classify(self, key, attr, cache):
+        '''
+        Return list of (core index, pattern index, match object) of cores
+        matched with *key*, each core at most once.
+        '''
+        result, start, ncores = [], 0, len(self.coreclasses)
+        while start < ncores:
+            regex, index = cache[start] if start in cache else \
+                self._alternation(start, attr, cache)
+            m = regex.match(key) if regex else None
+            if m is None:
+                break
+            # outermost group of the matched alternative is closed last
+            i, j = index[m.lastgroup]
+            result.append((i, j, m))
+            start = i + 1
+        return result
+
+    @staticmethod
+    def _group(m, i, j):
+        '''Get named group 'group' of pattern (i, j) in match *m*.'''
+        try:
+            return m.group('group__%d_%d' % (i, j))
+        except IndexError:
+            return None
+
+    def match_files(self, rawloader):
+        '''
+        Return {coreclass: files} of all keys in *rawloader*.
+        Files of each core are ordered by its filepatterns, then keys,
+        like :meth:`BaseCore.match_files`.
+        '''
+        if not is_rawloader(rawloader):
+            raise ValueError("Not a rawloader object!")
+        bypattern = {}
+        for key in rawloader.keys():
+            for i, j, m in self._classify(key, 'filepatterns',
+                                          self._filealts):
+                bypattern.setdefault((i, j), []).append(key)
+        result = {}
+        for (i, j) in sorted(bypattern):
+            result.setdefault(self.coreclasses[i], []).extend(
+                bypattern[(i, j)])
+        return result
+
+    def match_groups(self, pckloader):
+        '''Return {coreclass: groups} of all groups in *pckloader*.'''
+        if not is_pckloader(pckloader):
+            raise ValueError("Not a pckloader object!")
+        result = {}
+        for group in pckloader.datagroups:
+            for i, j, m in self._classify(group, 'grouppattern',
+                                          self._groupalts):
+                result.setdefault(self.coreclasses[i], []).append(group)
+        return result
+
+    def dig_tasks(self, rawloader):
+        '''
+        Return a list of (coreclass, file, group) for :meth:`BaseCore.dig`,
+        *file* is a list for cores with nfiles '+'. Groups are got from
+        the filepatterns, so :meth:`BaseCore.set_dig_args` with
+        ``checked=True`` needs no search and no pattern check.
+        '''
+        if not is_rawloader(rawloader):
+            raise ValueError("Not a rawloader object!")
+        bygroup = {}
+        grouppats = [re.compile(c.grouppattern) for c in self.coreclasses]
+        for key in rawloader.keys():
+            for i, j, m in self._classify(key, 'filepatterns',
+                                          self._filealts):
+                group = self._group(m, i, j)
+                if group is None or not grouppats[i].match(group):
+                    log.warn("Can't get group of '%s' for core %s!",
+                             key, self.coreclasses[i].__name__)
+                    continue
+                bygroup.setdefault((i, group), []).append(key)
+        tasks = []
+        for (i, group), files in sorted(bygroup.items()):
+            cls = self.coreclasses[i]
+            if cls().nfiles == '+':
+                tasks.append((cls, files, group))
+            else:
+                tasks.extend((cls, f, group) for f in files)
+        return tasks
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Read numbers in GTC output files, written as formatted text,
+one number per line, or as Fortran unformatted binary files.
+
+Binary files are like::
+
+    write(iodiag)ndstep,nspecies,mpdiag,nfield,modes,mfdiag
+    write(iodiag)tstep*ndiag
+    write(iodiag)partdata,fieldtime,fieldmode
+
+with ``access='sequential'``, each record is wrapped in 4 or 8 bytes
+length markers; or with ``access='stream'``, no markers.
+Integers are 4 bytes, reals are 4 or 8 bytes, in little or big endian.
+'''
+
+import re
+import warnings
+import itertools
+import numpy
+
+from ..glogger import getGLogger
+
+__all__ = ['read_numbers', 'sniff', 'fortran_rows', 'fortran_blocks']
+log = getGLogger('C')
+
+_textbytes = frozenset(b'0123456789+-.eEdD \t\r\n')
+_token = re.compile(rb'\S+')
+# bytes of text parsed at a time
+chunksize = 2**23
+
+
+def _sequential_marker(head, nbytes, endian):
+    '''
+    Return marker size if *head* starts with a record of *nbytes* bytes,
+    which is wrapped in markers of 4 or 8 bytes, else return None.
+    '''
+    for size in (4, 8):
+        if len(head) < 2 * size + nbytes:
+            continue
+        dtype = '%si%d' % (endian, size)
+        first = numpy.frombuffer(head, dtype=dtype, count=1)[0]
+        last = numpy.frombuffer(head, dtype=dtype, count=1,
+                                offset=size + nbytes)[0]
+        if first == last == nbytes:
+            return size
+    return None
+
+
+def sniff(head, nints):
+    '''
+    Guess format of a file by its first bytes *head*.
+    The file starts with *nints* 4-byte integers.
+    Return a dict, format: 'text', 'sequential' or 'stream';
+    endian: '<' or '>'; marker: size of record markers.
+    '''
+    for endian in ('<', '>'):
+        marker = _sequential_marker(head, 4 * nints, endian)
+        if marker:
+            return dict(format='sequential', endian=endian, marker=marker)
+    if head and _textbytes.issuperset(head):
+        return dict(format='text', endian=None, marker=0)
+    # stream, small non-negative integers in header
+    for endian in ('<', '>'):
+        ints = numpy.frombuffer(head, dtype='%si4' % endian,
+                                count=min(nints, len(head) // 4))
+        if ints.size and ((ints >= 0) & (ints < 2**24)).all():
+            return dict(format='stream', endian=endian, marker=0)
+    raise ValueError("Unknown format of file starting with %r!" % head[:16])
+
+
+def _parse_text(buf, start):
+    '''
+    Parse numbers in text *buf* from *start*, chunk by chunk.
+    Only one chunk of *buf* is copied at a time, no str per number.
+    '''
+    parts, total = [], len(buf)
+    while start < total:
+        end = min(start + chunksize, total)
+        if end < total:
+            # cut at whitespace, keep numbers whole
+            cut = max(buf.rfind(b'\n', start, end),
+                      buf.rfind(b' ', start, end))
+            if cut <= start:
+                cut = min([i for i in (buf.find(b'\n', end),
+                                       buf.find(b' ', end)) if i >= 0]
+                          or [total])
+            end = cut
+        chunk, start = buf[start:end], end
+        if not _token.search(chunk):
+            # numpy gives [-1.0] for whitespace only
+            continue
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                parts.append(numpy.fromstring(chunk, sep=' '))
+            except DeprecationWarning:
+                raise ValueError("Invalid number in bytes [%d, %d)!"
+                                 % (end - len(chunk), end))
+    if len(parts) == 1:
+        return parts[0]
+    return numpy.concatenate(parts) if parts else numpy.empty(0)
+
+
+def _records(buf, endian, marker):
+    '''Yield (start, end) of payloads of records in sequential *buf*.'''
+    dtype = '%si%d' % (endian, marker)
+    pos, total = 0, len(buf)
+    while pos + marker <= total:
+        length = int(numpy.frombuffer(buf, dtype=dtype, count=1,
+                                      offset=pos)[0])
+        # negative length, gfortran subrecords of a record > 2GB
+        start, end = pos + marker, pos + marker + abs(length)
+        if end + marker > total:
+            log.warn("Truncated record at byte %d!", pos)
+            break
+        yield start, end
+        pos = end + marker
+
+
+def _sequential_realsize(lengths, header, recordsize):
+    '''
+    Get bytes of reals from byte *lengths* of body records.
+    *recordsize*: callable, get number of reals in the first body record
+    from int *header*. Raise ValueError if the size is ambiguous.
+    '''
+    if recordsize:
+        count = recordsize(header)
+        if count > 0 and lengths[0] in (4 * count, 8 * count):
+            return lengths[0] // count
+        raise ValueError("First record has %d bytes, not %d reals!"
+                         % (lengths[0], count))
+    sizes = [size for size in (4, 8)
+             if all(length % size == 0 for length in lengths)]
+    if len(sizes) != 1:
+        raise ValueError("Cannot tell size of reals from record lengths, "
+                         "set realsize or recordsize!")
+    return sizes[0]
+
+
+def read_numbers(buf, nints, nreals=0, binary=None, realsize=None,
+                 recordsize=None):
+    '''
+    Read all numbers in *buf*.
+    The first *nints* integers and *nreals* reals are the header.
+    Return header list and a 1d float64 array of all other numbers.
+
+    Parameters
+    ----------
+    buf: bytes-like object got by :meth:`rawloader.getbuffer`,
+        bytes or mmap, or file object got by :meth:`rawloader.get`
+    nints, nreals: int, size of header
+    binary: None, auto select; True, must be binary; False, must be text
+    realsize: 4 or 8, bytes of binary reals. Default, got from
+        record lengths of sequential file, or 8 for stream file,
+        which has no record markers to tell it.
+    recordsize: callable, get number of reals in the first body record
+        from the int header, then *realsize* of a sequential file
+        without header reals is got from the length of that record.
+    '''
+    if not hasattr(buf, 'rfind'):
+        buf = getattr(buf, 'buffer', buf).read()
+    fmt = sniff(bytes(buf[:64]), nints)
+    if binary is not None and binary != (fmt['format'] != 'text'):
+        raise ValueError("File is %s, not %s!" % (
+            fmt['format'], 'binary' if binary else 'text'))
+    if fmt['format'] == 'text':
+        n = nints + nreals
+        tokens = list(itertools.islice(_token.finditer(buf[:4096]), n))
+        header = ([int(t.group()) for t in tokens[:nints]]
+                  + [float(t.group()) for t in tokens[nints:]])
+        return header, _parse_text(buf, tokens[-1].end() if n else 0)
+    endian = fmt['endian']
+    if fmt['format'] == 'sequential':
+        records = list(_records(buf, endian, fmt['marker']))
+        start, end = records[0]
+        header = numpy.frombuffer(buf, dtype='%si4' % endian, count=nints,
+                                  offset=start).tolist()
+        records = records[1:]
+        if nreals:
+            start, end = records[0]
+            realsize = realsize or (end - start) // nreals
+            records = records[1:]
+        if not realsize and records:
+            realsize = _sequential_realsize(
+                [e - s for s, e in records], header, recordsize)
+        realsize = realsize or 8
+        dtype = '%sf%d' % (endian, realsize)
+        if nreals:
+            header += numpy.frombuffer(buf, dtype=dtype, count=nreals,
+                                       offset=start).tolist()
+        # convert records into one native float64 array directly
+        body = numpy.empty(sum(e - s for s, e in records) // realsize)
+        index = 0
+        for s, e in records:
+            count = (e - s) // realsize
+            body[index:index + count] = numpy.frombuffer(
+                buf, dtype=dtype, offset=s, count=count)
+            index += count
+    else:
+        offset = 4 * nints
+        header = numpy.frombuffer(buf, dtype='%si4' % endian, count=nints
+                                  ).tolist()
+        realsize = realsize or 8
+        dtype = '%sf%d' % (endian, realsize)
+        count = (len(buf) - offset) // realsize
+        reals = numpy.frombuffer(buf, dtype=dtype, count=count,
+                                 offset=offset)
+        header += reals[:nreals].tolist()
+        # native float64, own data
+        body = reals[nreals:].astype(numpy.float64)
+    log.debug("Read %s binary, endian '%s', real size %d.",
+              fmt['format'], endian, realsize)
+    return header, body
+
+
+def fortran_rows(data, nrows, order=None):
+    '''
+    Return C-contiguous 2d array of Fortran ordered 1d *data*,
+    like ``data.reshape((nrows, -1), order='F')``, but copied once,
+    so row slices of it are C-contiguous too.
+    *order*: list of row indices, take rows in this order.
+    '''
+    view = data.reshape((-1, nrows)).T
+    if order is None:
+        return numpy.ascontiguousarray(view)
+    out = numpy.empty((len(order), view.shape[1]), dtype=data.dtype)
+    # mode 'clip', no buffered copy for *out*
+    return numpy.take(view, order, axis=0, out=out, mode='clip')
+
+
+def fortran_blocks(data, shape):
+    '''
+    Return C-contiguous array of Fortran ordered 1d *data* with *shape*,
+    copied once, and the last axis moved first. So ``result[k]`` is a
+    C-contiguous view, equal to ``data.reshape(shape, order='F')[..., k]``.
+    '''
+    view = data.reshape(shape[::-1])
+    axes = (0,) + tuple(range(len(shape) - 1, 0, -1))
+    return numpy.ascontiguousarray(view.transpose(axes))
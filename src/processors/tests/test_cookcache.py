@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import shutil
+import unittest
+import tempfile
+import numpy
+
+from ...loaders import get_pckloader
+from ..basecore import BaseCore, BaseFigInfo
+from ..cookcache import CookCache
+
+
+class ImpFigInfo(BaseFigInfo):
+    __slots__ = []
+    figurenums = ['sum']
+    ncalculate = 0
+
+    def __init__(self, fignum, group):
+        super(ImpFigInfo, self).__init__(
+            fignum, group, ['array'], ['description'], 'template')
+
+    def calculate(self, data, **kwargs):
+        ImpFigInfo.ncalculate += 1
+        self.calculation = {'sum': data['array'].sum() * kwargs.get('k', 1)}
+
+
+class ImpCore(BaseCore):
+    __slots__ = []
+    grouppattern = '^test$'
+    figureclasses = [ImpFigInfo]
+
+
+class TestCookCache(unittest.TestCase):
+    '''
+    Test class CookCache
+    '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(suffix='-test')
+        self.tmpfile = os.path.join(self.tmpdir, 'case.npz')
+        self.array = numpy.random.rand(3, 2)
+        numpy.savez(self.tmpfile, **{
+            'description': 'test', 'test/array': self.array})
+        ImpFigInfo.ncalculate = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def cook(self, pckloader, cache, **kwargs):
+        core = ImpCore()
+        core.set_cook_args(pckloader, 'test', cookcache=cache)
+        return core.cook('sum', figkwargs=kwargs)
+
+    def test_cookcache_memory(self):
+        loader = get_pckloader({'description': 'test',
+                                'test': {'array': self.array}})
+        cache = CookCache(maxsize=1)
+        f1 = self.cook(loader, cache)
+        f2 = self.cook(loader, cache)
+        self.assertEqual(ImpFigInfo.ncalculate, 1)
+        self.assertEqual(f1.calculation, f2.calculation)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.cook(loader, cache, k=2)
+        self.assertEqual(ImpFigInfo.ncalculate, 2)
+        self.assertEqual(len(cache), 1)
+        self.cook(loader, cache)
+        self.assertEqual(ImpFigInfo.ncalculate, 3)
+
+    def test_cookcache_copies(self):
+        cache = CookCache()
+        calculation = {'Z': numpy.arange(4.0), 'axes': [numpy.ones(2)]}
+        cache.set('k', calculation)
+        calculation['Z'][0] = 10.0
+        got = cache.get('k')
+        self.assertEqual(got['Z'][0], 0.0)
+        got['Z'][1] = 10.0
+        got['axes'][0][0] = 10.0
+        again = cache.get('k')
+        numpy.testing.assert_array_equal(again['Z'], numpy.arange(4.0))
+        numpy.testing.assert_array_equal(again['axes'][0], numpy.ones(2))
+
+    def test_cookcache_disk(self):
+        loader = get_pckloader(self.tmpfile)
+        cachedir = CookCache.get_cachedir(loader)
+        self.assertEqual(cachedir, os.path.join(self.tmpdir, 'case-cookcache'))
+        f1 = self.cook(loader, CookCache(cachedir=cachedir), k=3)
+        f2 = self.cook(loader, CookCache(cachedir=cachedir), k=3)
+        self.assertEqual(ImpFigInfo.ncalculate, 1)
+        self.assertAlmostEqual(f2.calculation['sum'], self.array.sum() * 3)
+        self.assertEqual(len(os.listdir(cachedir)), 1)
+
+    def test_cookcache_make_key(self):
+        cache = CookCache()
+        core, figinfo = ImpCore(), ImpFigInfo('sum', 'test')
+        data = {'array': self.array}
+        k1 = cache.make_key(core, figinfo, {'a': 1, 'b': [1]}, data=data)
+        k2 = cache.make_key(core, figinfo, {'b': [1], 'a': 1}, data=data)
+        self.assertEqual(k1, k2)
+        k3 = cache.make_key(core, figinfo, {'a': 1}, data={'array': 1})
+        self.assertNotEqual(k1, k3)
+        self.assertIsNone(cache.make_key(
+            core, figinfo, {'skey': lambda n: n}, data=data))
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import unittest
+import numpy
+
+from ...loaders.cachepck import CachePckLoader
+from ..basecore import BaseCore, BaseFigInfo
+from ..cookscheduler import CookScheduler
+
+
+class CountCachePckLoader(CachePckLoader):
+    __slots__ = ['counter', 'store', 'maxstore']
+
+    def _special_get(self, tmpobj, key):
+        self.counter[key] = self.counter.get(key, 0) + 1
+        if getattr(self, 'store', None) is not None:
+            self.maxstore = max(self.maxstore, len(self.store))
+        return super(CountCachePckLoader, self)._special_get(tmpobj, key)
+
+
+class ImpFigInfo(BaseFigInfo):
+    __slots__ = []
+    figurenums = ['sum', 'max']
+
+    def __init__(self, fignum, group):
+        super(ImpFigInfo, self).__init__(
+            fignum, group, ['array'], ['gtc/scale'], 'template')
+
+    def calculate(self, data, **kwargs):
+        fun = numpy.sum if self.fignum == 'sum' else numpy.max
+        self.calculation = {'result': fun(data['array']) * data['gtc/scale']}
+
+
+class ImpCore(BaseCore):
+    __slots__ = []
+    grouppattern = r'^snap\d$'
+    figureclasses = [ImpFigInfo]
+
+
+class TestCookScheduler(unittest.TestCase):
+    '''
+    Test class CookScheduler
+    '''
+
+    def setUp(self):
+        self.data = {'gtc': {'scale': 2.0}}
+        for i in range(3):
+            self.data['snap%d' % i] = {'array': numpy.random.rand(4, 3)}
+        self.loader = CountCachePckLoader(self.data)
+        self.loader.counter = {}
+
+    def test_cookscheduler_add(self):
+        scheduler = CookScheduler(self.loader, [ImpCore])
+        self.assertEqual(scheduler.add('snap0/sum', 'snap9/sum', 'gtc/sum'),
+                         ['snap0/sum'])
+        self.assertEqual(len(scheduler.add_all()), 6)
+        self.assertEqual(scheduler.dag()['snap1/max'],
+                         ['snap1/array', 'gtc/scale'])
+
+    def test_cookscheduler_run(self):
+        for executor in ('thread', 'process'):
+            self.loader.clear_cache()
+            self.loader.counter = {}
+            scheduler = CookScheduler(self.loader, [ImpCore], workers=2,
+                                      executor=executor)
+            scheduler.add_all()
+            results = scheduler.run()
+            self.assertEqual(len(results), 6)
+            for i in range(3):
+                array = self.data['snap%d' % i]['array']
+                self.assertAlmostEqual(
+                    results['snap%d/sum' % i].calculation['result'],
+                    array.sum() * 2.0)
+                self.assertAlmostEqual(
+                    results['snap%d/max' % i].calculation['result'],
+                    array.max() * 2.0)
+            self.assertEqual(set(self.loader.counter.values()), {1})
+            self.assertEqual(len(self.loader.counter), 4)
+
+    def test_cookscheduler_evict(self):
+        for i in range(3, 8):
+            self.data['snap%d' % i] = {'array': numpy.random.rand(4, 3)}
+        self.loader = CountCachePckLoader(self.data)
+        self.loader.counter = {}
+        self.loader.get('snap0/array')
+        scheduler = CookScheduler(self.loader, [ImpCore], workers=1)
+        self.loader.store, self.loader.maxstore = scheduler.store, 0
+        scheduler.add_all(figkwargs=None)
+        results = scheduler.run()
+        self.assertEqual(len(results), 16)
+        self.assertAlmostEqual(
+            results['snap7/sum'].calculation['result'],
+            self.data['snap7']['array'].sum() * 2.0)
+        # gtc/scale and arrays of the group in flight
+        self.assertLessEqual(self.loader.maxstore, 2)
+        self.assertEqual(scheduler.store, {})
+        # keys cached before are kept
+        self.assertEqual(list(self.loader.cache), ['snap0/array'])
+        self.assertEqual(set(self.loader.counter.values()), {1})
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import re
+import unittest
+import tempfile
+import unittest.mock
+
+from ...loaders.base import BaseRawLoader, BasePckLoader
+from ..basecore import BaseCore
+from ..coreregistry import CoreRegistry
+
+
+class ImpRawLoader(BaseRawLoader):
+    __slots__ = []
+
+    def _special_check_path(self):
+        return True
+
+    def _special_open(self):
+        return self.path
+
+    def _special_close(self, tmpobj):
+        pass
+
+    def _special_getkeys(self, tmpobj):
+        return ['gtc.out', 'history.out', 'snap00100.out', 'snap00200.out',
+                'trackp_dir/TRACKP.00001', 'trackp_dir/TRACKP.00002',
+                'unknown.out']
+
+    def _special_get(self, tmpobj, key):
+        pass
+
+
+class ImpPckLoader(BasePckLoader):
+    __slots__ = []
+
+    def _special_check_path(self):
+        return True
+
+    def _special_open(self):
+        return self.path
+
+    def _special_close(self, tmpobj):
+        pass
+
+    def _special_getkeys(self, tmpobj):
+        return ['gtc/a', 'history/b', 'snap00100/c', 'trackp/d', 'other/e']
+
+    def _special_getgroups(self, tmpobj):
+        return ['gtc', 'history', 'snap00100', 'trackp', 'other']
+
+    def _special_get(self, tmpobj, key):
+        pass
+
+
+class GtcCore(BaseCore):
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>gtc)\.out$', r'.*/(?P<group>gtc)\.out$']
+    grouppattern = '^gtc$'
+
+
+class HistoryCore(BaseCore):
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>history)\.out$']
+    grouppattern = '^history$'
+
+
+class SnapshotCore(BaseCore):
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>snap\d{5})\.out$']
+    grouppattern = r'^snap\d{5}$'
+
+
+class ZFCore(BaseCore):
+    '''Share gtc.out with GtcCore.'''
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>gtc)\.out$']
+    grouppattern = '^gtc$'
+
+
+class TrackCore(BaseCore):
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>trackp)_dir/TRACKP\.\d{5}$']
+    grouppattern = '^trackp$'
+
+    def __init__(self):
+        super(TrackCore, self).__init__(nfiles='+')
+
+
+class TestCoreRegistry(unittest.TestCase):
+    '''
+    Test class CoreRegistry
+    '''
+
+    def setUp(self):
+        self.coreclasses = [GtcCore, HistoryCore, SnapshotCore,
+                            ZFCore, TrackCore]
+        self.registry = CoreRegistry(self.coreclasses)
+        self.tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        self.rawloader = ImpRawLoader(self.tmpdir)
+        self.pckloader = ImpPckLoader(self.tmpdir)
+
+    def tearDown(self):
+        os.rmdir(self.tmpdir)
+
+    def test_registry_register(self):
+        registry = CoreRegistry()
+        self.assertEqual(registry.register(GtcCore), GtcCore)
+        registry.register(GtcCore)
+        self.assertEqual(len(registry), 1)
+        registry.register(HistoryCore)
+        self.assertTrue(HistoryCore in registry)
+        self.assertEqual(registry.match_files(self.rawloader), {
+            GtcCore: ['gtc.out'], HistoryCore: ['history.out']})
+        registry.unregister(GtcCore)
+        self.assertEqual(list(registry), [HistoryCore])
+        self.assertEqual(registry.match_files(self.rawloader), {
+            HistoryCore: ['history.out']})
+
+    def test_registry_match_files(self):
+        result = self.registry.match_files(self.rawloader)
+        for cls in self.coreclasses:
+            self.assertEqual(result[cls], cls.match_files(self.rawloader))
+        self.assertEqual(result[ZFCore], ['gtc.out'])
+        self.assertEqual(result[SnapshotCore],
+                         ['snap00100.out', 'snap00200.out'])
+
+    def test_registry_match_groups(self):
+        result = self.registry.match_groups(self.pckloader)
+        for cls in self.coreclasses:
+            self.assertEqual(result[cls], cls.match_groups(self.pckloader))
+        self.assertEqual(result[GtcCore], ['gtc'])
+        self.assertEqual(result[ZFCore], ['gtc'])
+
+    def test_registry_dig_tasks(self):
+        tasks = self.registry.dig_tasks(self.rawloader)
+        self.assertEqual(tasks, [
+            (GtcCore, 'gtc.out', 'gtc'),
+            (HistoryCore, 'history.out', 'history'),
+            (SnapshotCore, 'snap00100.out', 'snap00100'),
+            (SnapshotCore, 'snap00200.out', 'snap00200'),
+            (ZFCore, 'gtc.out', 'gtc'),
+            (TrackCore, ['trackp_dir/TRACKP.00001',
+                         'trackp_dir/TRACKP.00002'], 'trackp'),
+        ])
+        for cls, f, group in tasks:
+            core = cls()
+            core.set_dig_args(self.rawloader, f, group)
+            self.assertEqual(core.file, f)
+            self.assertEqual(core.group, group)
+        # no pattern matched again
+        with unittest.mock.patch.object(re, 'match') as match:
+            for cls, f, group in tasks:
+                core = cls()
+                core.set_dig_args(self.rawloader, f, group, checked=True)
+                self.assertEqual(core.file, f)
+                self.assertEqual(core.group, group)
+            match.assert_not_called()
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import io
+import os
+import mmap
+import shutil
+import unittest
+import tempfile
+import tracemalloc
+import numpy
+
+from ...loaders import get_rawloader
+from .. import fortranio
+from ..fortranio import read_numbers, sniff, fortran_rows, fortran_blocks
+from ..GTC.data1d import Data1dCoreV110922, Data1dBinaryCoreV110922
+from ..GTC.history import HistoryCoreV110922, HistoryBinaryCoreV110922
+from ..GTC.snapshot import SnapshotBinaryCoreV110922
+
+
+def write_text(ints, reals, body):
+    lines = ['%d' % i for i in ints] + ['%e' % r for r in reals]
+    lines += ['%e' % v for v in body]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def write_binary(ints, reals, records, endian='<', realsize=8, marker=4):
+    '''Sequential if *marker* > 0, else stream.'''
+    idtype = '%si4' % endian
+    rdtype = '%sf%d' % (endian, realsize)
+    mdtype = '%si%d' % (endian, marker)
+    payloads = [numpy.array(ints, dtype=idtype).tobytes()]
+    if reals:
+        payloads.append(numpy.array(reals, dtype=rdtype).tobytes())
+    payloads.extend(numpy.array(r, dtype=rdtype).tobytes() for r in records)
+    out = b''
+    for p in payloads:
+        if marker:
+            m = numpy.array([len(p)], dtype=mdtype).tobytes()
+            out += m + p + m
+        else:
+            out += p
+    return out
+
+
+class TestFortranIO(unittest.TestCase):
+    '''
+    Test function read_numbers
+    '''
+
+    def setUp(self):
+        self.ints = [3, 1, 2, 1, 2, 1]
+        self.reals = [0.25]
+        self.records = [numpy.linspace(0, 1, 10) + i for i in range(3)]
+        self.body = numpy.concatenate(self.records)
+
+    def check(self, data, nreals=1, decimal=12, **kwargs):
+        header, body = read_numbers(io.BytesIO(data), len(self.ints),
+                                    nreals, **kwargs)
+        self.assertEqual(header[:len(self.ints)], self.ints)
+        self.assertTrue(all(isinstance(i, int) for i in header[:6]))
+        if nreals:
+            self.assertAlmostEqual(header[-1], self.reals[0])
+            numpy.testing.assert_almost_equal(body, self.body, decimal)
+        self.assertEqual(body.dtype, numpy.float64)
+        self.assertTrue(body.flags.writeable and body.flags.c_contiguous)
+        return header, body
+
+    def test_fortranio_text(self):
+        data = write_text(self.ints, self.reals, self.body)
+        self.assertEqual(sniff(data[:64], 6)['format'], 'text')
+        self.check(data, decimal=6, binary=False)
+        self.assertRaises(ValueError, self.check, data, binary=True)
+
+    def test_fortranio_buffer(self):
+        data = write_text(self.ints, self.reals, self.body)
+        tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        chunksize = fortranio.chunksize
+        try:
+            path = os.path.join(tmpdir, 'history.out')
+            with open(path, 'wb') as f:
+                f.write(data)
+            with open(path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # numbers are not cut by chunks
+            fortranio.chunksize = 7
+            for source in (data, buf):
+                header, body = read_numbers(source, 6, 1)
+                self.assertEqual(header, self.ints + self.reals)
+                numpy.testing.assert_almost_equal(body, self.body, 6)
+            buf.close()
+            self.assertRaises(ValueError, read_numbers,
+                              data.replace(b'e-01', b'x-01'), 6, 1)
+        finally:
+            fortranio.chunksize = chunksize
+            shutil.rmtree(tmpdir)
+
+    def test_fortranio_sequential(self):
+        for endian in '<>':
+            for realsize, marker in [(8, 4), (4, 4), (8, 8)]:
+                data = write_binary(self.ints, self.reals, self.records,
+                                    endian, realsize, marker)
+                fmt = sniff(data[:64], 6)
+                self.assertEqual(fmt, dict(format='sequential',
+                                           endian=endian, marker=marker))
+                self.check(data, decimal=6 if realsize == 4 else 12)
+        # no header real
+        data = write_binary(self.ints, [], self.records, '>', 4, 4)
+        header, body = self.check(data, nreals=0, realsize=4)
+        numpy.testing.assert_almost_equal(body, self.body, 6)
+        # 40 bytes, real*4 or real*8? ask record size
+        self.assertRaises(ValueError, self.check, data, nreals=0)
+        header, body = self.check(data, nreals=0, recordsize=lambda h: 10)
+        numpy.testing.assert_almost_equal(body, self.body, 6)
+        self.assertRaises(ValueError, self.check, data, nreals=0,
+                          recordsize=lambda h: 3)
+
+    def test_fortranio_stream(self):
+        for endian in '<>':
+            for realsize in (8, 4):
+                data = write_binary(self.ints, self.reals, self.records,
+                                    endian, realsize, 0)
+                self.assertEqual(sniff(data[:64], 6)['format'], 'stream')
+                self.check(data, decimal=6 if realsize == 4 else 12,
+                           realsize=realsize)
+
+    def test_fortranio_history_core(self):
+        tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        try:
+            # nspecies=1, mpdiag=2, nfield=3, modes=1, mfdiag=1, ndata=11
+            ints = [4, 1, 2, 3, 1, 1]
+            body = numpy.round(numpy.random.rand(4 * 11), 6)
+            with open(os.path.join(tmpdir, 'history.out'), 'wb') as f:
+                f.write(write_text(ints, [0.5], body))
+            with open(os.path.join(tmpdir, 'history.bin'), 'wb') as f:
+                f.write(write_binary(ints, [0.5], body.reshape(4, 11), '>'))
+            os.mkdir(os.path.join(tmpdir, 'bin'))
+            with open(os.path.join(tmpdir, 'bin', 'history.out'), 'wb') as f:
+                f.write(write_binary(ints, [0.5], body.reshape(4, 11), '>'))
+            rawloader = get_rawloader(tmpdir)
+            results = []
+            for cls, fname in [(HistoryCoreV110922, 'history.out'),
+                               (HistoryBinaryCoreV110922, 'history.bin'),
+                               (HistoryCoreV110922, 'bin/history.out')]:
+                core = cls()
+                core.set_dig_args(rawloader, fname, 'history')
+                results.append(core.dig())
+            for sd in results[1:]:
+                self.assertEqual(sorted(sd), sorted(results[0]))
+                for key in sd:
+                    numpy.testing.assert_array_equal(sd[key], results[0][key])
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_fortranio_data1d_core(self):
+        tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        try:
+            # mpsi+1=5, nspecies=1, nhybrid=0, mpdata1d=3,
+            # nfield=3, mfdata1d=2, ndata=45
+            ints = [4, 5, 1, 0, 3, 3, 2]
+            body = numpy.round(numpy.random.rand(4 * 45), 6)
+            # data1di, field00, fieldrms records of each step
+            records = [r for step in body.reshape(4, 45)
+                       for r in (step[:15], step[15:30], step[30:])]
+            with open(os.path.join(tmpdir, 'data1d.out'), 'wb') as f:
+                f.write(write_text(ints, [], body))
+            os.mkdir(os.path.join(tmpdir, 'real4'))
+            for fname, realsize in [('data1d.bin', 8),
+                                    ('real4/data1d.bin', 4)]:
+                with open(os.path.join(tmpdir, fname), 'wb') as f:
+                    f.write(write_binary(ints, [], records, '>', realsize))
+            rawloader = get_rawloader(tmpdir)
+            results = []
+            for cls, fname in [(Data1dCoreV110922, 'data1d.out'),
+                               (Data1dBinaryCoreV110922, 'data1d.bin'),
+                               (Data1dBinaryCoreV110922, 'real4/data1d.bin')]:
+                core = cls()
+                core.set_dig_args(rawloader, fname, 'data1d')
+                results.append(core.dig())
+            self.assertEqual(results[0]['i-particle-flux'].shape, (5, 4))
+            for sd in results[1:]:
+                self.assertEqual(sorted(sd), sorted(results[0]))
+                for key in sd:
+                    numpy.testing.assert_array_almost_equal(
+                        sd[key], results[0][key], 6)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_fortranio_layout(self):
+        data = numpy.arange(4 * 5 * 3, dtype=float)
+        rows = fortran_rows(data, 4)
+        self.assertTrue(rows.flags.c_contiguous)
+        numpy.testing.assert_array_equal(
+            rows, data.reshape((4, -1), order='F'))
+        rows = fortran_rows(data, 4, [2, 0, 3])
+        self.assertTrue(rows.flags.c_contiguous)
+        numpy.testing.assert_array_equal(
+            rows, data.reshape((4, -1), order='F')[[2, 0, 3]])
+        blocks = fortran_blocks(data, (4, 5, 3))
+        ref = data.reshape((4, 5, 3), order='F')
+        for k in range(3):
+            self.assertTrue(blocks[k].flags.c_contiguous)
+            numpy.testing.assert_array_equal(blocks[k], ref[:, :, k])
+
+    def test_fortranio_snapshot_copies(self):
+        tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        try:
+            # nspecies, nfield, nvgrid, mpsi+1, mtgrid+1, mtoroidal
+            ints = [3, 3, 20, 65, 129, 32]
+            sizes = [65 * 6 * 3, 20 * 4 * 3, 129 * 65 * 5, 129 * 32 * 3]
+            body = numpy.random.rand(sum(sizes))
+            with open(os.path.join(tmpdir, 'snap00100.bin'), 'wb') as f:
+                f.write(write_binary(ints, [0.5], [body], marker=0))
+            rawloader = get_rawloader(tmpdir)
+            core = SnapshotBinaryCoreV110922()
+            core.set_dig_args(rawloader, 'snap00100.bin', 'snap00100')
+            tracemalloc.start()
+            try:
+                sd = core.dig()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            arrays = [v for v in sd.values() if isinstance(v, numpy.ndarray)]
+            self.assertEqual(sum(a.size for a in arrays), body.size)
+            for a in arrays:
+                self.assertTrue(a.flags.c_contiguous)
+                # savers get it as is, no hidden copy
+                self.assertIs(numpy.ascontiguousarray(a), a)
+            # file is mmapped: one body array, one copy of each block
+            self.assertLess(peak, 2.2 * body.nbytes)
+            index = sum(sizes[:2])
+            ref = body[index:index + sizes[2]].reshape(
+                (129, 65, 5), order='F')
+            numpy.testing.assert_array_equal(sd['poloidata-x'], ref[:, :, 3])
+        finally:
+            shutil.rmtree(tmpdir)
@@ -32,8 +32,8 @@ def fitline(X, Y, deg, info=''):
     One-dimensional polynomial fit
     '''
     fitresult = np.polyfit(X, Y, deg, full=True)
-    log.ddebug("Fitting line '%s' result:" % info)
-    log.ddebug("%s" % (fitresult,))
+    log.ddebug("Fitting line '%s' result:", info)
+    log.ddebug("%s", fitresult)
     fit_p = np.poly1d(fitresult[0])
     return fitresult, fit_p(X)
 
@@ -128,13 +128,13 @@ def savgol_golay_filter(x, window_size, polyorder, deriv=0, delta=1.0,
 
     if newfilter:
         if not nodebug:
-            log.ddebug("Use 'scipy.signal.savgol_filter' to smooth %s."
-                       % info)
+            log.ddebug("Use 'scipy.signal.savgol_filter' to smooth %s.",
+                       info)
         return savgol_filter(x, window_size, polyorder, deriv=deriv,
                              delta=delta, axis=axis, mode=mode, cval=cval)
 
     if not nodebug:
-        log.ddebug("Use an old Savitzky-Golay filter to smooth %s." % info)
+        log.ddebug("Use an old Savitzky-Golay filter to smooth %s.", info)
     from math import factorial
     try:
         window_size = np.abs(np.int(window_size))
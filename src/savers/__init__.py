@@ -15,19 +15,34 @@ and methods
 '''
 
 import os
+import importlib
 
 from ..glogger import getGLogger
 from . import base
 
 __all__ = ['get_pcksaver' 'is_pcksaver']
 log = getGLogger('S')
-pcksaver_names = ['CachePckSaver', 'NpzPckSaver', 'Hdf5PckSaver']
-pcksaver_types = ['.cache', '.npz', '.hdf5']
+pcksaver_names = ['CachePckSaver', 'NpzPckSaver', 'Hdf5PckSaver',
+                  'DirPckSaver']
+pcksaver_types = ['.cache', '.npz', '.hdf5', '.pckdir']
+_lazy_modules = dict(zip(pcksaver_names,
+                         ['cachepck', 'npzpck', 'hdf5pck', 'dirpck']))
 
 
-def get_pcksaver(path):
+def __getattr__(name):
+    '''Import saver classes on first access, h5py only when needed.'''
+    if name in _lazy_modules:
+        module = importlib.import_module('.' + _lazy_modules[name], __name__)
+        return getattr(module, name)
+    raise AttributeError("module '%s' has no attribute '%s'"
+                         % (__name__, name))
+
+
+def get_pcksaver(path, precision=None, **kwargs):
     '''
     Given a saver path, return a saver instance.
+    *precision* and *kwargs*, like *atomic*, *resume*, *truncate*,
+    are passed to saver, see :class:`base.BasePckSaver`.
     Raises ValueError if path type not supported.
 
     Notes
@@ -36,24 +51,28 @@ def get_pcksaver(path):
     1. '.cache', dict cache name
     2. '.npz', file path
     3. '.hdf5', file path
+    4. '.pckdir', chunked directory path
     '''
     path = str(path)
     ext = os.path.splitext(path)[1]
     if ext not in pcksaver_types:
-        log.warn("PckSaver type must be in '%s'! Use default '.npz'."
-                 % ', '.join(pcksaver_types))
+        log.warn("PckSaver type must be in '%s'! Use default '.npz'.",
+                 ', '.join(pcksaver_types))
         ext = '.npz'
         path = path + ext
 
     if ext == '.cache':
         from .cachepck import CachePckSaver
-        saver = CachePckSaver(path)
+        saver = CachePckSaver(path, precision=precision, **kwargs)
     elif ext == '.npz':
         from .npzpck import NpzPckSaver
-        saver = NpzPckSaver(path)
+        saver = NpzPckSaver(path, precision=precision, **kwargs)
     elif ext == '.hdf5':
         from .hdf5pck import Hdf5PckSaver
-        saver = Hdf5PckSaver(path)
+        saver = Hdf5PckSaver(path, precision=precision, **kwargs)
+    elif ext == '.pckdir':
+        from .dirpck import DirPckSaver
+        saver = DirPckSaver(path, precision=precision, **kwargs)
     else:
         raise ValueError('Save ha? Who am I? Why am I here?')
     return saver
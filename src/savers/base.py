@@ -7,12 +7,75 @@ Contains saver base class.
 '''
 
 import os
+import re
+import json
 
 from ..glogger import getGLogger
+from ..gprofiler import profile, nbytes_of
 
-__all__ = ['BasePckSaver']
+__all__ = ['BasePckSaver', 'archive_precision', 'reduce_precision',
+           'in_float32_range']
 log = getGLogger('S')
 
+# GTC writes these arrays with about 7 significant digits
+archive_precision = {
+    r'^snap\d{5}/(?:poloidata|fluxdata)-': 'float32',
+    r'^data1d/(?:fieldrms|field00)-': 'float32',
+    r'^data1d/[ief]-(?:particle|energy|momentum)-flux$': 'float32',
+}
+
+
+def _parse_policy(policy):
+    '''
+    Return kept mantissa bits of *policy*, 'float32' or 'float32:N'.
+    '''
+    name, _, bits = policy.partition(':')
+    if name != 'float32':
+        raise ValueError("Unknown precision policy '%s'!" % policy)
+    bits = int(bits) if bits else 23
+    if not 1 <= bits <= 23:
+        raise ValueError("Mantissa bits of '%s' should be in [1, 23]!"
+                         % policy)
+    return bits
+
+
+def reduce_precision(array, bits=23):
+    '''
+    Return float32 copy of float *array*. If *bits* < 23, round the
+    mantissa to *bits* bits, relative error is bounded by ``2**-bits``,
+    and the zero trailing bits are compressed well.
+    '''
+    import numpy
+    out = numpy.array(array, dtype=numpy.float32)
+    if bits < 23 and out.size:
+        drop = 23 - bits
+        ints = out.reshape(-1).view(numpy.uint32)
+        finite = numpy.isfinite(out.reshape(-1))
+        mask = numpy.uint32(~((1 << drop) - 1) & 0xFFFFFFFF)
+        kept = ints[finite]
+        rounded = (kept + numpy.uint32(1 << (drop - 1))) & mask
+        # carry of the largest values into exponent 0xFF gives inf,
+        # truncate them instead
+        expbits = numpy.uint32(0x7F800000)
+        over = (rounded & expbits) == expbits
+        rounded[over] = kept[over] & mask
+        ints[finite] = rounded
+    return out
+
+
+def in_float32_range(array):
+    '''
+    Return True if all finite non-zero values of float *array* are in
+    the range of normal float32 numbers, so they are not changed to inf,
+    subnormal numbers or zero by :func:`reduce_precision`.
+    '''
+    import numpy
+    info = numpy.finfo(numpy.float32)
+    values = numpy.abs(array[numpy.isfinite(array)])
+    values = values[values != 0]
+    return (values.size == 0
+            or (values.min() >= info.tiny and values.max() <= info.max))
+
 
 class BasePckSaver(object):
     '''
@@ -24,10 +87,30 @@ class BasePckSaver(object):
         path of the file or cache name
     status: bool
         True, store object open; False, store object closed
+    precision: list
+        compiled (pattern, mantissa bits) of float arrays to reduce
+    atomic: bool
+        write in sibling file '<path>.part', rename it on :meth:`close`
+    resume: bool
+        continue the '<path>.part' left by a crash, if possible
+    truncate: bool
+        replace old store, instead of appending data to it
+    donegroups: set
+        groups written before resuming, callers can skip them
+    journal: str
+        path of the progress journal, '<path>.part.journal'
 
     Parameters
     ----------
     path: str
+    precision: dict, optional
+        {pattern of 'group/key': policy}, like :data:`archive_precision`.
+        Policy 'float32' stores float64 arrays as float32, 'float32:N'
+        also rounds the mantissa to N bits, see :func:`reduce_precision`.
+        Default, store arrays as they are.
+    atomic: bool, default True, only for single file stores
+    resume: bool, default False
+    truncate: bool, default False
 
     Notes
     -----
@@ -36,9 +119,20 @@ class BasePckSaver(object):
        finally, remember to :meth:`close` saver.
     3. :meth:`get_store` is for cooperation with
        :class:`gdpy3.loaders.base.BasePckLoader`.
+    4. Loaders upcast the reduced arrays with option ``upcast=True``.
+    5. If :attr:`concurrent_groups` is True, savers of the same *path*
+       can write different groups at the same time.
+    6. With *atomic*, *path* is replaced only when the saver is closed
+       without error. Each written group is recorded in :attr:`journal`.
+       If the process crashes, '<path>.part' and the journal are left,
+       and a saver with *resume* continues from the last recorded group.
     '''
-    __slots__ = ['path', '_storeobj', 'status']
+    __slots__ = ['path', '_storeobj', 'status', 'precision', 'atomic',
+                 'resume', 'truncate', 'donegroups', '_workpath']
     _extension = '.extension-of-path'
+    concurrent_groups = False
+    # store is a single file, which can be written atomically
+    _single_file = True
 
     def _check_path_access(self):
         '''Check for access to *path*.'''
@@ -63,10 +157,29 @@ class BasePckSaver(object):
 
     def _write(self, group, data):
         '''
-        Write *data* to store object.
+        Write *data* to store object. Raise error if failed.
         '''
         raise NotImplementedError()
 
+    def _open_resume(self, records):
+        '''
+        Return store object of unfinished '<path>.part',
+        groups in journal *records* are kept.
+        '''
+        raise NotImplementedError()
+
+    def _journal_info(self):
+        '''
+        Return dict of store state to record in journal after a group.
+        '''
+        return {}
+
+    def _remove_store(self):
+        '''
+        Remove old store at *path*.
+        '''
+        os.remove(self.path)
+
     def _close(self):
         '''
         Close store object.
@@ -74,51 +187,137 @@ class BasePckSaver(object):
         self._storeobj.close()
         self._storeobj = None
 
+    def _abort(self):
+        '''
+        Close store object, after an error.
+        '''
+        self._close()
+
+    @property
+    def journal(self):
+        return self.path + '.part.journal'
+
+    def _read_journal(self):
+        records = []
+        with open(self.journal) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # last record is cut by crash
+                    break
+        return records
+
+    def _record_journal(self, group):
+        record = dict(self._journal_info(), group=group)
+        with open(self.journal, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
     def get_store(self):
         '''Return store path or object.'''
         return self.path
 
-    def __init__(self, path):
+    def __init__(self, path, precision=None, atomic=True, resume=False,
+                 truncate=False):
         self.path = path
         self._storeobj = None
         self.status = False
+        self.precision = [(re.compile(pat), _parse_policy(policy))
+                          for pat, policy in (precision or {}).items()]
+        self.atomic = atomic and self._single_file
+        self.resume = resume
+        self.truncate = truncate
+        self.donegroups = set()
         if not self._check_path_access():
             raise IOError("Can't access path '%s'!" % self.path)
         _p, ext = os.path.splitext(self.path)
         if ext != self._extension:
-            log.warn("Path's extension should be '%s', not '%s'!"
-                     % (self._extension, ext))
+            log.warn("Path's extension should be '%s', not '%s'!",
+                     self._extension, ext)
             self.path = _p + self._extension
+        self._workpath = self.path
 
     def iopen(self):
         '''
         Initialize store object.
         Open *path* if exists, create otherwise.
+        With *atomic*, data is written in '<path>.part'.
         '''
         if self.status:
             log.warn("The store object has been initialized.")
             return
         path = self.path
-        if self._check_path_exists():
+        self.donegroups = set()
+        if self.atomic:
+            self._workpath = path + '.part'
+            if (self.resume and os.path.isfile(self._workpath)
+                    and os.path.isfile(self.journal)):
+                records = self._read_journal()
+                try:
+                    log.debug("Resume unfinished '%s'.", self._workpath)
+                    self._storeobj = self._open_resume(records)
+                    self.status = True
+                    self.donegroups = set(r['group'] for r in records)
+                    log.info("Resume '%s' after %d written groups.",
+                             path, len(self.donegroups))
+                    return
+                except Exception:
+                    log.warn("Failed to resume '%s', start again.",
+                             self._workpath, exc_info=1)
+            for f in (self._workpath, self.journal):
+                if os.path.exists(f):
+                    os.remove(f)
+        elif self.truncate and self._check_path_exists():
+            log.debug("Remove old path '%s'.", path)
+            self._remove_store()
+        if self._check_path_exists() and not self.truncate:
             try:
-                log.debug("Open path '%s' to append data." % path)
+                log.debug("Open path '%s' to append data.", path)
                 self._storeobj = self._open_append()
                 self.status = True
             except Exception:
-                log.error("Failed to open path '%s'." % path, exc_info=1)
+                log.error("Failed to open path '%s'.", path, exc_info=1)
                 raise
         else:
             try:
-                log.debug("Create path '%s' to store data." % path)
+                log.debug("Create path '%s' to store data.", path)
                 self._storeobj = self._open_new()
                 self.status = True
             except Exception:
-                log.error("Failed to create path '%s'." % path, exc_info=1)
+                log.error("Failed to create path '%s'.", path, exc_info=1)
                 raise
 
+    def _reduce(self, group, data):
+        '''Return *data* with float arrays reduced by :attr:`precision`.'''
+        if not self.precision:
+            return data
+        result = {}
+        for key, val in data.items():
+            fullkey = key if group in ('/', '') else group + '/' + key
+            dtype = getattr(val, 'dtype', None)
+            if (getattr(val, 'ndim', 0) > 0 and dtype.kind == 'f'
+                    and dtype.itemsize > 4):
+                for pat, bits in self.precision:
+                    if pat.match(fullkey):
+                        if not in_float32_range(val):
+                            log.warn("Keep %s, values out of float32 range.",
+                                     fullkey)
+                            break
+                        log.ddebug("Reduce %s to float32, %d bits.",
+                                   fullkey, bits)
+                        val = reduce_precision(val, bits)
+                        break
+            result[key] = val
+        return result
+
+    @profile('save', name=lambda self, group, data: group,
+             nbytes=lambda result, self, group, data: nbytes_of(data))
     def write(self, group, data):
         '''
         Write dict *data* with *group* name to store object.
+        Return True if done, False if failed.
 
         Parameters
         ----------
@@ -133,24 +332,47 @@ class BasePckSaver(object):
                 log.error("'group' is not str, or 'data' is not dict!")
                 return False
             else:
-                self._write(group, data)
+                try:
+                    self._write(group, self._reduce(group, data))
+                except NotImplementedError:
+                    raise
+                except Exception:
+                    # not journaled, so written again on resume
+                    log.error("Failed to save data of '%s'!", group,
+                              exc_info=1)
+                    return False
+                if self.atomic:
+                    self._record_journal(group)
                 return True
 
-    def close(self):
+    def close(self, finish=True):
         '''
         Close initialized file object.
+        If *finish* is False, like after an error, '<path>.part' and
+        the journal are kept for resuming, *path* is not replaced.
         '''
         if self.status:
-            log.debug("Close path '%s'." % self.path)
-            self._close()
+            log.debug("Close path '%s'.", self.path)
+            if finish:
+                self._close()
+            else:
+                self._abort()
             self.status = False
+            if self.atomic and self._workpath != self.path:
+                if finish:
+                    os.replace(self._workpath, self.path)
+                    if os.path.exists(self.journal):
+                        os.remove(self.journal)
+                else:
+                    log.warn("Keep unfinished '%s' and its journal.",
+                             self._workpath)
 
     def __enter__(self):
         self.iopen()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.close()
+        self.close(finish=exc_type is None)
 
     def __repr__(self):
         return '<{0}.{1} object at {2} for {3}>'.format(
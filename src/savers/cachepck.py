@@ -23,6 +23,7 @@ class CachePckSaver(BasePckSaver):
     '''
     __slots__ = []
     _extension = '.cache'
+    _single_file = False
 
     def _check_path_access(self):
         return True
@@ -36,17 +37,17 @@ class CachePckSaver(BasePckSaver):
     def _open_new(self):
         return {}
 
+    def _remove_store(self):
+        self._storeobj = None
+
     def _write(self, group, data):
-        try:
-            if group in ('/', ''):
-                self._storeobj.update(data)
+        if group in ('/', ''):
+            self._storeobj.update(data)
+        else:
+            if group in self._storeobj:
+                self._storeobj[group].update(data)
             else:
-                if group in self._storeobj:
-                    self._storeobj[group].update(data)
-                else:
-                    self._storeobj[group] = data
-        except Exception:
-            log.error("Failed to save data of '%s'!" % group, exc_info=1)
+                self._storeobj[group] = data
 
     def _close(self):
         pass
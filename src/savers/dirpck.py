@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+'''
+Contains chunked directory pickled data saver class.
+
+Layout of the directory store ``path.pckdir``::
+
+    path.pckdir/.pckdir.json            # format marker
+    path.pckdir/.group.json             # metadata of top-level keys
+    path.pckdir/<key>/<i>               # chunk files of top-level keys
+    path.pckdir/<group>/.group.json     # metadata of keys in group
+    path.pckdir/<group>/<key>/<i>       # chunk i of array <group>/<key>
+
+Arrays are split along the first axis into chunks of about
+:data:`chunkbytes` bytes, each chunk is a zlib compressed file of raw
+C-ordered bytes. Scalars and str are kept in metadata as JSON values.
+'''
+
+import os
+import json
+import zlib
+import pickle
+import shutil
+import tempfile
+
+from ..glogger import getGLogger
+from .base import BasePckSaver
+
+__all__ = ['DirPckSaver']
+log = getGLogger('S')
+
+# bytes of raw data in a chunk
+chunkbytes = 2**22
+_marker = '.pckdir.json'
+_groupmeta = '.group.json'
+_version = 1
+
+
+def _dump_json(path, obj):
+    '''Write JSON *obj* to *path* atomically.'''
+    fd, tmpfile = tempfile.mkstemp(
+        prefix='.' + os.path.basename(path), suffix='.tmp',
+        dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(obj, f, indent=1, sort_keys=True)
+        os.replace(tmpfile, path)
+    except Exception:
+        os.remove(tmpfile)
+        raise
+
+
+def _write_value(keydir, val):
+    '''Write chunks of *val* in directory *keydir*, return metadata.'''
+    import numpy
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return {'kind': 'json', 'value': val}
+    if isinstance(val, numpy.generic) and val.dtype.kind in 'biuf':
+        return {'kind': 'json', 'value': val.item()}
+    arr = numpy.asanyarray(val)
+    os.mkdir(keydir)
+    if arr.dtype.hasobject:
+        with open(os.path.join(keydir, '0'), 'wb') as f:
+            f.write(zlib.compress(pickle.dumps(arr, protocol=4)))
+        return {'kind': 'pickle', 'nchunks': 1}
+    arr = numpy.ascontiguousarray(arr)
+    if arr.ndim == 0 or arr.shape[0] == 0:
+        rows = 1
+    else:
+        rowbytes = max(arr.nbytes // arr.shape[0], 1)
+        rows = max(chunkbytes // rowbytes, 1)
+    nchunks = 1 if arr.ndim == 0 else max(-(-arr.shape[0] // rows), 1)
+    for i in range(nchunks):
+        chunk = arr if arr.ndim == 0 else arr[i * rows:(i + 1) * rows]
+        with open(os.path.join(keydir, str(i)), 'wb') as f:
+            f.write(zlib.compress(chunk.tobytes()))
+    return {'kind': 'array', 'nchunks': nchunks, 'chunkrows': rows,
+            'shape': list(arr.shape),
+            'dtype': numpy.lib.format.dtype_to_descr(arr.dtype)}
+
+
+class DirPckSaver(BasePckSaver):
+    '''
+    Save dict data with a group name to a chunked directory store.
+
+    Each group is a sub-directory with its own metadata file, so savers
+    in threads or processes can write different groups of the same store
+    at the same time without locks. A group is written in a temporary
+    directory first, then renamed into place, so loaders never see a
+    half written group. So the store is always usable after a crash,
+    and with *resume*, :attr:`donegroups` are the groups in it.
+
+    Replacing an existing group is not atomic. It takes two renames,
+    old group out to a hidden '.<group>-old-*' directory, then new one
+    in. Between them, loaders see no such group. If the process crashes
+    there, the old group is left in the hidden directory, and the group
+    is written again when resumed.
+    '''
+    __slots__ = []
+    _extension = '.pckdir'
+    concurrent_groups = True
+    _single_file = False
+
+    def _check_path_exists(self):
+        return os.path.isfile(os.path.join(self.path, _marker))
+
+    def _open_append(self):
+        with open(os.path.join(self.path, _marker)) as f:
+            version = json.load(f).get('version', None)
+        if version != _version:
+            raise ValueError("Unsupported pckdir version '%s'!" % version)
+        if self.resume:
+            for root, dirs, files in os.walk(self.path):
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                if _groupmeta in files:
+                    group = os.path.relpath(root, self.path)
+                    self.donegroups.add(
+                        '' if group == '.' else group.replace(os.sep, '/'))
+                    if root != self.path:
+                        dirs[:] = []
+        return self.path
+
+    def _open_new(self):
+        os.makedirs(self.path, exist_ok=True)
+        _dump_json(os.path.join(self.path, _marker),
+                   {'format': 'gdpy3-pckdir', 'version': _version})
+        return self.path
+
+    def _remove_store(self):
+        shutil.rmtree(self.path)
+
+    def _write_keys(self, groupdir, data, meta):
+        for key, val in data.items():
+            keydir = os.path.join(groupdir, key)
+            if os.path.isdir(keydir):
+                shutil.rmtree(keydir)
+            try:
+                meta[key] = _write_value(keydir, val)
+            except Exception:
+                log.error("Failed to write %s.", keydir)
+                raise
+
+    def _write(self, group, data):
+        if group in ('/', ''):
+            # top-level keys, updated in place
+            metafile = os.path.join(self.path, _groupmeta)
+            meta = {}
+            if os.path.isfile(metafile):
+                with open(metafile) as f:
+                    meta = json.load(f)
+            self._write_keys(self.path, data, meta)
+            _dump_json(metafile, meta)
+            return
+        groupdir = os.path.join(self.path, group)
+        parent = os.path.dirname(groupdir)
+        os.makedirs(parent, exist_ok=True)
+        tmpdir = tempfile.mkdtemp(
+            prefix='.%s-' % os.path.basename(groupdir), dir=parent)
+        log.ddebug("Using tempdir: %s", tmpdir)
+        try:
+            meta = {}
+            self._write_keys(tmpdir, data, meta)
+            _dump_json(os.path.join(tmpdir, _groupmeta), meta)
+            if os.path.isdir(groupdir):
+                log.ddebug("Replace group '%s'.", group)
+                olddir = tempfile.mkdtemp(
+                    prefix='.%s-old-' % os.path.basename(groupdir),
+                    dir=parent)
+                os.replace(groupdir, os.path.join(olddir, 'group'))
+                os.replace(tmpdir, groupdir)
+                shutil.rmtree(olddir)
+            else:
+                os.replace(tmpdir, groupdir)
+        finally:
+            if os.path.isdir(tmpdir):
+                shutil.rmtree(tmpdir)
+
+    def _close(self):
+        self._storeobj = None
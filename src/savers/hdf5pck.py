@@ -2,6 +2,7 @@
 
 # Copyright (c) 2018 shmilee
 
+import shutil
 import numpy
 try:
     import h5py
@@ -24,33 +25,37 @@ class Hdf5PckSaver(BasePckSaver):
     _extension = '.hdf5'
 
     def _open_append(self):
-        return h5py.File(self.path, 'r+')
+        if self._workpath != self.path:
+            log.debug("Copy '%s' to '%s'.", self.path, self._workpath)
+            shutil.copyfile(self.path, self._workpath)
+        return h5py.File(self._workpath, 'r+')
 
     def _open_new(self):
-        return h5py.File(self.path, 'w-')
+        return h5py.File(self._workpath, 'w-')
+
+    def _open_resume(self, records):
+        # each group is flushed before it is recorded
+        return h5py.File(self._workpath, 'r+')
 
     def _write(self, group, data):
-        try:
-            if group in ('/', ''):
-                fgrp = self._storeobj
-                for key in data.keys():
-                    if key in self._storeobj:
-                        log.ddebug("Delete dataset '/%s'." % key)
-                        self._storeobj.__delitem__(key)
+        if group in ('/', ''):
+            fgrp = self._storeobj
+            for key in data.keys():
+                if key in self._storeobj:
+                    log.ddebug("Delete dataset '/%s'.", key)
+                    self._storeobj.__delitem__(key)
+        else:
+            if group in self._storeobj:
+                log.ddebug("Delete group '/%s'.", group)
+                self._storeobj.__delitem__(group)
+            log.ddebug("Create group '/%s'.", group)
+            fgrp = self._storeobj.create_group(group)
+        for key, val in data.items():
+            log.ddebug("Create dataset '%s/%s'.", fgrp.name, key)
+            if isinstance(val, (list, numpy.ndarray)):
+                fgrp.create_dataset(key, data=val, chunks=True,
+                                    compression='gzip',
+                                    compression_opts=9)
             else:
-                if group in self._storeobj:
-                    log.ddebug("Delete group '/%s'." % group)
-                    self._storeobj.__delitem__(group)
-                log.ddebug("Create group '/%s'." % group)
-                fgrp = self._storeobj.create_group(group)
-            for key, val in data.items():
-                log.ddebug("Create dataset '%s/%s'." % (fgrp.name, key))
-                if isinstance(val, (list, numpy.ndarray)):
-                    fgrp.create_dataset(key, data=val, chunks=True,
-                                        compression='gzip',
-                                        compression_opts=9)
-                else:
-                    fgrp.create_dataset(key, data=val)
-            self._storeobj.flush()
-        except Exception:
-            log.error("Failed to save data of '%s'!" % group, exc_info=1)
+                fgrp.create_dataset(key, data=val)
+        self._storeobj.flush()
@@ -7,9 +7,12 @@ Contains Npz pickled file saver class.
 '''
 
 import os
+import copy
 import numpy
+import struct
 import zipfile
 import tempfile
+import warnings
 
 from ..glogger import getGLogger
 from .base import BasePckSaver
@@ -17,30 +20,167 @@ from .base import BasePckSaver
 __all__ = ['NpzPckSaver']
 log = getGLogger('S')
 
+# bytes copied at a time
+_blocksize = 2**20
+
+
+def _strip_zip64_extra(extra):
+    '''Remove zip64 extra field, header id 1, from *extra* bytes.'''
+    result, i = b'', 0
+    while i + 4 <= len(extra):
+        hid, size = struct.unpack('<HH', extra[i:i + 4])
+        if hid != 1:
+            result += extra[i:i + 4 + size]
+        i += 4 + size
+    return result
+
+
+def _copy_raw(src, dst, zinfo):
+    '''
+    Copy member *zinfo* of ZipFile *src* to ZipFile *dst*, opened in
+    mode 'w', without decompressing. Compressed bytes are copied as is.
+    '''
+    src.fp.seek(zinfo.header_offset)
+    fheader = struct.unpack(zipfile.structFileHeader,
+                            src.fp.read(zipfile.sizeFileHeader))
+    # skip file name and extra field of the local header
+    src.fp.seek(fheader[10] + fheader[11], 1)
+    info = copy.copy(zinfo)
+    # sizes and CRC are in the new local header, no data descriptor
+    info.flag_bits &= ~0x08
+    info.extra = _strip_zip64_extra(zinfo.extra)
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+    dst.fp.seek(dst.start_dir)
+    info.header_offset = dst.fp.tell()
+    dst.fp.write(info.FileHeader(zip64))
+    remain = zinfo.compress_size
+    while remain > 0:
+        block = src.fp.read(min(remain, _blocksize))
+        if not block:
+            raise IOError("Truncated member '%s'!" % zinfo.filename)
+        dst.fp.write(block)
+        remain -= len(block)
+    dst.start_dir = dst.fp.tell()
+    dst.filelist.append(info)
+    dst.NameToInfo[info.filename] = info
+    dst._didModify = True
+
+
+def _last_members(zf):
+    '''Return ZipInfo of members in *zf*, only the last of same names.'''
+    return sorted(zf.NameToInfo.values(), key=lambda i: i.header_offset)
+
+
+def _scan_members(fp, end):
+    '''
+    Return ZipInfo of members in file *fp* before offset *end*,
+    got from local headers, for an archive without central directory.
+    '''
+    infos, pos = [], 0
+    while pos < end:
+        fp.seek(pos)
+        fheader = struct.unpack(zipfile.structFileHeader,
+                                fp.read(zipfile.sizeFileHeader))
+        if fheader[0] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile("Bad local header at %d!" % pos)
+        name = fp.read(fheader[10]).decode(
+            'utf-8' if fheader[3] & 0x800 else 'cp437')
+        zinfo = zipfile.ZipInfo(name)
+        zinfo.flag_bits, zinfo.compress_type = fheader[3], fheader[4]
+        zinfo.date_time = (
+            (fheader[6] >> 9) + 1980, (fheader[6] >> 5) & 0xF,
+            fheader[6] & 0x1F, fheader[5] >> 11, (fheader[5] >> 5) & 0x3F,
+            (fheader[5] & 0x1F) * 2)
+        zinfo.CRC, zinfo.compress_size, zinfo.file_size = fheader[7:10]
+        zinfo.extra = fp.read(fheader[11])
+        zinfo.header_offset = pos
+        if zinfo.compress_size == 0xFFFFFFFF:
+            # sizes of zip64 member are in extra field, header id 1
+            i = 0
+            while i + 4 <= len(zinfo.extra):
+                hid, size = struct.unpack('<HH', zinfo.extra[i:i + 4])
+                if hid == 1:
+                    zinfo.file_size, zinfo.compress_size = struct.unpack(
+                        '<QQ', zinfo.extra[i + 4:i + 20])
+                    break
+                i += 4 + size
+        zinfo.external_attr = 0o600 << 16
+        infos.append(zinfo)
+        pos = fp.tell() + zinfo.compress_size
+    return infos
+
 
 class NpzPckSaver(BasePckSaver):
     # https://docs.scipy.org/doc/numpy/reference/generated/numpy.savez_compressed.html
     # /usr/lib/python3.x/site-packages/numpy/lib/npyio.py, funtion _savez
     '''
     Save dict data with a group name to a NumPy compressed archive file.
+
+    When *path* exists, data is written to a new archive. On
+    :meth:`close`, members of the old archive, which are not overwritten,
+    are copied into it as compressed bytes, then it replaces *path*.
+    So members are never duplicated, and re-saving a group costs the
+    group plus a raw copy of others.
     '''
-    __slots__ = []
+    __slots__ = ['_tmppath']
     _extension = '.npz'
 
+    def _mkstemp(self):
+        file_dir, file_prefix = os.path.split(self.path)
+        fd, tmpfile = tempfile.mkstemp(
+            prefix=file_prefix, dir=file_dir or None, suffix='.tmp')
+        os.close(fd)
+        return tmpfile
+
     def _open_append(self):
+        if self._workpath == self.path:
+            self._tmppath = self._mkstemp()
+            log.ddebug("Using new archive: %s", self._tmppath)
+        else:
+            self._tmppath = None
         return numpy.lib.npyio.zipfile_factory(
-            self.path, mode="a", compression=zipfile.ZIP_DEFLATED)
+            self._tmppath or self._workpath, mode="w",
+            compression=zipfile.ZIP_DEFLATED)
 
     def _open_new(self):
+        self._tmppath = None
         return numpy.lib.npyio.zipfile_factory(
-            self.path, mode="w", compression=zipfile.ZIP_DEFLATED)
+            self._workpath, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def _open_resume(self, records):
+        # cut members after the last recorded group, then write after it
+        end = records[-1]['offset'] if records else 0
+        self._tmppath = None
+        fp = open(self._workpath, 'r+b')
+        try:
+            infos = _scan_members(fp, end)
+            fp.seek(end)
+            fp.truncate()
+            zf = zipfile.ZipFile(fp, mode="w",
+                                 compression=zipfile.ZIP_DEFLATED,
+                                 allowZip64=True)
+        except Exception:
+            fp.close()
+            raise
+        # let zf close fp
+        zf._filePassed = 0
+        for zinfo in infos:
+            zf.filelist.append(zinfo)
+            zf.NameToInfo[zinfo.filename] = zinfo
+        return zf
+
+    def _journal_info(self):
+        # end of written members
+        self._storeobj.fp.flush()
+        os.fsync(self._storeobj.fp.fileno())
+        return {'offset': self._storeobj.start_dir}
 
     def _write(self, group, data):
         file_dir, file_prefix = os.path.split(self.path)
         fd, tmpfile = tempfile.mkstemp(
             prefix=file_prefix, dir=file_dir, suffix='-numpy.npy')
         os.close(fd)
-        log.ddebug("Using tempfile: %s" % tmpfile)
+        log.ddebug("Using tempfile: %s", tmpfile)
         try:
             for key, val in data.items():
                 if group in ('/', ''):
@@ -54,14 +194,65 @@ class NpzPckSaver(BasePckSaver):
                                                  pickle_kwargs=None)
                     fid.close()
                     fid = None
-                    log.ddebug("Writting %s ..." % fname)
-                    self._storeobj.write(tmpfile, arcname=fname)
+                    log.ddebug("Writting %s ...", fname)
+                    with warnings.catch_warnings():
+                        if fname in self._storeobj.NameToInfo:
+                            # removed on close
+                            log.ddebug("Overwrite %s.", fname)
+                            warnings.simplefilter('ignore', UserWarning)
+                        self._storeobj.write(tmpfile, arcname=fname)
                 except Exception:
-                    log.error("Failed to write %s." % fname, exc_info=1)
+                    log.error("Failed to write %s.", fname)
+                    raise
                 finally:
                     if fid:
                         fid.close()
-        except Exception:
-            log.error("Failed to save data of '%s'!" % group, exc_info=1)
         finally:
             os.remove(tmpfile)
+
+    def _compact(self, zf, dst):
+        '''Raw copy last members of *zf* to new ZipFile *dst*.'''
+        with numpy.lib.npyio.zipfile_factory(
+                dst, mode="w", compression=zipfile.ZIP_DEFLATED) as out:
+            for zinfo in _last_members(zf):
+                _copy_raw(zf, out, zinfo)
+
+    def _close(self):
+        zf, self._storeobj = self._storeobj, None
+        tmppath, self._tmppath = self._tmppath, None
+        target = tmppath or self._workpath
+        try:
+            if (target != self.path and not self.truncate
+                    and os.path.isfile(self.path)):
+                log.debug("Copy unchanged members of '%s'.", self.path)
+                with zipfile.ZipFile(self.path) as old:
+                    for zinfo in _last_members(old):
+                        if zinfo.filename not in zf.NameToInfo:
+                            _copy_raw(old, zf, zinfo)
+            duplicate = len(zf.filelist) > len(zf.NameToInfo)
+            zf.close()
+            if duplicate:
+                # member written twice in this session
+                log.debug("Remove duplicate members of '%s'.", target)
+                compacted = self._mkstemp()
+                try:
+                    with zipfile.ZipFile(target) as zsrc:
+                        self._compact(zsrc, compacted)
+                    os.replace(compacted, target)
+                finally:
+                    if os.path.exists(compacted):
+                        os.remove(compacted)
+            if tmppath:
+                os.replace(tmppath, self.path)
+                tmppath = None
+        finally:
+            zf.close()
+            if tmppath and os.path.exists(tmppath):
+                os.remove(tmppath)
+
+    def _abort(self):
+        zf, self._storeobj = self._storeobj, None
+        tmppath, self._tmppath = self._tmppath, None
+        zf.close()
+        if tmppath and os.path.exists(tmppath):
+            os.remove(tmppath)
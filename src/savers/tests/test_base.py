@@ -5,8 +5,10 @@
 import os
 import unittest
 import tempfile
+import numpy
 
-from ..base import BasePckSaver
+from ..base import (BasePckSaver, archive_precision, reduce_precision,
+                    in_float32_range)
 
 
 class TestBasePckSaver(unittest.TestCase):
@@ -51,3 +53,59 @@ class TestBasePckSaver(unittest.TestCase):
     def test_pcksaver_get_store(self):
         saver = BasePckSaver(self.tmpfile)
         self.assertEqual(self.tmpfile, saver.get_store())
+
+    def test_pcksaver_reduce_precision(self):
+        a = numpy.random.randn(1000) * 10.0 ** numpy.arange(-20, 30, 0.05)
+        a[:3] = [0.0, numpy.inf, numpy.nan]
+        b = reduce_precision(a)
+        self.assertEqual(b.dtype, numpy.float32)
+        numpy.testing.assert_array_equal(b, a.astype(numpy.float32))
+        for bits in (10, 16):
+            b = reduce_precision(a, bits)
+            self.assertEqual(b.dtype, numpy.float32)
+            self.assertTrue(numpy.isinf(b[1]) and numpy.isnan(b[2]))
+            rel = numpy.abs(b[3:] - a[3:]) / numpy.abs(a[3:])
+            self.assertTrue((rel <= 2.0**-bits).all())
+            # trailing mantissa bits are zero
+            low = b.view(numpy.uint32) & numpy.uint32((1 << 23 - bits) - 1)
+            self.assertFalse(low.any())
+        # rounding carry of the largest float32 is not inf
+        big = numpy.finfo(numpy.float32).max
+        for bits in (1, 10, 22):
+            b = reduce_precision(numpy.array([big, -big]), bits)
+            self.assertTrue(numpy.isfinite(b).all())
+            self.assertTrue((numpy.abs(b - [big, -big]) <= 2.0**-bits
+                             * big).all())
+        with self.assertRaises(ValueError):
+            BasePckSaver(self.tmpfile, precision={'.*': 'float16'})
+
+    def test_pcksaver_precision_policy(self):
+        saver = BasePckSaver(self.tmpfile, precision=archive_precision)
+        data = {'poloidata-phi': numpy.random.rand(3, 4),
+                'poloidata-x': numpy.random.rand(4),
+                'nfield': 3}
+        out = saver._reduce('snap00100', data)
+        self.assertEqual(out['poloidata-phi'].dtype, numpy.float32)
+        self.assertEqual(out['poloidata-x'].dtype, numpy.float32)
+        self.assertEqual(out['nfield'], 3)
+        out = saver._reduce('history', {'fieldtime-phi': data['poloidata-x']})
+        self.assertIs(out['fieldtime-phi'], data['poloidata-x'])
+        data = {'i-energy-flux': numpy.random.rand(2, 3),
+                'i-particle-flux': numpy.arange(6),
+                'field00-phi': numpy.random.rand(2, 3)}
+        out = saver._reduce('data1d', data)
+        self.assertEqual(out['i-energy-flux'].dtype, numpy.float32)
+        self.assertEqual(out['i-particle-flux'].dtype, data[
+            'i-particle-flux'].dtype)
+        self.assertEqual(out['field00-phi'].dtype, numpy.float32)
+        # out of float32 range, kept as is
+        data = {'field00-phi': numpy.array([1.0, 1e39, numpy.inf]),
+                'fieldrms-phi': numpy.array([1.0, -1e-45, 0.0]),
+                'field00-apara': numpy.array([1.0, 1e38, numpy.nan, 0.0])}
+        self.assertFalse(in_float32_range(data['field00-phi']))
+        self.assertFalse(in_float32_range(data['fieldrms-phi']))
+        self.assertTrue(in_float32_range(data['field00-apara']))
+        out = saver._reduce('data1d', data)
+        self.assertIs(out['field00-phi'], data['field00-phi'])
+        self.assertIs(out['fieldrms-phi'], data['fieldrms-phi'])
+        self.assertEqual(out['field00-apara'].dtype, numpy.float32)
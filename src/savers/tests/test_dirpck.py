@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import json
+import shutil
+import unittest
+import tempfile
+import threading
+import numpy
+
+
+class TestDirPckSaver(unittest.TestCase):
+    '''
+    Test class DirPckSaver
+    '''
+
+    def setUp(self):
+        from ..dirpck import DirPckSaver
+        self.PckSaver = DirPckSaver
+        self.tmp = tempfile.mktemp(suffix='-test')
+        self.tmpfile = self.tmp + DirPckSaver._extension
+
+    def tearDown(self):
+        if os.path.isdir(self.tmpfile):
+            shutil.rmtree(self.tmpfile)
+
+    def test_dirsaver_iopen_close(self):
+        saver = self.PckSaver(self.tmp)
+        self.assertEqual(saver.path, self.tmpfile)
+        self.assertFalse(saver.status)
+        saver.iopen()
+        self.assertTrue(saver.status)
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.tmpfile, '.pckdir.json')))
+        saver.close()
+        self.assertFalse(saver.status)
+
+    def test_dirsaver_write(self):
+        saver = self.PckSaver(self.tmpfile)
+        saver.iopen()
+        self.assertFalse(saver.write('/', []))
+        self.assertTrue(saver.write('', {'ver': '1'}))
+        self.assertTrue(saver.write('/', {'num': 100, 'list': [1, 2, 3]}))
+        self.assertTrue(saver.write('group', {'desc': 'desc'}))
+        self.assertTrue(saver.write('group', {'x': numpy.arange(3)}))
+        saver.close()
+        with open(os.path.join(self.tmpfile, '.group.json')) as f:
+            self.assertSetEqual(set(json.load(f)), {'ver', 'num', 'list'})
+        # group is replaced, not updated
+        with open(os.path.join(self.tmpfile, 'group', '.group.json')) as f:
+            self.assertSetEqual(set(json.load(f)), {'x'})
+        # no temporary directories left
+        self.assertSetEqual(
+            set(d for d in os.listdir(self.tmpfile) if d.startswith('.')),
+            {'.group.json', '.pckdir.json'})
+
+    def test_dirsaver_concurrent_groups(self):
+        from ..dirpck import DirPckSaver
+        self.assertTrue(DirPckSaver.concurrent_groups)
+        data = {'group%d' % i: {'a': numpy.random.rand(50, 7), 'n': i}
+                for i in range(16)}
+
+        def write(group):
+            with self.PckSaver(self.tmpfile) as saver:
+                saver.write(group, data[group])
+        threads = [threading.Thread(target=write, args=(g,)) for g in data]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertListEqual(
+            sorted(d for d in os.listdir(self.tmpfile)
+                   if not d.startswith('.')), sorted(data))
+        for group in data:
+            with open(os.path.join(self.tmpfile, group, '.group.json')) as f:
+                meta = json.load(f)
+            self.assertEqual(meta['n'], {'kind': 'json', 'value': data[
+                group]['n']})
+            self.assertEqual(meta['a']['shape'], [50, 7])
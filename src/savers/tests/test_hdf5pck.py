@@ -61,3 +61,22 @@ class TestHdf5PckSaver(unittest.TestCase):
             self.assertTrue(saver.status)
         self.assertIsNone(saver._storeobj)
         self.assertFalse(saver.status)
+
+    def test_hdf5saver_atomic_resume(self):
+        with self.PckSaver(self.tmpfile) as saver:
+            saver.write('old', {'n': 0})
+        saver = self.PckSaver(self.tmpfile)
+        with self.assertRaises(RuntimeError):
+            with saver:
+                saver.write('g1', {'n': 1})
+                raise RuntimeError('crash')
+        with h5py.File(self.tmpfile, 'r') as hdf5:
+            self.assertListEqual(list(hdf5.keys()), ['old'])
+        saver = self.PckSaver(self.tmpfile, resume=True)
+        with saver:
+            self.assertSetEqual(saver.donegroups, {'g1'})
+            saver.write('g2', {'n': 2})
+        self.assertFalse(os.path.exists(self.tmpfile + '.part'))
+        self.assertFalse(os.path.exists(saver.journal))
+        with h5py.File(self.tmpfile, 'r') as hdf5:
+            self.assertListEqual(sorted(hdf5.keys()), ['g1', 'g2', 'old'])
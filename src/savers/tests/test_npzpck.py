@@ -8,6 +8,11 @@ import tempfile
 import numpy
 
 
+class Unpicklable(object):
+    def __reduce__(self):
+        raise IOError('No space left on device')
+
+
 class TestNpzPckSaver(unittest.TestCase):
     '''
     Test class NpzPckSaver
@@ -53,3 +58,117 @@ class TestNpzPckSaver(unittest.TestCase):
             self.assertTrue(saver.status)
         self.assertIsNone(saver._storeobj)
         self.assertFalse(saver.status)
+
+    def test_npzsaver_precision(self):
+        from ...loaders import get_pckloader
+        data = {'poloidata-phi': numpy.random.rand(64, 33),
+                'poloidata-x': numpy.random.rand(64, 33)}
+        saver = self.PckSaver(self.tmpfile,
+                              precision={r'^snap\d{5}/poloidata-phi$':
+                                         'float32:12'})
+        with saver:
+            saver.write('snap00100', data)
+        loader = get_pckloader(self.tmpfile)
+        phi = loader.get('snap00100/poloidata-phi')
+        self.assertEqual(phi.dtype, numpy.float32)
+        self.assertEqual(loader.get('snap00100/poloidata-x').dtype,
+                         numpy.float64)
+        loader = get_pckloader(self.tmpfile, upcast=True)
+        phi64, x = loader.get_many('snap00100/poloidata-phi',
+                                   'snap00100/poloidata-x')
+        self.assertEqual(phi64.dtype, numpy.float64)
+        numpy.testing.assert_array_equal(phi64, phi)
+        numpy.testing.assert_allclose(phi64, data['poloidata-phi'],
+                                      rtol=2.0**-12)
+        numpy.testing.assert_array_equal(x, data['poloidata-x'])
+
+    def test_npzsaver_append_compact(self):
+        import zipfile
+        a = numpy.random.rand(200, 30)
+        with self.PckSaver(self.tmpfile) as saver:
+            saver.write('', {'description': 'test'})
+            saver.write('g1', {'a': a, 'n': 1})
+            saver.write('g2', {'a': a, 'n': 2})
+        with zipfile.ZipFile(self.tmpfile) as zf:
+            g2info = zf.getinfo('g2/a.npy')
+        for i in range(3):
+            with self.PckSaver(self.tmpfile) as saver:
+                saver.write('g1', {'a': a + i, 'n': 10 + i})
+                saver.write('g3', {'n': 3})
+                saver.write('g3', {'n': 30})
+        with zipfile.ZipFile(self.tmpfile) as zf:
+            names = zf.namelist()
+            self.assertIsNone(zf.testzip())
+            # raw copied, compressed bytes unchanged
+            self.assertEqual(zf.getinfo('g2/a.npy').CRC, g2info.CRC)
+            self.assertEqual(zf.getinfo('g2/a.npy').compress_size,
+                             g2info.compress_size)
+        self.assertEqual(len(names), len(set(names)))
+        self.assertSetEqual(set(names), {
+            'description.npy', 'g1/a.npy', 'g1/n.npy', 'g2/a.npy',
+            'g2/n.npy', 'g3/n.npy'})
+        npz = numpy.load(self.tmpfile)
+        numpy.testing.assert_array_equal(npz['g1/a'], a + 2)
+        numpy.testing.assert_array_equal(npz['g2/a'], a)
+        self.assertEqual(npz['g1/n'], 12)
+        self.assertEqual(npz['g3/n'], 30)
+        npz.close()
+        tmpdir = os.path.dirname(self.tmpfile)
+        prefix = os.path.basename(self.tmpfile)
+        self.assertListEqual([f for f in os.listdir(tmpdir)
+                              if f.startswith(prefix) and f != prefix], [])
+
+    def test_npzsaver_atomic_resume(self):
+        a = numpy.random.rand(100, 10)
+        with self.PckSaver(self.tmpfile) as saver:
+            saver.write('old', {'a': a})
+        # crash after 2 groups, and in the third one
+        saver = self.PckSaver(self.tmpfile, truncate=True)
+        with self.assertRaises(RuntimeError):
+            with saver:
+                saver.write('g1', {'a': a, 'n': 1})
+                saver.write('g2', {'a': a + 1, 'n': 2})
+                saver._storeobj.writestr('g3/a.npy', b'half written')
+                raise RuntimeError('crash')
+        self.assertTrue(os.path.isfile(self.tmpfile + '.part'))
+        self.assertTrue(os.path.isfile(saver.journal))
+        npz = numpy.load(self.tmpfile)
+        self.assertListEqual(npz.files, ['old/a'])
+        npz.close()
+        saver = self.PckSaver(self.tmpfile, resume=True, truncate=True)
+        with saver:
+            self.assertSetEqual(saver.donegroups, {'g1', 'g2'})
+            saver.write('g3', {'a': a + 3})
+        self.assertFalse(os.path.exists(self.tmpfile + '.part'))
+        self.assertFalse(os.path.exists(saver.journal))
+        npz = numpy.load(self.tmpfile)
+        self.assertSetEqual(set(npz.files), {
+            'g1/a', 'g1/n', 'g2/a', 'g2/n', 'g3/a'})
+        numpy.testing.assert_array_equal(npz['g2/a'], a + 1)
+        numpy.testing.assert_array_equal(npz['g3/a'], a + 3)
+        npz.close()
+        # no resume, start again
+        with self.PckSaver(self.tmpfile) as saver:
+            self.assertSetEqual(saver.donegroups, set())
+            saver.write('g4', {'n': 4})
+        npz = numpy.load(self.tmpfile)
+        self.assertIn('g4/n', npz.files)
+        self.assertIn('g1/a', npz.files)
+        npz.close()
+
+    def test_npzsaver_failed_group(self):
+        saver = self.PckSaver(self.tmpfile)
+        with self.assertRaises(RuntimeError):
+            with saver:
+                self.assertTrue(saver.write('g1', {'n': 1}))
+                self.assertFalse(saver.write(
+                    'g2', {'n': 2, 'bad': Unpicklable()}))
+                raise RuntimeError('crash')
+        # failed group is not journaled, so written again on resume
+        saver = self.PckSaver(self.tmpfile, resume=True)
+        with saver:
+            self.assertSetEqual(saver.donegroups, {'g1'})
+            saver.write('g2', {'n': 2})
+        npz = numpy.load(self.tmpfile)
+        self.assertSetEqual(set(npz.files), {'g1/n', 'g2/n'})
+        npz.close()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import time
+import shutil
+import unittest
+import tempfile
+import numpy
+
+from ..savers import get_pcksaver
+from ..processors.basecore import BaseCore, BaseFigInfo
+from ..aggregate import AggregateStore
+
+
+class ImpFigInfo(BaseFigInfo):
+    __slots__ = []
+    figurenums = ['growth']
+
+    def __init__(self, fignum, group):
+        super(ImpFigInfo, self).__init__(
+            fignum, group, ['amp'], ['gtc/scale'], 'template')
+
+    def calculate(self, data, **kwargs):
+        self.calculation = {'gamma': data['amp'].max() * data['gtc/scale'],
+                            'array': data['amp']}
+
+
+class ImpCore(BaseCore):
+    __slots__ = []
+    grouppattern = '^history$'
+    figureclasses = [ImpFigInfo]
+
+
+class TestAggregateStore(unittest.TestCase):
+    '''
+    Test class AggregateStore
+    '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        self.store = os.path.join(self.tmpdir, 'scan.npz')
+        self.results = {'history/growth': ['gamma', 'array']}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_case(self, name, scale, extra={}):
+        casedir = os.path.join(self.tmpdir, name)
+        if not os.path.isdir(casedir):
+            os.mkdir(casedir)
+        path = os.path.join(casedir, 'gdpy3-pickled-data.npz')
+        if os.path.isfile(path):
+            os.remove(path)
+        gtc = {'scale': scale, 'mstep': 100, 'nmodes': [1, 2]}
+        gtc.update(extra)
+        with get_pcksaver(path) as saver:
+            saver.write('gtc', gtc)
+            saver.write('history', {'amp': numpy.arange(4.0)})
+        return path
+
+    def new_store(self):
+        return AggregateStore(self.store, results=self.results,
+                              coreclasses=[ImpCore])
+
+    def test_aggregate_add(self):
+        store = self.new_store()
+        p1 = self.write_case('a', 1.0)
+        p2 = self.write_case('b', 2.0, extra={'qiflux': 1.4})
+        self.assertEqual(store.add_many(p1, p2), 2)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(sorted(store.columns), [
+            'case', 'gtc/mstep', 'gtc/qiflux', 'gtc/scale',
+            'history/growth/gamma', 'mtime'])
+        numpy.testing.assert_array_equal(
+            store.column('history/growth/gamma'), [3.0, 6.0])
+        self.assertTrue(numpy.isnan(store.column('gtc/qiflux')[0]))
+        self.assertEqual(store.select(scale=2.0), [os.path.dirname(p2)])
+        self.assertEqual(store.select(nokey=2.0), [])
+        self.assertIn('gtc/scale', store.table())
+        table = store.table('gtc/scale', 'history/growth/gamma').split('\n')
+        self.assertIn(' history/growth/gamma', table[0])
+        self.assertEqual(len(set(len(l) for l in table)), 1)
+
+    def test_aggregate_incremental(self):
+        store = self.new_store()
+        p1 = self.write_case('a', 1.0)
+        store.add(p1)
+        store.save()
+        store = self.new_store()
+        self.assertTrue(os.path.dirname(p1) in store)
+        self.assertFalse(store.add(p1))
+        p2 = self.write_case('b', 2.0)
+        self.assertTrue(store.add(p2))
+        self.assertEqual(len(store), 2)
+        time.sleep(0.01)
+        p1 = self.write_case('a', 3.0)
+        os.utime(p1, (time.time() + 10, time.time() + 10))
+        self.assertFalse(store.add(p1, update=False))
+        self.assertTrue(store.add(p1))
+        store.save()
+        store = self.new_store()
+        numpy.testing.assert_array_equal(store.column('gtc/scale'),
+                                         [3.0, 2.0])
+        store.remove(os.path.dirname(p1))
+        self.assertEqual(store.cases, (os.path.dirname(p2),))
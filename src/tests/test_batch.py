@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import json
+import shutil
+import unittest
+import tempfile
+import unittest.mock
+
+from ..batch import (BatchDriver, find_cases, case_size, convert_case,
+                     donekey)
+from ..processors import GTC
+from ..processors.basecore import BaseCore
+from ..processors.coreregistry import CoreRegistry
+
+CALLS = []
+DIGGED = []
+
+
+def touch_stage(casedir, options):
+    CALLS.append((os.path.basename(casedir), 'convert'))
+    with open(os.path.join(casedir, 'converted'), 'w') as f:
+        f.write('1')
+    return {'n': 1}
+
+
+def fail_stage(casedir, options):
+    CALLS.append((os.path.basename(casedir), 'plot'))
+    if not os.path.isfile(os.path.join(casedir, 'converted')):
+        raise IOError('not converted')
+    if os.path.basename(casedir) == options.get('bad'):
+        raise ValueError('bad case')
+    return {'n': 2}
+
+
+class CrashError(BaseException):
+    '''Stop the process, like kill.'''
+
+
+class TextCore(BaseCore):
+    __slots__ = []
+    instructions = ['dig']
+    filepatterns = [r'^(?P<group>gtc|history|snap\d{5})\.out$']
+    grouppattern = r'^(?:gtc|history|snap\d{5})$'
+    crash = None
+
+    def _dig(self):
+        if self.group == self.crash:
+            raise CrashError(self.group)
+        DIGGED.append(self.group)
+        with self.rawloader.get(self.file) as f:
+            return {'text': f.read()}
+
+
+class ImpBatchDriver(BatchDriver):
+    __slots__ = []
+    stagefunctions = {'convert': touch_stage, 'plot': fail_stage}
+
+
+class TestBatchDriver(unittest.TestCase):
+    '''
+    Test class BatchDriver
+    '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        self.cases = []
+        for name, size in [('big', 3000), ('small', 10), ('middle', 500)]:
+            casedir = os.path.join(self.tmpdir, name)
+            os.mkdir(casedir)
+            with open(os.path.join(casedir, 'gtc.out'), 'w') as f:
+                f.write('x' * size)
+            self.cases.append(casedir)
+        self.statefile = os.path.join(self.tmpdir, 'state.json')
+        del CALLS[:]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_batch_find_cases(self):
+        self.assertEqual(find_cases(self.tmpdir), sorted(self.cases))
+
+    def test_batch_case_size(self):
+        casedir = self.cases[0]
+        self.assertEqual(case_size(casedir), 3000)
+        # outputs of stages are not counted
+        os.mkdir(os.path.join(casedir, 'figures'))
+        os.mkdir(os.path.join(casedir, 'gdpy3-pickled-data.pckdir'))
+        for f in ['figures/a.png', 'gdpy3-pickled-data.npz',
+                  'gdpy3-pickled-data.npz.part',
+                  'gdpy3-pickled-data.pckdir/g']:
+            with open(os.path.join(casedir, f), 'w') as fo:
+                fo.write('x' * 100)
+        self.assertEqual(case_size(casedir), 3000)
+
+    def test_batch_small_first(self):
+        driver = ImpBatchDriver(self.cases, statefile=self.statefile)
+        self.assertEqual(driver.run(), 0)
+        self.assertEqual(CALLS, [
+            ('small', 'convert'), ('small', 'plot'),
+            ('middle', 'convert'), ('middle', 'plot'),
+            ('big', 'convert'), ('big', 'plot')])
+        with open(self.statefile) as f:
+            state = json.load(f)
+        self.assertEqual(state[self.cases[0]]['plot']['info'], {'n': 2})
+        summary = driver.summary()
+        self.assertEqual(summary.count('done'), 3)
+
+    def test_batch_resume(self):
+        driver = ImpBatchDriver(self.cases, statefile=self.statefile,
+                                options={'bad': 'middle'})
+        self.assertEqual(driver.run(), 1)
+        self.assertIn('failed(plot)', driver.summary())
+        del CALLS[:]
+        driver = ImpBatchDriver(self.cases, statefile=self.statefile)
+        self.assertEqual(driver.run(), 0)
+        self.assertEqual(CALLS, [('middle', 'plot')])
+        driver = ImpBatchDriver(self.cases, statefile=self.statefile)
+        self.assertEqual(driver.run(), 0)
+        self.assertEqual(CALLS, [('middle', 'plot')])
+
+    def test_batch_pool(self):
+        driver = ImpBatchDriver(self.cases, statefile=self.statefile,
+                                jobs=2, queuesize=2)
+        self.assertEqual(driver.run(), 0)
+        for casedir in self.cases:
+            self.assertTrue(driver.is_done(casedir, 'convert'))
+            self.assertTrue(driver.is_done(casedir, 'plot'))
+        driver = ImpBatchDriver(self.cases, statefile=self.statefile,
+                                stages=['plot'], jobs=2)
+        self.assertEqual(driver.run(), 0)
+        self.assertRaises(ValueError, ImpBatchDriver, self.cases,
+                          stages=['cook'])
+
+
+class TestConvertCase(unittest.TestCase):
+    '''
+    Test function convert_case
+    '''
+
+    def setUp(self):
+        self.casedir = tempfile.mkdtemp(prefix='gdpy3-test-')
+        self.groups = ['gtc', 'history', 'snap00100', 'snap00200']
+        for group in self.groups:
+            with open(os.path.join(self.casedir, group + '.out'), 'w') as f:
+                f.write('%s data' % group)
+        registry = CoreRegistry([TextCore])
+        self.patch = unittest.mock.patch.object(
+            GTC, 'get_registry', return_value=registry)
+        self.patch.start()
+        del DIGGED[:]
+
+    def tearDown(self):
+        self.patch.stop()
+        TextCore.crash = None
+        shutil.rmtree(self.casedir)
+
+    def crash_resume(self, extension):
+        from ..loaders import get_pckloader
+        options = {'extension': extension}
+        # crash after 2 groups
+        TextCore.crash = 'snap00100'
+        with self.assertRaises(CrashError):
+            convert_case(self.casedir, options)
+        self.assertEqual(DIGGED, ['gtc', 'history'])
+        TextCore.crash = None
+        del DIGGED[:]
+        info = convert_case(self.casedir, options)
+        self.assertEqual(DIGGED, ['snap00100', 'snap00200'])
+        self.assertEqual(info['ngroups'], 4)
+        loader = get_pckloader(info['savefile'])
+        # no fake group, atomic store needs no marker
+        self.assertEqual(set(loader.datagroups) - {''}, set(self.groups))
+        self.assertEqual(donekey in loader, extension == '.pckdir')
+        self.assertEqual(str(loader['snap00200/text']), 'snap00200 data')
+        # finished, skip
+        del DIGGED[:]
+        info = convert_case(self.casedir, options)
+        self.assertIsNone(info['ngroups'])
+        self.assertEqual(DIGGED, [])
+        # overwrite finished one
+        options['overwrite'] = True
+        info = convert_case(self.casedir, options)
+        self.assertEqual(info['ngroups'], 4)
+        self.assertEqual(len(DIGGED), 4)
+
+    def test_convert_case_resume_npz(self):
+        self.crash_resume('.npz')
+
+    def test_convert_case_resume_pckdir(self):
+        self.crash_resume('.pckdir')
+
+    def test_convert_case_legacy(self):
+        from ..savers import get_pcksaver
+        # saved by gdpy3-convert, no '.part', no marker
+        savefile = os.path.join(self.casedir, 'gdpy3-pickled-data.npz')
+        with get_pcksaver(savefile) as saver:
+            saver.write('', {'description': 'old'})
+            saver.write('gtc', {'text': 'gtc data'})
+        info = convert_case(self.casedir, {'extension': '.npz'})
+        self.assertIsNone(info['ngroups'])
+        self.assertEqual(DIGGED, [])
+        # unfinished one left '.part'
+        with open(savefile + '.part', 'wb'):
+            pass
+        info = convert_case(self.casedir, {'extension': '.npz'})
+        self.assertEqual(info['ngroups'], 4)
+        self.assertFalse(os.path.exists(savefile + '.part'))
+
+    def test_convert_case_noresume(self):
+        options = {'extension': '.pckdir', 'resume': False}
+        TextCore.crash = 'snap00100'
+        with self.assertRaises(CrashError):
+            convert_case(self.casedir, options)
+        TextCore.crash = None
+        del DIGGED[:]
+        info = convert_case(self.casedir, options)
+        self.assertEqual(info['ngroups'], 4)
+        self.assertEqual(len(DIGGED), 4)
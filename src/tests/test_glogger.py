@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 shmilee
+
+import os
+import sys
+import logging
+import unittest
+import subprocess
+
+from .. import glogger
+
+
+class TestGLogger(unittest.TestCase):
+    '''
+    Test module glogger
+    '''
+
+    def setUp(self):
+        self.levels = {n: glogger.getGLogger(n).level
+                       for n in glogger.gloggerConfig['loggers']}
+
+    def tearDown(self):
+        for name, level in self.levels.items():
+            glogger.getGLogger(name).setLevel(level)
+
+    def test_glogger_set_level(self):
+        glogger.setGLoggerLevel('info')
+        for name in self.levels:
+            self.assertEqual(glogger.getGLogger(name).level, logging.INFO)
+        glogger.setGLoggerLevel('ddebug', names=['L', 'S'])
+        self.assertEqual(glogger.getGLogger('L').level, glogger.DDEBUG)
+        self.assertEqual(glogger.getGLogger('S').level, glogger.DDEBUG)
+        self.assertEqual(glogger.getGLogger('G').level, logging.INFO)
+        glogger.setGLoggerLevel(glogger.VERBOSE, names=['G'])
+        self.assertEqual(glogger.getGLogger('G').level, glogger.VERBOSE)
+        with self.assertRaises(ValueError):
+            glogger.setGLoggerLevel('bogus')
+        with self.assertRaises(KeyError):
+            glogger.setGLoggerLevel('INFO', names=['X'])
+
+    def test_glogger_env_level(self):
+        code = ("import runpy, logging; runpy.run_path(%r); "
+                "print(logging.getLogger('L').level)" % glogger.__file__)
+        for env, level in [('bogus', glogger.DDEBUG), ('info', logging.INFO),
+                           ('15', glogger.VERBOSE), ('', glogger.DDEBUG)]:
+            out = subprocess.run(
+                [sys.executable, '-c', code], stdout=subprocess.PIPE,
+                env=dict(os.environ, GDPY3_LOG_LEVEL=env,
+                         GDPY3_LOG_QUEUE='0'),
+                check=True, universal_newlines=True).stdout
+            self.assertEqual(out.split()[-1], str(level))
+            if env == 'bogus':
+                self.assertIn("Unknown GDPY3_LOG_LEVEL 'bogus'", out)
+
+    @unittest.skipIf(glogger._listener is None, "Log queue is disabled.")
+    def test_glogger_queue_listener(self):
+        log = glogger.getGLogger('S')
+        qhandler = [h for h in log.handlers
+                    if isinstance(h, logging.handlers.QueueHandler)][0]
+        try:
+            # like before fork
+            log.ddebug("test %s", 'queue')
+            glogger._stop_queue_listener()
+            self.assertFalse(glogger._listener_started)
+            self.assertTrue(qhandler.queue.empty())
+            glogger._stop_queue_listener()
+            self.assertFalse(glogger._listener_started)
+        finally:
+            # like after fork
+            glogger._restart_queue_listener()
+        self.assertTrue(glogger._listener_started)
+        glogger._restart_queue_listener()
+        self.assertTrue(glogger._listener_started)
+        log.ddebug("test %s", 'queue')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "Need os.fork.")
+    @unittest.skipIf(glogger._listener is None, "Log queue is disabled.")
+    def test_glogger_fork(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 2
+            try:
+                glogger.getGLogger('G').ddebug("In child %d.", os.getpid())
+                code = 0 if glogger._listener_started else 1
+            finally:
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertTrue(glogger._listener_started)